@@ -3,19 +3,101 @@
 # Apache License, Version 2.0. See the LICENSE and NOTICES files in the project
 # root for more information.
 
-from actions_parser import get_all_used_actions, invoke_validate_actions
-from pathlib import Path
+import argparse
+import os
 import sys
+from contextlib import ExitStack
 from os.path import abspath
+from pathlib import Path
+
+if not __package__:
+    # Running as `python action_allowedlist`: make the package importable by
+    # name instead of exposing its modules as top-level imports.
+    sys.path[0] = str(Path(__file__).resolve().parent.parent)
+
+# Everything else is imported by the command that needs it: this runs
+# thousands of times a day, and commands such as compile, validate-list or
+# client never parse YAML or start worker processes.
+from action_allowedlist import log, metrics, timings  # noqa: E402
+from action_allowedlist.yaml_backend import BACKENDS  # noqa: E402
+
+
+def main(
+    workflow_directory: Path,
+    approved_path: Path,
+    jobs=1,
+    cache=None,
+    base_ref=None,
+    head_ref="HEAD",
+    results_path=None,
+    resolver=None,
+    overlays=(),
+    ref=None,
+):
+    from action_allowedlist.actions_parser import (
+        get_repository_root,
+        invoke_validate_actions,
+        iter_tree_actions,
+        iter_used_actions,
+    )
+    from action_allowedlist.approved_snapshot import load_approved_index
+    from action_allowedlist.git_diff import get_incremental_workflow_files
+    from action_allowedlist.results import ResultCollector
 
+    from action_allowedlist.log import logger
 
-def main(workflow_directory: Path, approved_path: Path):
-    print(f"Repository path to scan: {workflow_directory}")
-    print(f"Approval file: {approved_path}")
+    logger.info("Repository path to scan: %s", workflow_directory)
+    logger.info("Approval file: %s", approved_path)
+    for overlay in overlays:
+        logger.info("Approval overlay: %s", overlay)
+
+    workflow_files = None
+    if base_ref:
+        workflow_files = get_incremental_workflow_files(
+            get_repository_root(workflow_directory),
+            [approved_path, *overlays],
+            base_ref,
+            head_ref,
+        )
+
+    from action_allowedlist.sources import open_tree
+
+    # Workflow files are parsed as validation consumes their actions, so the
+    # whole repository never has to be held in memory.
+    tree = open_tree(workflow_directory, ref)
+    if tree is not None:
+        actions_found = iter_tree_actions(tree, jobs, cache)
+    else:
+        actions_found = iter_used_actions(
+            workflow_directory, jobs, cache, workflow_files
+        )
+    if timings.is_enabled():
+        # Parse everything first so that parsing is not timed as validation.
+        actions_found = list(actions_found)
 
-    actions_found = get_all_used_actions(workflow_directory)
+    with ExitStack() as stack:
+        stream = None
+        if results_path:
+            # Line buffered, so each result is readable as soon as it is known.
+            stream = stack.enter_context(open(results_path, "w", buffering=1))
+        collector = ResultCollector(stream)
+        with timings.phase("validation"):
+            approved = load_approved_index(
+                approved_path,
+                overlays=overlays,
+                cache_dir=cache and cache.directory,
+            )
+            if resolver is not None:
+                from action_allowedlist.mirrors import ResolvingIndex
 
-    found = invoke_validate_actions(approved_path, actions_found)
+                stack.enter_context(resolver)
+                approved = ResolvingIndex(approved, resolver)
+            found = invoke_validate_actions(approved, actions_found, collector)
+
+    if cache is not None:
+        cache.prune()
+    if os.environ.get("GITHUB_OUTPUT"):
+        collector.write_github_output(os.environ["GITHUB_OUTPUT"])
 
     if found:
         sys.exit(1)
@@ -23,13 +105,655 @@ def main(workflow_directory: Path, approved_path: Path):
         sys.exit(0)
 
 
-if __name__ == "__main__":
-    workflow_directory = Path(abspath(sys.argv[1]))
-    approved_path = Path(abspath(sys.argv[2]))
+def main_organization(
+    repositories, approved_path: Path, workers: int, cache=None, overlays=(), **options
+):
+    from action_allowedlist.org_scan import scan_organization
+
+    found = scan_organization(
+        repositories, approved_path, workers, cache, overlays, **options
+    )
+
+    if found:
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist",
+        description="Check that workflows only use approved GitHub Actions.",
+    )
+    parser.add_argument(
+        "workflow_directory",
+        help="Repository to scan (a checkout, a git repository read at --ref, or a tar "
+        "or zip archive), or the directory of repositories when using --org.",
+    )
+    parser.add_argument("approved_path", help="Path to approved.json.")
+    add_overlay_argument(parser)
+    multi_root = parser.add_mutually_exclusive_group()
+    multi_root.add_argument(
+        "--org",
+        action="store_true",
+        help="Scan every repository checked out directly under workflow_directory.",
+    )
+    multi_root.add_argument(
+        "--manifest",
+        help="Scan the repositories listed in this file, one path per line.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes used to scan repositories in --org or --manifest mode.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to parse workflow files of a single repository.",
+    )
+    parser.add_argument(
+        "--yaml-backend",
+        choices=["auto", *BACKENDS],
+        default="auto",
+        help="YAML loader to use. 'auto' picks libyaml when it is available.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching the actions extracted from each workflow file.",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=100,
+        help="Size limit of the cache directory in MB (default: 100).",
+    )
+    parser.add_argument(
+        "--ref",
+        help="Read workflow files from the git objects at this ref instead of the "
+        "working tree. Bare repositories are read at HEAD by default.",
+    )
+    parser.add_argument(
+        "--base-ref",
+        help="Only scan workflow files added or modified since this git ref.",
+    )
+    parser.add_argument(
+        "--head-ref",
+        default="HEAD",
+        help="Git ref compared with --base-ref (default: HEAD). It should be checked out.",
+    )
+    parser.add_argument(
+        "--results",
+        metavar="PATH",
+        help="Write one JSON line per checked action reference to this file as the scan runs.",
+    )
+    add_mirror_arguments(parser)
+    add_limit_arguments(parser)
+    parser.add_argument(
+        "--timings",
+        metavar="PATH",
+        help="Write wall and CPU time per phase and per workflow file to this JSON file.",
+    )
+    parser.add_argument(
+        "--timings-summary",
+        action="store_true",
+        help="Also add the timings as a table to the GitHub step summary.",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write scan statistics as OpenMetrics text to this file, adding to the "
+        "counters already in it (for example a node-exporter textfile collector .prom file).",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=["openmetrics", "prometheus"],
+        default="openmetrics",
+        help="Text format of --metrics (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Write cProfile statistics for the run (main process only) to this file.",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="Show more output; -v includes debug messages for every action.",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="count",
+        default=0,
+        help="Show less output; -q shows only warnings and errors.",
+    )
+    # The Docker action passes unset inputs as empty arguments.
+    return parser.parse_args([arg for arg in argv if arg])
+
+
+def add_overlay_argument(parser):
+    parser.add_argument(
+        "--overlay",
+        metavar="PATH",
+        action="append",
+        default=[],
+        help="Approved list overlay applied on top of approved.json. "
+        "Repeat for more layers; later overlays take precedence.",
+    )
+
+
+def add_mirror_arguments(parser, required=False):
+    parser.add_argument(
+        "--mirrors",
+        metavar="DIR",
+        required=required,
+        help="Directory of bare mirrors of action repositories, as <owner>/<repo>.git.",
+    )
+    parser.add_argument(
+        "--mirror-cache",
+        metavar="PATH",
+        help="File caching resolved refs (default: resolved-refs.json in the mirrors directory).",
+    )
+    parser.add_argument(
+        "--mirror-max-age",
+        type=float,
+        default=24,
+        help="Hours before a resolved tag or branch is looked up again (default: 24).",
+    )
+
+
+def add_limit_arguments(parser):
+    from action_allowedlist.workflow_outline import ParseLimits
+
+    defaults = ParseLimits()
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=defaults.max_bytes // 1024,
+        help="Reject YAML files larger than this many KB (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--max-aliases",
+        type=int,
+        default=defaults.max_aliases,
+        help="Reject YAML files expanding more aliases than this (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=defaults.max_depth,
+        help="Reject YAML files nested deeper than this (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--parse-timeout",
+        type=float,
+        default=defaults.max_seconds,
+        help="Reject YAML files taking longer than this many seconds to parse "
+        "(default: %(default)s).",
+    )
+
+
+def set_parse_limits(args):
+    from action_allowedlist.workflow_outline import ParseLimits, set_limits
+
+    set_limits(
+        ParseLimits(
+            args.max_file_size * 1024,
+            args.max_aliases,
+            args.max_depth,
+            args.parse_timeout,
+        )
+    )
+
+
+def mirror_options(args):
+    # The arguments of mirrors.open_resolver.
+    return (
+        abspath(args.mirrors),
+        args.mirror_cache and abspath(args.mirror_cache),
+        args.mirror_max_age * 60 * 60,
+    )
+
+
+def open_resolver(args):
+    from action_allowedlist.mirrors import open_resolver
+
+    return open_resolver(*mirror_options(args))
+
+
+def run_scan(argv):
+    args = parse_arguments(argv)
+    log.configure(log.verbosity_level(args.verbose, args.quiet))
+    if args.timings or args.timings_summary:
+        timings.enable()
+    if args.metrics:
+        metrics.enable()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        scan(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if args.timings:
+            timings.write_json(args.timings)
+        if args.timings_summary and os.environ.get("GITHUB_STEP_SUMMARY"):
+            timings.write_step_summary(os.environ["GITHUB_STEP_SUMMARY"])
+        if args.metrics:
+            metrics.write(args.metrics, args.metrics_format == "openmetrics")
+
+
+def scan(args):
+    from action_allowedlist.action_cache import ActionCache
+    from action_allowedlist.yaml_backend import select_backend
+
+    workflow_directory = Path(abspath(args.workflow_directory))
+    approved_path = Path(abspath(args.approved_path))
+    overlays = [Path(abspath(overlay)) for overlay in args.overlay]
+    if args.base_ref and (args.ref or workflow_directory.is_file()):
+        raise SystemExit("--base-ref needs a checkout, not --ref or an archive")
+    select_backend(args.yaml_backend)
+    set_parse_limits(args)
+    cache = None
+    if args.cache_dir:
+        cache = ActionCache(abspath(args.cache_dir), args.cache_max_size * 1024 * 1024)
+
+    if args.org or args.manifest:
+        from action_allowedlist.org_scan import find_repositories, read_manifest
 
-    if workflow_directory is None or approved_path is None:
-        raise RuntimeError(
-            "Must specify the workflow directory and path to the approved file at the command line."
+        if args.org:
+            repositories = find_repositories(workflow_directory)
+        else:
+            repositories = read_manifest(Path(abspath(args.manifest)))
+        main_organization(
+            repositories,
+            approved_path,
+            args.workers,
+            cache,
+            overlays,
+            ref=args.ref,
+            jobs=args.jobs,
+            base_ref=args.base_ref,
+            head_ref=args.head_ref,
+            results_path=args.results and abspath(args.results),
+            mirrors=mirror_options(args) if args.mirrors else None,
         )
+    else:
+        with metrics.repository(workflow_directory.name):
+            main(
+                workflow_directory,
+                approved_path,
+                args.jobs,
+                cache,
+                args.base_ref,
+                args.head_ref,
+                args.results and abspath(args.results),
+                open_resolver(args) if args.mirrors else None,
+                overlays,
+                args.ref,
+            )
+
+
+def run_compile(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist compile",
+        description="Write a memory-mapped snapshot of the approved list for fast startup.",
+    )
+    parser.add_argument("approved_path", help="Path to approved.json.")
+    add_overlay_argument(parser)
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Snapshot path (default: next to approved.json with a .snapshot suffix, "
+        "or named after the hash of all layers when there are overlays).",
+    )
+    args = parser.parse_args(argv)
+
+    from action_allowedlist.approved_snapshot import compile_snapshot
+
+    snapshot_path = compile_snapshot(
+        abspath(args.approved_path), args.output, [abspath(o) for o in args.overlay]
+    )
+    print(f"Wrote approved list snapshot: {snapshot_path}")
+
+
+def run_validate_list(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist validate-list",
+        description="Check a precomputed list of actions without reading any workflows.",
+    )
+    parser.add_argument("approved_path", help="Path to approved.json.")
+    parser.add_argument(
+        "actions_path",
+        help="JSON list of objects with actionLink and actionVersion, "
+        "and optionally workflowFileName and jobName.",
+    )
+    add_overlay_argument(parser)
+    args = parser.parse_args(argv)
+
+    from action_allowedlist.actions_parser import (
+        invoke_validate_actions,
+        load_json_file,
+    )
+    from action_allowedlist.approved_snapshot import load_approved_index
+
+    approved = load_approved_index(
+        abspath(args.approved_path), overlays=[abspath(o) for o in args.overlay]
+    )
+    found = invoke_validate_actions(approved, load_json_file(args.actions_path))
+    sys.exit(1 if found else 0)
+
+
+def run_verify(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist verify",
+        description="Check approved SHAs and their tags against local mirrors of the "
+        "action repositories.",
+    )
+    parser.add_argument("approved_path", help="Path to approved.json.")
+    add_mirror_arguments(parser, required=True)
+    args = parser.parse_args(argv)
+
+    from action_allowedlist.actions_parser import load_json_file
+    from action_allowedlist.mirrors import verify_approved
+
+    with open_resolver(args) as resolver:
+        problems = verify_approved(load_json_file(args.approved_path), resolver)
+    sys.exit(1 if problems else 0)
+
+
+def run_history(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist history",
+        description="Find every commit whose workflow files use an action that is not "
+        "approved, reading only the workflow files from git objects.",
+    )
+    parser.add_argument("repository", help="Git repository, bare or not.")
+    parser.add_argument("approved_path", help="Path to approved.json.")
+    add_overlay_argument(parser)
+    parser.add_argument(
+        "--rev",
+        action="append",
+        default=[],
+        help="Revision or range to walk, as given to git log (default: all refs). "
+        "Can be repeated.",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="PATH",
+        help="Write one JSON line per denied action and version, or rejected "
+        "workflow file, to this file.",
+    )
+    args = parser.parse_args(argv)
+
+    import json
+
+    from action_allowedlist.approved_snapshot import load_approved_index
+    from action_allowedlist.history import (
+        finding_record,
+        report_history,
+        scan_history,
+    )
+
+    approved = load_approved_index(
+        abspath(args.approved_path), overlays=[abspath(o) for o in args.overlay]
+    )
+    findings = scan_history(Path(abspath(args.repository)), approved, args.rev)
+    if args.output:
+        with open(args.output, "w") as file:
+            for key, finding in findings.items():
+                file.write(json.dumps(finding_record(key, finding)) + "\n")
+    sys.exit(1 if report_history(findings) else 0)
+
+
+def run_inventory(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist inventory",
+        description="Keep every action reference of the scanned repositories in a SQLite "
+        "database, and query it.",
+    )
+    parser.add_argument("inventory_path", help="Path to the inventory database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update = subparsers.add_parser(
+        "update",
+        help="Scan repositories, storing the files whose content changed.",
+    )
+    update.add_argument("approved_path", help="Path to approved.json.")
+    update.add_argument(
+        "repositories",
+        nargs="+",
+        help="Repositories to scan (checkouts, git repositories or archives), or "
+        "directories of repositories when using --org.",
+    )
+    add_overlay_argument(update)
+    update.add_argument(
+        "--org",
+        action="store_true",
+        help="Scan every repository directly under the given directories, and drop "
+        "the repositories that are no longer there.",
+    )
+    update.add_argument(
+        "--ref",
+        help="Read workflow files from the git objects at this ref instead of the "
+        "working tree.",
+    )
+    update.add_argument(
+        "--yaml-backend",
+        choices=["auto", *BACKENDS],
+        default="auto",
+        help="YAML loader to use. 'auto' picks libyaml when it is available.",
+    )
+    add_limit_arguments(update)
+    action = subparsers.add_parser(
+        "action",
+        help="List the uses of owner/repo, owner/repo@version or owner/repo@prefix*.",
+    )
+    action.add_argument("action")
+    repository = subparsers.add_parser(
+        "repository", help="List the action uses of a repository, by path or name."
+    )
+    repository.add_argument("repository")
+    status = subparsers.add_parser(
+        "status", help="List the uses of actions with this verdict."
+    )
+    status.add_argument("verdict", choices=["approved", "deprecated", "denied"])
+    subparsers.add_parser(
+        "rejected", help="List the files rejected at the last update."
+    )
+    for query in (action, repository, status):
+        query.add_argument(
+            "--json", action="store_true", help="Write one JSON line per use."
+        )
+    args = parser.parse_args(argv)
+
+    from action_allowedlist.inventory import Inventory, format_use
+
+    with Inventory(abspath(args.inventory_path)) as inventory:
+        if args.command == "update":
+            update_inventory(inventory, args)
+            return
+        if args.command == "rejected":
+            for repository_path, path, reason in inventory.rejected_files():
+                print(f"{repository_path} {path}: {reason}")
+            return
+        if args.command == "action":
+            action_link, _, action_version = args.action.partition("@")
+            uses = inventory.uses_of_action(action_link, action_version or None)
+        elif args.command == "repository":
+            if Path(args.repository).exists():
+                args.repository = abspath(args.repository)
+            uses = inventory.uses_in_repository(args.repository)
+        else:
+            uses = inventory.uses_with_verdict(args.verdict)
 
-    main(workflow_directory, approved_path)
+    if args.json:
+        import json
+
+        for use in uses:
+            print(json.dumps(use._asdict()))
+    else:
+        for use in uses:
+            print(format_use(use))
+    sys.exit(0 if uses else 1)
+
+
+def update_inventory(inventory, args):
+    from action_allowedlist.approved_snapshot import load_approved_index
+    from action_allowedlist.org_scan import find_repositories
+    from action_allowedlist.yaml_backend import select_backend
+
+    select_backend(args.yaml_backend)
+    set_parse_limits(args)
+    approved = load_approved_index(
+        abspath(args.approved_path), overlays=[abspath(o) for o in args.overlay]
+    )
+    for path in args.repositories:
+        path = Path(abspath(path))
+        repositories = find_repositories(path) if args.org else [path]
+        for repository in repositories:
+            stats = inventory.update_repository(repository, args.ref)
+            print(
+                f"{repository}: {stats.parsed} files stored, {stats.unchanged} "
+                f"unchanged, {stats.removed} removed, {stats.rejected} rejected"
+            )
+        if args.org:
+            for removed in inventory.forget_repositories(repositories, path):
+                print(f"{removed}: removed")
+    print(f"Checked {inventory.update_verdicts(approved)} actions/versions")
+
+
+def run_serve(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist serve",
+        description="Answer validation requests over a Unix socket, keeping the approved "
+        "list and parsed workflows in memory.",
+    )
+    from action_allowedlist.server import default_socket_path
+
+    parser.add_argument("approved_path", help="Path to approved.json.")
+    add_overlay_argument(parser)
+    parser.add_argument(
+        "--socket",
+        default=str(default_socket_path()),
+        help="Socket path (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--yaml-backend",
+        choices=["auto", *BACKENDS],
+        default="auto",
+        help="YAML loader to use. 'auto' picks libyaml when it is available.",
+    )
+    add_limit_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from action_allowedlist.server import ValidationServer, ValidationService
+    from action_allowedlist.yaml_backend import select_backend
+
+    select_backend(args.yaml_backend)
+    set_parse_limits(args)
+    service = ValidationService(
+        abspath(args.approved_path), overlays=[abspath(o) for o in args.overlay]
+    )
+    # Load the list now so that a broken file fails at startup.
+    service.approved.get()
+    with ValidationServer(args.socket, service) as server:
+        print(f"Listening on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def run_client(argv):
+    parser = argparse.ArgumentParser(
+        prog="action_allowedlist client",
+        description="Check actions or workflow files with a running validation server.",
+    )
+    from action_allowedlist.server import default_socket_path, send_request
+
+    parser.add_argument(
+        "--socket",
+        default=str(default_socket_path()),
+        help="Socket path (default: %(default)s).",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    check = subparsers.add_parser("check", help="Check owner/repo@ref references.")
+    check.add_argument("actions", nargs="+")
+    validate = subparsers.add_parser("validate", help="Check workflow files.")
+    validate.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "check":
+            results = send_request(
+                args.socket, {"command": "check", "actions": args.actions}
+            )["results"]
+            found = print_verdicts("", results)
+        else:
+            found = False
+            for file in args.files:
+                try:
+                    workflow = Path(file).read_text()
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"{file}: cannot be read: {e}")
+                    found = True
+                    continue
+                response = send_request(
+                    args.socket, {"command": "validate", "workflow": workflow}
+                )
+                found = print_verdicts(f"{file}: ", response["results"]) or found
+                if "rejected" in response:
+                    print(
+                        f"{file}: rejected ({response['rejected']}): {response['reason']}"
+                    )
+                    found = True
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Validation server error ({args.socket}): {e}")
+        sys.exit(2)
+
+    sys.exit(1 if found else 0)
+
+
+def print_verdicts(prefix, results):
+    found = False
+    for result in results:
+        reference = f"{result['actionLink']}@{result['actionVersion']}"
+        jobs = f" (used in {', '.join(result['jobs'])})" if result.get("jobs") else ""
+        if not result["approved"]:
+            print(f"{prefix}{reference} is not approved{jobs}")
+            found = True
+        elif result["deprecated"]:
+            print(f"{prefix}{reference} is approved but deprecated{jobs}")
+        elif not prefix:
+            print(f"{reference} is approved")
+    return found
+
+
+COMMANDS = {
+    "compile": run_compile,
+    "validate-list": run_validate_list,
+    "verify": run_verify,
+    "history": run_history,
+    "inventory": run_inventory,
+    "serve": run_serve,
+    "client": run_client,
+}
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+    else:
+        run_scan(argv)
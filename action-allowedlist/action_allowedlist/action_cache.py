@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from action_allowedlist.files import atomic_write
+from action_allowedlist.workflow_outline import get_limits
+
+# Bump when get_actions_from_file changes what it extracts, so that entries
+# written by an older extractor are never reused.
+EXTRACTOR_VERSION = 4
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+class ActionCache:
+    """
+    On-disk cache of the actions extracted from a workflow file, keyed by the
+    SHA-256 of the file content. Entries are written atomically so several
+    processes or CI jobs can share one directory, and the least recently used
+    entries are evicted by prune() once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content: str):
+        # A file within one set of parse limits may be over another, so an
+        # entry is only reused under the limits it was parsed with.
+        limits = ",".join(map(str, get_limits()))
+        digest = hashlib.sha256(f"v{EXTRACTOR_VERSION}\0{limits}\0".encode())
+        digest.update(content.encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, content: str):
+        path = self._path(self.key(content))
+        try:
+            actions = json.loads(path.read_text())
+            # Refresh the modification time, which is what prune() orders by.
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return actions
+
+    def put(self, content: str, actions):
+        path = self._path(self.key(content))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        records = []
+        for a in actions:
+            record = {
+                "actionLink": a["actionLink"],
+                "actionVersion": a["actionVersion"],
+                "jobName": a["jobName"],
+            }
+            if getattr(a, "line", None) is not None:
+                record["line"] = a.line
+                record["column"] = a.column
+            records.append(record)
+        atomic_write(path, json.dumps(records))
+
+    def prune(self):
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
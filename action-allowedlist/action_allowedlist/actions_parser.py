@@ -3,10 +3,40 @@
 # The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
 # See the LICENSE and NOTICES files in the project root for more information.
 
+import io
 import json
-import yaml
+import logging
+import os
+from contextlib import redirect_stdout
+from functools import partial
 from pathlib import Path
 
+from action_allowedlist.approved_index import (  # noqa: F401
+    ApprovedIndex,
+    ApprovedVersion,
+)
+from action_allowedlist import metrics, timings
+from action_allowedlist.approved_snapshot import load_approved_index
+from action_allowedlist.git_diff import WORKFLOWS_PATH
+from action_allowedlist.local_actions import (
+    ACTION_FILE_NAMES,
+    DependencyGraph,
+    is_local_reference,
+)
+from action_allowedlist.log import logger
+from action_allowedlist.records import ActionReference, RejectedFile
+from action_allowedlist.rules import is_builtin, is_rule
+from action_allowedlist.workflow_outline import (
+    ResourceLimitError,
+    check_size,
+    get_limits,
+    load_outline,
+    set_limits,
+)
+from action_allowedlist.yaml_backend import get_backend, safe_load, select_backend
+
+WORKFLOW_SUFFIXES = (".yml", ".yaml")
+
 
 def load_json_file(filepath):
     with open(filepath, "r") as file:
@@ -16,142 +46,505 @@ def load_json_file(filepath):
 
 def load_yaml_file(filepath):
     with open(filepath, "r") as file:
-        return yaml.safe_load(file)
+        return safe_load(file)
+
+
+def add_action_reference(actions, uses, workflow_file_name, job_name):
+    line = getattr(uses, "line", None)
+    column = getattr(uses, "column", None)
+    # Local actions and reusable workflows have no version; they are followed
+    # by the dependency graph rather than checked against the approved list.
+    if uses.startswith("./"):
+        actions.append(
+            ActionReference(str(uses), None, workflow_file_name, job_name, line, column)
+        )
+        logger.debug("   Found local action used: [%s]", uses)
+        return
+
+    parts = uses.split("@")
+    if len(parts) == 2:
+        action_link, action_version = parts
+        actions.append(
+            ActionReference(
+                action_link,
+                action_version,
+                workflow_file_name,
+                job_name,
+                line,
+                column,
+            )
+        )
+        logger.debug("   Found action used: [%s]", uses)
 
 
 def get_actions_from_file(workflow, workflow_file_name):
-    parsed_yaml = yaml.safe_load(workflow)
+    with timings.step("parse"), metrics.parsing():
+        parsed_yaml = load_outline(workflow)
     actions = []
 
-    for job_name, job in parsed_yaml.get("jobs", {}).items():
-        print(f"  Job found: [{job_name}] in {workflow_file_name}")
+    jobs = parsed_yaml.get("jobs", {})
+    for job_name, job in jobs.items():
+        logger.debug("  Job found: [%s] in %s", job_name, workflow_file_name)
+        # A job that calls a reusable workflow has uses instead of steps.
+        if job.get("uses") is not None:
+            add_action_reference(actions, job["uses"], workflow_file_name, job_name)
         steps = job.get("steps", [])
+        timings.add_counts(steps=len(steps))
         for step in steps:
             uses = step.get("uses")
             if uses is not None:
-                parts = uses.split("@")
-                if len(parts) == 2:
-                    action_link, action_version = parts
-                    actions.append(
-                        {
-                            "actionLink": action_link,
-                            "actionVersion": action_version,
-                            "workflowFileName": workflow_file_name,
-                        }
-                    )
-                    print(f"   Found action used: [{uses}]")
+                add_action_reference(actions, uses, workflow_file_name, job_name)
 
+    # Composite actions (action.yml) list their steps under runs.
+    runs = parsed_yaml.get("runs") or {}
+    if runs.get("using") == "composite":
+        steps = runs.get("steps", [])
+        timings.add_counts(steps=len(steps))
+        for step in steps:
+            uses = step.get("uses")
+            if uses is not None:
+                add_action_reference(actions, uses, workflow_file_name, None)
+
+    timings.add_counts(jobs=len(jobs), references=len(actions))
     return actions
 
 
-def get_all_used_actions(workflow_dir: Path):
-    print("Loading Actions YAML files")
+def read_workflow_actions(workflow_file: Path, cache=None):
+    with timings.workflow_file(workflow_file.name):
+        return _read_workflow_actions(workflow_file, cache)
+
+
+def _read_workflow_actions(workflow_file: Path, cache):
+    # Checked before the file is read and hashed for the cache.
+    check_size(workflow_file.stat().st_size)
+    with timings.step("read"):
+        workflow_content = workflow_file.read_text()
+    metrics.inc("files_scanned")
+    if cache is None:
+        return get_actions_from_file(workflow_content, workflow_file.name), False
+
+    cached = cache.get(workflow_content)
+    if cached is not None:
+        metrics.inc("cache_hits")
+        actions = []
+        for action in cached:
+            actions.append(
+                ActionReference(
+                    action["actionLink"],
+                    action["actionVersion"],
+                    workflow_file.name,
+                    action["jobName"],
+                    action.get("line"),
+                    action.get("column"),
+                )
+            )
+            if action["actionVersion"] is None:
+                logger.debug("   Found local action used: [%s]", action["actionLink"])
+            else:
+                logger.debug(
+                    "   Found action used: [%s@%s]",
+                    action["actionLink"],
+                    action["actionVersion"],
+                )
+        timings.add_counts(cached=True, references=len(actions))
+        return actions, True
+
+    metrics.inc("cache_misses")
+    actions = get_actions_from_file(workflow_content, workflow_file.name)
+    cache.put(workflow_content, actions)
+    return actions, False
+
+
+def worker_settings():
+    """The settings of this process, as keyword arguments of init_worker."""
+    return {
+        "yaml_backend": get_backend(),
+        "parse_limits": get_limits(),
+        "record_timings": timings.is_enabled(),
+        "record_metrics": metrics.is_enabled(),
+        "log_level": logger.level,
+    }
+
+
+def init_worker(
+    *, yaml_backend, parse_limits, record_timings, record_metrics, log_level
+):
+    select_backend(yaml_backend)
+    set_limits(parse_limits)
+    logger.setLevel(log_level)
+    if record_timings and not timings.is_enabled():
+        timings.enable()
+    if record_metrics and not metrics.is_enabled():
+        metrics.enable()
+
+
+def parse_workflow_file(workflow_file: Path, cache=None):
+    # Runs in a worker process when parsing in parallel, so the output and
+    # timings are captured and returned to the parent to report in file order.
+    output = io.StringIO()
+    error = None
+    actions, cache_hit = [], False
+    try:
+        with redirect_stdout(output):
+            actions, cache_hit = read_workflow_actions(workflow_file, cache)
+    except Exception as e:
+        error = e
+    return (
+        actions,
+        cache_hit,
+        output.getvalue(),
+        error,
+        timings.collect_files(),
+        metrics.collect(),
+    )
+
+
+def get_repository_root(workflow_dir: Path):
     if (workflow_dir / ".github/workflows").exists():
-        workflow_files = list((workflow_dir / ".github/workflows").glob("*.yml"))
-    else:
-        workflow_files = list(
-            (workflow_dir / "testing-repo/.github/workflows").glob("*.yml")
-        )
+        return workflow_dir
+    return workflow_dir / "testing-repo"
+
+
+def find_workflow_files(workflow_dir: Path):
+    return sorted(
+        path
+        for path in (get_repository_root(workflow_dir) / ".github/workflows").glob("*")
+        if path.suffix in WORKFLOW_SUFFIXES
+    )
+
+
+def iter_used_actions(workflow_dir: Path, jobs=1, cache=None, workflow_files=None):
+    # Discovery runs straight away; the returned iterator parses each workflow
+    # file only when the consumer asks for its actions.
+    logger.info("Loading Actions YAML files")
+    logger.info("YAML backend: %s", get_backend())
+    if workflow_files is None:
+        with timings.phase("discovery"):
+            workflow_files = find_workflow_files(workflow_dir)
     if not workflow_files:
-        print("Could not find workflow files in the specified directory")
-        return []
+        logger.info("Could not find workflow files in the specified directory")
+        return iter(())
 
-    print(f"Found [{len(workflow_files)}] files in the workflows directory")
+    logger.info("Found [%d] files in the workflows directory", len(workflow_files))
+    graph = DependencyGraph(
+        get_repository_root(workflow_dir), partial(read_workflow_actions, cache=cache)
+    )
+    return _iter_used_actions(graph, workflow_files, jobs, cache)
 
-    actions_in_repo = []
 
-    for workflow_file in workflow_files:
-        try:
-            workflow_content = workflow_file.read_text()
-            actions = get_actions_from_file(workflow_content, workflow_file.name)
-            actions_in_repo.extend(actions)
-        except Exception as e:
-            print(f"Error occurred while reading {workflow_file}: {e}")
+def iter_tree_actions(tree, jobs=1, cache=None):
+    """
+    Like iter_used_actions, for a repository read from git objects or an
+    archive (see sources.py). The tree is closed once the actions are read.
+    """
+    logger.info("Loading Actions YAML files from %s", tree)
+    logger.info("YAML backend: %s", get_backend())
+    with timings.phase("discovery"):
+        workflow_files = tree.workflow_files()
+    if not workflow_files:
+        logger.info("Could not find workflow files in the specified directory")
+        tree.close()
+        return iter(())
 
-    return actions_in_repo
+    logger.info("Found [%d] files in the workflows directory", len(workflow_files))
+    graph = tree.dependency_graph(partial(read_workflow_actions, cache=cache))
+    return _close_after(tree, _iter_used_actions(graph, workflow_files, jobs, cache))
 
 
-def invoke_validate_actions(approved_path, actions_configuration):
-    print("Checking if used actions are approved")
+def _close_after(tree, actions):
+    with tree:
+        yield from actions
 
-    approved = load_json_file(approved_path)
-    num_approved = 0
-    num_denied = 0
-    num_deprecated = 0
-    unapproved_outputs = []
-    approved_outputs = []
-    found = False
 
-    for action in actions_configuration:
-        print(
-            f"::debug::Processing {action['actionLink']} version {action['actionVersion']}"
+def _iter_used_actions(graph, workflow_files, jobs, cache):
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+
+    for workflow_file, actions in _read_all_workflow_actions(
+        workflow_files, jobs, cache
+    ):
+        if isinstance(actions, RejectedFile):
+            yield actions
+            continue
+        graph.add(workflow_file, actions)
+        for action in actions:
+            if not is_local_reference(action):
+                yield action
+    yield from graph.followed_actions()
+
+    if cache is not None:
+        logger.info(
+            "Action cache: %d hits, %d misses",
+            cache.hits - hits,
+            cache.misses - misses,
         )
 
-        # Auto-approve any github/* or actions/* actions
-        if action["actionLink"].startswith("github/") or action[
-            "actionLink"
-        ].startswith("actions/"):
-            action_type = (
-                "github" if action["actionLink"].startswith("github/") else "actions"
+
+def _read_all_workflow_actions(workflow_files, jobs, cache):
+    if jobs > 1 and len(workflow_files) > 1:
+        # Imported here because it pulls in multiprocessing, which a serial
+        # scan does not need.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=partial(init_worker, **worker_settings()),
+        ) as executor:
+            results = executor.map(
+                partial(parse_workflow_file, cache=cache),
+                workflow_files,
+                chunksize=max(1, len(workflow_files) // (jobs * 4)),
             )
-            print(
-                f"::debug::Auto-approving {action_type} action: {action['actionLink']}"
+            for workflow_file, result in zip(workflow_files, results):
+                actions, cache_hit, output, error, files, recorded = result
+                print(output, end="")
+                timings.add_files(files)
+                metrics.merge(recorded)
+                if isinstance(error, ResourceLimitError):
+                    yield workflow_file, RejectedFile(workflow_file.name, str(error))
+                    continue
+                if error is not None:
+                    logger.warning(
+                        "Error occurred while reading %s: %s", workflow_file, error
+                    )
+                elif cache is not None:
+                    # The worker's counters live in another process.
+                    if cache_hit:
+                        cache.hits += 1
+                    else:
+                        cache.misses += 1
+                yield workflow_file, actions
+    else:
+        for workflow_file in workflow_files:
+            try:
+                actions, _ = read_workflow_actions(workflow_file, cache)
+            except ResourceLimitError as e:
+                yield workflow_file, RejectedFile(workflow_file.name, str(e))
+                continue
+            except Exception as e:
+                logger.warning("Error occurred while reading %s: %s", workflow_file, e)
+                continue
+            yield workflow_file, actions
+
+
+def get_all_used_actions(workflow_dir: Path, jobs=1, cache=None, workflow_files=None):
+    return list(iter_used_actions(workflow_dir, jobs, cache, workflow_files))
+
+
+def check_action(approved, action_link, action_version, debug=False):
+    logger.debug("Processing %s version %s", action_link, action_version)
+
+    if debug:
+        if action_link in approved:
+            logger.debug(
+                "Approved Versions for %s: %s",
+                action_link,
+                approved.versions(action_link),
             )
-            approved_outputs.append(
-                {
-                    "actionLink": action["actionLink"],
-                    "actionVersion": action["actionVersion"],
-                    "deprecated": False,
-                }
+        else:
+            logger.debug("No Approved versions for %s were found.", action_link)
+
+    approved_version = approved.lookup(action_link, action_version)
+    if approved_version is not None:
+        rule = approved_version.entries[0]
+        if is_builtin(rule):
+            action_type = action_link.split("/", 1)[0]
+            logger.debug("Auto-approving %s action: %s", action_type, action_link)
+        elif is_rule(rule):
+            logger.debug(
+                "Approved by rule %s@%s", rule["actionLink"], rule["actionVersion"]
             )
-            num_approved += 1
+        elif debug:
+            logger.debug("Output versions approved: %s", list(approved_version.entries))
+    else:
+        logger.debug(
+            "Output versions not approved: %s version %s", action_link, action_version
+        )
+    return approved_version
+
+
+def format_use_sites(uses):
+    jobs_by_file = {}
+    for action in uses:
+        if action.get("workflowFileName") is None:
             continue
+        jobs = jobs_by_file.setdefault(action["workflowFileName"], [])
+        job_name = action.get("jobName")
+        if job_name is not None and job_name not in jobs:
+            jobs.append(job_name)
+    return ", ".join(
+        f"{file} ({', '.join(jobs)})" if jobs else file
+        for file, jobs in jobs_by_file.items()
+    )
 
-        approved_action_versions = [
-            a for a in approved if a["actionLink"] == action["actionLink"]
-        ]
-        if approved_action_versions:
-            print(
-                f"::debug::Approved Versions for {action['actionLink']}: {[a['actionVersion'] for a in approved_action_versions]}"
+
+def validate_actions(approved, actions, debug=False):
+    """
+    Yields one result per action reference, as each one is read. The verdict
+    for an action@version is worked out once and reused for its other uses.
+    """
+    verdicts = {}
+    for action in actions:
+        if "rejected" in action:
+            yield {**action, "approved": False, "deprecated": False}
+            continue
+        key = (action["actionLink"], action["actionVersion"])
+        verdict = verdicts.get(key)
+        if verdict is None:
+            approved_version = check_action(approved, *key, debug)
+            verdict = verdicts[key] = (
+                approved_version is not None,
+                approved_version is not None and approved_version.deprecated,
             )
-        else:
-            print(
-                f"::debug::No Approved versions for {action['actionLink']} were found."
+        result = {
+            "actionLink": action["actionLink"],
+            "actionVersion": action["actionVersion"],
+            "workflowFileName": action.get("workflowFileName"),
+            "jobName": action.get("jobName"),
+            "approved": verdict[0],
+            "deprecated": verdict[1],
+        }
+        line = getattr(action, "line", None)
+        if line is not None:
+            result["line"] = line
+            result["column"] = action.column
+        yield result
+
+
+def annotation_properties(result):
+    """
+    The file and position of a result for a workflow command annotation, with
+    the file relative to the repository root.
+    """
+    name = result.get("workflowFileName")
+    if name is None:
+        return {}
+    # Local action definitions are already named by their path.
+    if "/" not in name and name not in ACTION_FILE_NAMES:
+        name = f"{WORKFLOWS_PATH}/{name}"
+    return {"file": name, "line": result.get("line"), "col": result.get("column")}
+
+
+def _annotated_uses(uses):
+    """
+    Yields (properties, count) for each distinct position of the uses. Aliases
+    of one anchored value all point at the anchor, so one position can stand
+    for many uses.
+    """
+    counts = {}
+    for use in uses:
+        if use.get("line") is not None:
+            key = tuple(annotation_properties(use).items())
+            counts[key] = counts.get(key, 0) + 1
+    for key, count in counts.items():
+        yield dict(key), count
+
+
+def _times(count):
+    return f" ({count} uses at this position)" if count > 1 else ""
+
+
+def _verdict(result):
+    if not result["approved"]:
+        return "denied"
+    return "deprecated" if result["deprecated"] else "approved"
+
+
+def invoke_validate_actions(approved_path, actions_configuration, on_result=None):
+    logger.info("Checking if used actions are approved")
+
+    if isinstance(approved_path, (str, os.PathLike)):
+        approved = load_approved_index(approved_path)
+    else:
+        approved = approved_path
+    num_approved = 0
+    num_deprecated = 0
+    # Only the uses of denied and deprecated actions are kept for the report.
+    denied_uses = {}
+    deprecated_uses = {}
+    rejected = []
+    # Checked once so the per-action debug arguments are only built when needed
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    for result in validate_actions(approved, actions_configuration, debug):
+        if on_result is not None:
+            on_result(result)
+        if "rejected" in result:
+            metrics.inc("files_rejected")
+            rejected.append(result)
+            continue
+        key = (result["actionLink"], result["actionVersion"])
+        metrics.inc("references")
+        metrics.inc("verdicts", action=result["actionLink"], verdict=_verdict(result))
+        if not result["approved"]:
+            denied_uses.setdefault(key, []).append(result)
+            continue
+        num_approved += 1
+        # Look for deprecation
+        if result["deprecated"]:
+            deprecated_uses.setdefault(key, []).append(result)
+            num_deprecated += 1
+
+    for (action_link, action_version), uses in deprecated_uses.items():
+        logger.info(
+            "Using a deprecated version of %s in %s",
+            action_link,
+            format_use_sites(uses),
+        )
+        for properties, count in _annotated_uses(uses):
+            logger.warning(
+                "%s@%s is deprecated%s",
+                action_link,
+                action_version,
+                _times(count),
+                extra={**properties, "title": "Deprecated Action"},
             )
-            pass
-
-        approved_output = [
-            a
-            for a in approved_action_versions
-            if a["actionVersion"] == action["actionVersion"]
-        ]
-
-        if approved_output:
-            print(f"::debug::Output versions approved: {approved_output}")
-            approved_outputs.append(approved_output[0])
-            num_approved += 1
-
-            # Look for deprecation
-            if approved_output[0].get("deprecated", False):
-                print(f"Using a deprecated version of {action['actionLink']}")
-                num_deprecated += 1
-        else:
-            print(
-                f"::debug::Output versions not approved: {action['actionLink']} version {action['actionVersion']}"
+
+    # Each use is annotated at its line, where GitHub shows it in the diff.
+    for (action_link, action_version), uses in denied_uses.items():
+        for properties, count in _annotated_uses(uses):
+            logger.error(
+                "%s@%s is not approved%s",
+                action_link,
+                action_version,
+                _times(count),
+                extra={**properties, "title": "Denied Action"},
             )
+
+    for result in rejected:
+        logger.error(
+            "Rejected %s (%s): %s",
+            result["workflowFileName"],
+            result["rejected"],
+            result["reason"],
+            extra={**annotation_properties(result), "title": "Rejected Workflow"},
+        )
+
+    if denied_uses:
+        unapproved_outputs = []
+        for (action_link, action_version), uses in denied_uses.items():
+            use_sites = format_use_sites(uses)
             unapproved_outputs.append(
-                f"{action['actionLink']} {action['actionVersion']}"
+                f"{action_link} {action_version} used in {use_sites}"
+                if use_sites
+                else f"{action_link} {action_version}"
             )
-            num_denied += 1
-            found = True
-
-    if num_denied > 0:
-        e = f"The following {num_denied} actions/versions were denied: {', '.join(unapproved_outputs)}"
-        print(f"::error file=actions_parser.py,title=Denied Actions::{e}")
-        return found
+        logger.error(
+            "The following %d actions/versions were denied:\n%s",
+            len(unapproved_outputs),
+            "\n".join(f"  {output}" for output in unapproved_outputs),
+            extra={"title": "Denied Actions"},
+        )
+        return True
+    elif rejected:
+        # The actions of a rejected file are unknown, so it cannot pass.
+        return True
     else:
-        print(f"All {num_approved} actions/versions are approved.")
+        logger.info("All %d actions/versions are approved.", num_approved)
         if num_deprecated > 0:
-            e = f"Deprecated actions found: {num_deprecated}"
-            print(f"::warning file=actions_parser.py,title=Deprecated Actions::{e}")
-        return found
+            logger.warning(
+                "Deprecated actions found: %d",
+                num_deprecated,
+                extra={"title": "Deprecated Actions"},
+            )
+        return False
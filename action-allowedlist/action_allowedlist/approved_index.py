@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import json
+from typing import NamedTuple
+
+from action_allowedlist.records import ApprovedEntry
+from action_allowedlist.rules import RuleMatcher, is_rule
+
+
+class ApprovedVersion(NamedTuple):
+    deprecated: bool
+    tag: str | None
+    entries: tuple
+
+
+def approved_by_rule(rule):
+    return ApprovedVersion(
+        deprecated=rule.get("deprecated", False),
+        tag=rule.get("tag"),
+        entries=(rule,),
+    )
+
+
+class ApprovedIndex:
+    """
+    Approved actions keyed by actionLink, then by actionVersion, so that each
+    check is a dictionary lookup instead of a scan of the whole approved list.
+    Wildcard and deny entries are compiled into a RuleMatcher, consulted when
+    there is no exact entry.
+    """
+
+    def __init__(self, approved):
+        rules = []
+        self._by_link = {}
+        for entry in map(ApprovedEntry.from_dict, approved):
+            if is_rule(entry):
+                rules.append(entry)
+                continue
+            by_version = self._by_link.setdefault(entry["actionLink"], {})
+            by_version.setdefault(entry["actionVersion"], []).append(entry)
+
+        self._records = {}
+        self._versions = {}
+        for action_link, by_version in self._by_link.items():
+            self._versions[action_link] = [
+                entry["actionVersion"]
+                for entries in by_version.values()
+                for entry in entries
+            ]
+            for action_version, entries in by_version.items():
+                self._records[(action_link, action_version)] = ApprovedVersion(
+                    deprecated=entries[0].get("deprecated", False),
+                    tag=entries[0].get("tag"),
+                    entries=tuple(entries),
+                )
+        self.rules = RuleMatcher(rules)
+
+    @classmethod
+    def from_file(cls, filepath):
+        with open(filepath, "r") as file:
+            return cls(json.load(file))
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, action_link):
+        return action_link in self._by_link
+
+    def versions(self, action_link):
+        return self._versions.get(action_link, [])
+
+    def lookup(self, action_link, action_version):
+        record = self._records.get((action_link, action_version))
+        if record is None:
+            rule = self.rules.match(action_link, action_version)
+            if rule is not None:
+                record = approved_by_rule(rule)
+        return record
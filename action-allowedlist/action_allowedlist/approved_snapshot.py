@@ -0,0 +1,244 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# A snapshot is a header followed by a table of fixed-size records sorted by
+# their encoded (actionLink, actionVersion) key, and a blob area holding the
+# keys and the original approved.json entries. It is read through mmap, so a
+# lookup is a binary search over the mapped file, and processes that open the
+# same snapshot share its pages instead of each decoding approved.json.
+# Approval rules are stored apart as a single JSON array and compiled into a
+# RuleMatcher when the snapshot is opened.
+
+import json
+import mmap
+import struct
+from pathlib import Path
+
+from action_allowedlist.approved_index import (
+    ApprovedIndex,
+    ApprovedVersion,
+    approved_by_rule,
+)
+from action_allowedlist.files import atomic_write
+from action_allowedlist.layers import Layers
+from action_allowedlist.log import logger
+from action_allowedlist.records import ApprovedEntry
+from action_allowedlist.rules import RuleMatcher, is_rule
+
+MAGIC = b"AALSNAP2"
+# magic, source hash, record count, rules offset, rules length
+HEADER = struct.Struct("<8s32sIII")
+# key offset, key length, file order, entries offset, entries length
+RECORD = struct.Struct("<IIIII")
+
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+def snapshot_path_for(approved_path):
+    approved_path = Path(approved_path)
+    return approved_path.with_name(approved_path.name + SNAPSHOT_SUFFIX)
+
+
+def merged_snapshot_path(directory, source_hash):
+    # Merged lists are keyed by the hash of all their layers, so each
+    # combination of overlays gets its own snapshot.
+    return Path(directory) / f"approved-{source_hash.hex()[:32]}{SNAPSHOT_SUFFIX}"
+
+
+def _link_prefix(action_link):
+    return f"{action_link}\0".encode()
+
+
+def _encode_key(action_link, action_version):
+    # A null actionVersion (local actions) must not collide with "".
+    if action_version is None:
+        return _link_prefix(action_link) + b"\0"
+    return _link_prefix(action_link) + b"\1" + action_version.encode()
+
+
+def compile_snapshot(approved_path, snapshot_path=None, overlays=()):
+    layers = Layers(approved_path, overlays)
+    if snapshot_path is None:
+        if overlays:
+            snapshot_path = merged_snapshot_path(
+                layers.paths[0].parent, layers.source_hash
+            )
+        else:
+            snapshot_path = snapshot_path_for(approved_path)
+    return write_snapshot(layers.entries(), layers.source_hash, snapshot_path)
+
+
+def write_snapshot(approved, source_hash, snapshot_path):
+    snapshot_path = Path(snapshot_path)
+    rules = []
+    grouped = {}
+    for entry in approved:
+        if is_rule(entry):
+            rules.append(entry)
+            continue
+        key = (entry["actionLink"], entry["actionVersion"])
+        grouped.setdefault(key, []).append(entry)
+
+    records = sorted(
+        (_encode_key(*key), order, entries)
+        for order, (key, entries) in enumerate(grouped.items())
+    )
+
+    blob = bytearray()
+    table = bytearray()
+    blob_start = HEADER.size + RECORD.size * len(records)
+    for key, order, entries in records:
+        encoded_entries = json.dumps(entries, separators=(",", ":")).encode()
+        key_offset = blob_start + len(blob)
+        blob += key
+        entries_offset = blob_start + len(blob)
+        blob += encoded_entries
+        table += RECORD.pack(
+            key_offset,
+            len(key),
+            order,
+            entries_offset,
+            len(encoded_entries),
+        )
+    encoded_rules = json.dumps(rules, separators=(",", ":")).encode()
+    rules_offset = blob_start + len(blob)
+    blob += encoded_rules
+
+    header = HEADER.pack(
+        MAGIC, source_hash, len(records), rules_offset, len(encoded_rules)
+    )
+    atomic_write(snapshot_path, header + table + blob)
+    return snapshot_path
+
+
+class ApprovedSnapshot:
+    """Memory-mapped, read-only counterpart of ApprovedIndex."""
+
+    def __init__(self, snapshot_path):
+        self.path = Path(snapshot_path)
+        with open(self.path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{self.path} is not an approved list snapshot")
+        magic, self.source_hash, self._count, rules_offset, rules_length = (
+            HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an approved list snapshot")
+        self.rules = RuleMatcher(
+            map(
+                ApprovedEntry.from_dict,
+                json.loads(self._mm[rules_offset : rules_offset + rules_length]),
+            )
+        )
+        self._records = {}
+        self._versions = {}
+
+    def __reduce__(self):
+        # Worker processes map the file themselves rather than receiving a copy.
+        return (ApprovedSnapshot, (self.path,))
+
+    def __len__(self):
+        return self._count
+
+    def _record(self, position):
+        return RECORD.unpack_from(self._mm, HEADER.size + RECORD.size * position)
+
+    def _key(self, position):
+        key_offset, key_length, *_ = self._record(position)
+        return self._mm[key_offset : key_offset + key_length]
+
+    def _bisect(self, key):
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _entries(self, position):
+        _, _, _, entries_offset, entries_length = self._record(position)
+        return json.loads(self._mm[entries_offset : entries_offset + entries_length])
+
+    def __contains__(self, action_link):
+        prefix = _link_prefix(action_link)
+        position = self._bisect(prefix)
+        return position < self._count and self._key(position).startswith(prefix)
+
+    def versions(self, action_link):
+        if action_link in self._versions:
+            return self._versions[action_link]
+
+        prefix = _link_prefix(action_link)
+        found = []
+        position = self._bisect(prefix)
+        while position < self._count and self._key(position).startswith(prefix):
+            order = self._record(position)[2]
+            entries = self._entries(position)
+            found.append((order, [entry["actionVersion"] for entry in entries]))
+            position += 1
+        versions = [version for _, group in sorted(found) for version in group]
+        self._versions[action_link] = versions
+        return versions
+
+    def lookup(self, action_link, action_version):
+        key = (action_link, action_version)
+        if key in self._records:
+            return self._records[key]
+
+        record = None
+        encoded_key = _encode_key(action_link, action_version)
+        position = self._bisect(encoded_key)
+        if position < self._count and self._key(position) == encoded_key:
+            entries = self._entries(position)
+            record = ApprovedVersion(
+                deprecated=entries[0].get("deprecated", False),
+                tag=entries[0].get("tag"),
+                entries=tuple(map(ApprovedEntry.from_dict, entries)),
+            )
+        else:
+            rule = self.rules.match(action_link, action_version)
+            if rule is not None:
+                record = approved_by_rule(rule)
+        self._records[key] = record
+        return record
+
+
+def load_approved_index(approved_path, snapshot_path=None, overlays=(), cache_dir=None):
+    """
+    Returns the index of approved.json merged with the overlays, read from a
+    snapshot of the same inputs when there is one. A merged list is written
+    as a snapshot to cache_dir for the next run.
+    """
+    layers = Layers(approved_path, overlays)
+    if snapshot_path is None:
+        if overlays:
+            snapshot_path = merged_snapshot_path(
+                cache_dir or layers.paths[0].parent, layers.source_hash
+            )
+        else:
+            snapshot_path = snapshot_path_for(approved_path)
+    snapshot_path = Path(snapshot_path)
+    if snapshot_path.exists():
+        try:
+            snapshot = ApprovedSnapshot(snapshot_path)
+        except ValueError as e:
+            logger.info("Ignoring approved list snapshot: %s", e)
+        else:
+            if snapshot.source_hash == layers.source_hash:
+                return snapshot
+            logger.info("Ignoring out of date approved list snapshot %s", snapshot_path)
+
+    approved = layers.entries()
+    if overlays and cache_dir is not None:
+        try:
+            return ApprovedSnapshot(
+                write_snapshot(approved, layers.source_hash, snapshot_path)
+            )
+        except OSError as e:
+            logger.info("Could not cache the merged approved list: %s", e)
+    return ApprovedIndex(approved)
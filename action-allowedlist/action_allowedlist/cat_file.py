@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# A long-running `git cat-file` process answering many object names in
+# batches, shared by the mirror resolver, git trees and the history audit.
+# cat-file reads one name per line, so a name holding a newline would be taken
+# as two requests and shift every later answer; such names are refused.
+
+import subprocess
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+
+# Requests written to cat-file before reading its answers. Kept small enough
+# that the requests, and the answers of --batch-check, fit in the pipe buffer,
+# so neither side waits for the other.
+BATCH_SIZE = 256
+
+
+class GitObject(NamedTuple):
+    oid: str
+    type: str
+    size: int
+    # None when only the object info was asked for.
+    content: bytes | None
+
+
+def is_safe_name(name: str):
+    return "\n" not in name and "\0" not in name
+
+
+class CatFile:
+    """
+    A `git cat-file --batch` process for one repository, or `--batch-check`
+    when contents=False.
+    """
+
+    def __init__(self, repository: Path, contents=True):
+        self.repository = repository
+        self.contents = contents
+        self.process = subprocess.Popen(
+            [
+                "git",
+                "-c",
+                "safe.directory=*",
+                "-C",
+                str(repository),
+                "cat-file",
+                "--batch" if contents else "--batch-check",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def query(self, names):
+        """Returns a GitObject for each object name, or None when it does not exist."""
+        return list(self.iter_query(names))
+
+    def iter_query(self, names):
+        # Objects are yielded batch by batch, so a long list of names is not
+        # all held in memory with its contents.
+        stdin, stdout = self.process.stdin, self.process.stdout
+        names = iter(names)
+        while True:
+            batch = list(islice(names, BATCH_SIZE))
+            if not batch:
+                return
+            for name in batch:
+                if not is_safe_name(name):
+                    raise ValueError(f"Not an object name: {name!r}")
+            stdin.write(b"".join(f"{name}\n".encode() for name in batch))
+            stdin.flush()
+            for _ in batch:
+                header = stdout.readline().split()
+                if not header:
+                    raise RuntimeError(f"git cat-file exited in {self.repository}")
+                # "<name> missing", or "<oid> <type> <size>" and the content
+                if len(header) != 3 or not header[2].isdigit():
+                    yield None
+                    continue
+                size = int(header[2])
+                content = None
+                if self.contents:
+                    content = stdout.read(size)
+                    stdout.read(1)
+                yield GitObject(header[0].decode(), header[1].decode(), size, content)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import subprocess
+from pathlib import Path
+
+from action_allowedlist.log import logger
+
+WORKFLOWS_PATH = ".github/workflows"
+
+
+def run_git(repository: Path, *args):
+    # Inside the Docker action the workspace is owned by the runner user, not
+    # by the container user, so git's ownership check has to be relaxed.
+    result = subprocess.run(
+        ["git", "-c", "safe.directory=*", "-C", str(repository), *args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"git {' '.join(args)} failed in {repository}: {result.stderr.strip()}"
+        )
+    return result.stdout
+
+
+def get_changed_files(repository: Path, base_ref, head_ref, paths):
+    # The three-dot form compares head with its merge base, which is what a
+    # pull request shows as its changes.
+    output = run_git(
+        repository,
+        "diff",
+        "--name-only",
+        "-z",
+        "--diff-filter=AMR",
+        f"{base_ref}...{head_ref}",
+        "--",
+        *paths,
+    )
+    return [name for name in output.split("\0") if name]
+
+
+def get_changed_workflow_files(repository: Path, base_ref, head_ref="HEAD"):
+    return sorted(
+        repository / name
+        for name in get_changed_files(repository, base_ref, head_ref, [WORKFLOWS_PATH])
+        if Path(name).parent.as_posix() == WORKFLOWS_PATH
+        and name.endswith((".yml", ".yaml"))
+    )
+
+
+def get_changed_definition_files(repository: Path, base_ref, head_ref="HEAD"):
+    """
+    The YAML files changed outside the workflows directory. Any of them may be
+    a local composite action (action.yml) or a file a workflow refers to with
+    `uses: ./...`, so the workflows using it have to be checked again.
+    """
+    return sorted(
+        name
+        for name in get_changed_files(
+            repository, base_ref, head_ref, ["*.yml", "*.yaml"]
+        )
+        if Path(name).parent.as_posix() != WORKFLOWS_PATH
+    )
+
+
+def get_incremental_workflow_files(
+    repository: Path, approved_paths, base_ref, head_ref="HEAD"
+):
+    """
+    The workflow files to scan for the changes between base_ref and head_ref,
+    or None when every workflow file has to be scanned.
+    """
+    logger.info("Comparing %s...%s", base_ref, head_ref)
+    if any(
+        has_changed(repository, base_ref, head_ref, path) for path in approved_paths
+    ):
+        logger.info("The approval file changed, scanning all workflow files")
+        return None
+    definitions = get_changed_definition_files(repository, base_ref, head_ref)
+    if definitions:
+        # Finding the workflows that use them would mean reading every
+        # workflow anyway.
+        logger.info(
+            "Files that may be local actions changed (%s), scanning all workflow files",
+            ", ".join(definitions),
+        )
+        return None
+
+    workflow_files = get_changed_workflow_files(repository, base_ref, head_ref)
+    logger.info("Found [%d] added or modified workflow files", len(workflow_files))
+    return workflow_files
+
+
+def has_changed(repository: Path, base_ref, head_ref, path: Path):
+    toplevel = Path(run_git(repository, "rev-parse", "--show-toplevel").strip())
+    try:
+        relative_path = path.resolve().relative_to(toplevel.resolve())
+    except ValueError:
+        # The file is not part of this repository, e.g. the approved list baked
+        # into the container image.
+        return False
+    return bool(
+        run_git(
+            toplevel,
+            "diff",
+            "--name-only",
+            f"{base_ref}...{head_ref}",
+            "--",
+            relative_path.as_posix(),
+        ).strip()
+    )
@@ -0,0 +1,263 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Audits every revision of a repository for actions that are not approved,
+# reading only the .github/workflows trees and blobs from the object store.
+# Most revisions share their workflow files, so each distinct tree and blob is
+# read and parsed once, however many commits contain it.
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from action_allowedlist.actions_parser import (
+    WORKFLOW_SUFFIXES,
+    check_action,
+    get_actions_from_file,
+)
+from action_allowedlist.cat_file import CatFile
+from action_allowedlist.git_diff import WORKFLOWS_PATH, run_git
+from action_allowedlist.log import logger
+from action_allowedlist.records import RejectedFile
+from action_allowedlist.workflow_outline import ResourceLimitError, check_size
+
+# Regular and executable files; symbolic links and submodules are skipped.
+BLOB_MODES = (b"100644", b"100755")
+
+
+def list_commits(repository: Path, revisions=()):
+    """Returns (sha, commit time) for each commit, oldest first."""
+    output = run_git(
+        repository,
+        "log",
+        "--date-order",
+        "--reverse",
+        "--format=%H %ct",
+        *(revisions or ["--all"]),
+        "--",
+    )
+    commits = []
+    for line in output.splitlines():
+        sha, timestamp = line.split()
+        commits.append((sha, int(timestamp)))
+    return commits
+
+
+def list_ref_tips(repository: Path):
+    output = run_git(
+        repository,
+        "for-each-ref",
+        "--format=%(objectname) %(refname:short)",
+        "refs/heads",
+        "refs/remotes",
+    )
+    tips = {}
+    for line in output.splitlines():
+        sha, name = line.split(" ", 1)
+        tips.setdefault(sha, []).append(name)
+    return tips
+
+
+def parse_tree(content: bytes, oid_size: int):
+    """Returns (name, blob oid) of the workflow files in a tree object."""
+    files = []
+    position = 0
+    while position < len(content):
+        space = content.index(b" ", position)
+        end = content.index(b"\0", space)
+        mode = content[position:space]
+        name = content[space + 1 : end].decode()
+        oid = content[end + 1 : end + 1 + oid_size].hex()
+        position = end + 1 + oid_size
+        if mode in BLOB_MODES and name.endswith(WORKFLOW_SUFFIXES):
+            files.append((name, oid))
+    return files
+
+
+class HistoryFinding:
+    """
+    Where a denied action and version, or a rejected workflow file, appeared
+    in the history.
+    """
+
+    __slots__ = ("first", "last", "commits", "files", "refs", "rejected")
+
+    def __init__(self, commit, rejected=None):
+        self.first = commit
+        self.last = commit
+        self.commits = 0
+        self.files = []
+        self.refs = []
+        # The RejectedFile of a blob that was not parsed.
+        self.rejected = rejected
+
+    def add(self, commit, file_name, refs):
+        self.last = commit
+        if file_name not in self.files:
+            self.files.append(file_name)
+        for ref in refs:
+            if ref not in self.refs:
+                self.refs.append(ref)
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def scan_history(repository: Path, approved, revisions=()):
+    """
+    Returns a dict of HistoryFinding by (actionLink, actionVersion) for the
+    actions used by any commit that the approved index does not approve, and
+    by blob oid for the workflow files rejected for being over a parse limit.
+    """
+    repository = Path(repository)
+    commits = list_commits(repository, revisions)
+    tips = list_ref_tips(repository)
+    logger.info("Commits to scan: %d", len(commits))
+
+    trees = {}
+    blobs = {}
+    verdicts = {}
+    findings = {}
+    batch = CatFile(repository)
+    check = CatFile(repository, contents=False)
+    try:
+        commit_trees = []
+        for (sha, _), tree in zip(
+            commits,
+            batch.iter_query(f"{sha}:{WORKFLOWS_PATH}" for sha, _ in commits),
+        ):
+            if tree is None or tree.type != "tree":
+                continue
+            if tree.oid not in trees:
+                trees[tree.oid] = parse_tree(tree.content, len(tree.oid) // 2)
+            commit_trees.append((sha, tree.oid))
+
+        needed = sorted({oid for files in trees.values() for _, oid in files})
+        readable = []
+        # Sizes are asked for first, so that a blob over the size limit is
+        # never read.
+        for oid, info in zip(needed, check.iter_query(needed)):
+            try:
+                check_size(info.size)
+            except ResourceLimitError as e:
+                blobs[oid] = RejectedFile(oid, str(e))
+                continue
+            readable.append(oid)
+        for oid, blob in zip(readable, batch.iter_query(readable)):
+            blobs[oid] = _read_blob_actions(oid, blob)
+    finally:
+        batch.close()
+        check.close()
+    logger.info(
+        "Read %d distinct workflow directories and %d distinct workflow files",
+        len(trees),
+        len(blobs),
+    )
+
+    commit_times = dict(commits)
+    for sha, tree_oid in commit_trees:
+        commit = (sha, commit_times[sha])
+        seen = set()
+        for name, oid in trees[tree_oid]:
+            if isinstance(blobs[oid], RejectedFile):
+                finding = findings.get(oid)
+                if finding is None:
+                    finding = findings[oid] = HistoryFinding(commit, blobs[oid])
+                finding.commits += 1
+                finding.add(commit, name, tips.get(sha, ()))
+                continue
+            for action in blobs[oid]:
+                key = (action["actionLink"], action["actionVersion"])
+                if key not in verdicts:
+                    verdicts[key] = check_action(approved, *key) is not None
+                if verdicts[key]:
+                    continue
+                finding = findings.get(key)
+                if finding is None:
+                    finding = findings[key] = HistoryFinding(commit)
+                if key not in seen:
+                    finding.commits += 1
+                    seen.add(key)
+                finding.add(commit, name, tips.get(sha, ()))
+    return findings
+
+
+def _read_blob_actions(oid, blob):
+    if blob is None:
+        return []
+    try:
+        actions = get_actions_from_file(blob.content.decode(), oid)
+    except ResourceLimitError as e:
+        # Its actions are unknown, so it is reported rather than skipped.
+        return RejectedFile(oid, str(e))
+    except Exception as e:
+        # An old revision may well hold a broken workflow file.
+        logger.debug("Skipping workflow file blob %s: %s", oid, e)
+        return []
+    # Local actions are not followed in history; only workflow files are read.
+    return [action for action in actions if action["actionVersion"] is not None]
+
+
+def finding_record(key, finding: HistoryFinding):
+    if finding.rejected is not None:
+        subject = {
+            "blob": key,
+            "rejected": finding.rejected.rejected,
+            "reason": finding.rejected.reason,
+        }
+    else:
+        subject = {"actionLink": key[0], "actionVersion": key[1]}
+    return {
+        **subject,
+        "firstCommit": finding.first[0],
+        "firstCommitDate": _format_time(finding.first[1]),
+        "lastCommit": finding.last[0],
+        "lastCommitDate": _format_time(finding.last[1]),
+        "commits": finding.commits,
+        "workflowFileNames": finding.files,
+        "refs": finding.refs,
+    }
+
+
+def _format_finding(record):
+    if "blob" in record:
+        subject = (
+            f"blob {record['blob'][:12]} ({record['rejected']}: {record['reason']})"
+        )
+    else:
+        subject = f"{record['actionLink']} {record['actionVersion']}"
+    return (
+        f"{subject}: "
+        f"first {record['firstCommit'][:12]} ({record['firstCommitDate']}), "
+        f"last {record['lastCommit'][:12]} ({record['lastCommitDate']}), "
+        f"{record['commits']} commits, in {', '.join(record['workflowFileNames'])}"
+        + (f"; still used by {', '.join(record['refs'])}" if record["refs"] else "")
+    )
+
+
+def report_history(findings):
+    denied = []
+    rejected = []
+    for key, finding in findings.items():
+        line = _format_finding(finding_record(key, finding))
+        (denied if finding.rejected is None else rejected).append(line)
+    if not denied:
+        logger.info("No denied actions were used in the scanned history.")
+    else:
+        logger.error(
+            "The following %d denied actions/versions were used in the history:\n%s",
+            len(denied),
+            "\n".join(f"  {line}" for line in denied),
+            extra={"title": "Denied Actions in History"},
+        )
+    if rejected:
+        # Their actions are unknown, so the history cannot pass.
+        logger.error(
+            "The following %d workflow files in the history were not parsed:\n%s",
+            len(rejected),
+            "\n".join(f"  {line}" for line in rejected),
+            extra={"title": "Rejected Workflows in History"},
+        )
+    return bool(findings)
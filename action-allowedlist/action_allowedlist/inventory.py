@@ -0,0 +1,375 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# A SQLite inventory of every action reference in the scanned repositories, so
+# that questions such as "which workflows use this action" are answered from
+# indexes instead of by scanning again. Files are keyed by repository and path
+# with the hash of their content; an update only parses and rewrites the files
+# whose content changed, and drops those that are gone. Verdicts are kept per
+# action and version, against the approved list of the latest update.
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from action_allowedlist.action_cache import EXTRACTOR_VERSION
+from action_allowedlist.actions_parser import (
+    check_action,
+    find_workflow_files,
+    get_actions_from_file,
+    get_repository_root,
+)
+from action_allowedlist.local_actions import DependencyGraph
+from action_allowedlist.log import logger
+from action_allowedlist.records import ActionReference
+from action_allowedlist.sources import open_tree
+from action_allowedlist.workflow_outline import ResourceLimitError, check_size
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    repository TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    rejected TEXT,
+    updated REAL NOT NULL,
+    UNIQUE (repository, path)
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (name);
+CREATE TABLE IF NOT EXISTS uses (
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    job TEXT,
+    action_link TEXT NOT NULL,
+    action_version TEXT,
+    line INTEGER,
+    col INTEGER
+);
+CREATE INDEX IF NOT EXISTS uses_action ON uses (action_link, action_version);
+CREATE INDEX IF NOT EXISTS uses_file ON uses (file_id);
+CREATE TABLE IF NOT EXISTS verdicts (
+    action_link TEXT NOT NULL,
+    action_version TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    PRIMARY KEY (action_link, action_version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS verdicts_verdict ON verdicts (verdict);
+"""
+
+USES_QUERY = """
+SELECT files.repository, files.path, uses.job, uses.action_link,
+       uses.action_version, uses.line, uses.col, verdicts.verdict
+FROM uses
+JOIN files ON files.id = uses.file_id
+LEFT JOIN verdicts
+  ON verdicts.action_link = uses.action_link
+ AND verdicts.action_version = uses.action_version
+"""
+ORDER = " ORDER BY files.repository, files.path, uses.line"
+
+
+def content_hash(content: str):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _version_range(prefix):
+    # The versions starting with prefix, as a range an index can be read by.
+    if not prefix:
+        return "", "\U0010ffff"
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class UpdateStats:
+    __slots__ = ("parsed", "unchanged", "removed", "rejected")
+
+    def __init__(self):
+        self.parsed = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.rejected = 0
+
+
+class Inventory:
+    """
+    The inventory database. Each repository is updated in one transaction,
+    and the database is in WAL mode so it can be queried during an update.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self._create()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _create(self):
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+            if meta.get("schema", str(SCHEMA_VERSION)) != str(SCHEMA_VERSION):
+                raise ValueError(
+                    f"{self.path}: inventory schema version {meta['schema']}, "
+                    f"expected {SCHEMA_VERSION}"
+                )
+            if meta.get("extractor") != str(EXTRACTOR_VERSION):
+                # Files read by another extractor are parsed again.
+                self.connection.execute("UPDATE files SET content_hash = ''")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                [("schema", SCHEMA_VERSION), ("extractor", EXTRACTOR_VERSION)],
+            )
+
+    def update_repository(self, repository: Path, ref=None):
+        """
+        Reads the workflow files of a repository, and the local actions and
+        reusable workflows they use, storing those that changed.
+        """
+        repository = Path(repository)
+        with self.connection:
+            update = _RepositoryUpdate(self.connection, repository)
+            tree = open_tree(repository, ref)
+            if tree is None:
+                graph = DependencyGraph(get_repository_root(repository), update.read)
+                workflow_files = find_workflow_files(repository)
+            else:
+                graph = tree.dependency_graph(update.read)
+                workflow_files = tree.workflow_files()
+            update.graph = graph
+            try:
+                for workflow_file in workflow_files:
+                    try:
+                        actions, _ = update.read(workflow_file)
+                    except ResourceLimitError:
+                        continue
+                    except Exception as e:
+                        logger.warning(
+                            "Error occurred while reading %s: %s", workflow_file, e
+                        )
+                        continue
+                    graph.add(workflow_file, actions)
+                graph.resolve()
+            finally:
+                if tree is not None:
+                    tree.close()
+            update.remove_missing()
+        return update.stats
+
+    def forget_repositories(self, keep, parent: Path):
+        """Removes the repositories under parent that are not in keep."""
+        keep = {str(repository) for repository in keep}
+        removed = [
+            repository
+            for (repository,) in self.connection.execute(
+                "SELECT DISTINCT repository FROM files"
+            )
+            if Path(repository).parent == parent and repository not in keep
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM files WHERE repository = ?",
+                [(repository,) for repository in removed],
+            )
+        return removed
+
+    def update_verdicts(self, approved):
+        """Checks every action and version in the inventory against approved."""
+        verdicts = []
+        for action_link, action_version in self.connection.execute(
+            "SELECT DISTINCT action_link, action_version FROM uses "
+            "WHERE action_version IS NOT NULL"
+        ):
+            approved_version = check_action(approved, action_link, action_version)
+            if approved_version is None:
+                verdict = "denied"
+            elif approved_version.deprecated:
+                verdict = "deprecated"
+            else:
+                verdict = "approved"
+            verdicts.append((action_link, action_version, verdict))
+        with self.connection:
+            self.connection.execute("DELETE FROM verdicts")
+            self.connection.executemany(
+                "INSERT INTO verdicts VALUES (?, ?, ?)", verdicts
+            )
+        return len(verdicts)
+
+    def uses_of_action(self, action_link, action_version=None):
+        """
+        The uses of an action, of one version of it, or of the versions
+        starting with a prefix when action_version ends with *.
+        """
+        if action_version is None:
+            return self._uses("WHERE uses.action_link = ?", action_link)
+        if action_version.endswith("*"):
+            low, high = _version_range(action_version[:-1])
+            return self._uses(
+                "WHERE uses.action_link = ? "
+                "AND uses.action_version >= ? AND uses.action_version < ?",
+                action_link,
+                low,
+                high,
+            )
+        return self._uses(
+            "WHERE uses.action_link = ? AND uses.action_version = ?",
+            action_link,
+            action_version,
+        )
+
+    def uses_in_repository(self, repository):
+        """The uses in a repository, given by its path or its name."""
+        return self._uses(
+            "WHERE files.repository = ? OR files.name = ?", repository, repository
+        )
+
+    def uses_with_verdict(self, verdict):
+        return self._uses("WHERE verdicts.verdict = ?", verdict)
+
+    def rejected_files(self):
+        return self.connection.execute(
+            "SELECT repository, path, rejected FROM files "
+            "WHERE rejected IS NOT NULL ORDER BY repository, path"
+        ).fetchall()
+
+    def _uses(self, where, *parameters):
+        return [
+            UseRecord(*row)
+            for row in self.connection.execute(USES_QUERY + where + ORDER, parameters)
+        ]
+
+
+class UseRecord(NamedTuple):
+    # Named like the fields of a scan result.
+    repository: str
+    workflowFileName: str
+    jobName: str | None
+    actionLink: str
+    actionVersion: str | None
+    line: int | None
+    column: int | None
+    verdict: str | None
+
+
+def format_use(use: UseRecord):
+    location = use.workflowFileName
+    if use.line is not None:
+        location += f":{use.line}:{use.column}"
+    reference = use.actionLink
+    if use.actionVersion is not None:
+        reference += f"@{use.actionVersion}"
+    job = f" ({use.jobName})" if use.jobName is not None else ""
+    verdict = f" {use.verdict}" if use.verdict is not None else ""
+    return f"{use.repository} {location}{job}: {reference}{verdict}"
+
+
+class _RepositoryUpdate:
+    def __init__(self, connection, repository: Path):
+        self.connection = connection
+        self.repository = str(repository)
+        self.name = repository.name
+        self.graph = None
+        self.stats = UpdateStats()
+        self.seen = set()
+        self.stored = {
+            path: (file_id, stored_hash)
+            for file_id, path, stored_hash in connection.execute(
+                "SELECT id, path, content_hash FROM files WHERE repository = ?",
+                (self.repository,),
+            )
+        }
+
+    def read(self, path):
+        # Given to the dependency graph as its read_definition.
+        node = self.graph.node_for(path)
+        self.seen.add(node)
+        try:
+            check_size(path.stat().st_size)
+        except ResourceLimitError as e:
+            self._reject(node, e)
+        content = path.read_text()
+        digest = content_hash(content)
+        stored = self.stored.get(node)
+        if stored is not None and stored[1] == digest:
+            self.stats.unchanged += 1
+            return self._local_references(stored[0], path.name), False
+
+        try:
+            actions = get_actions_from_file(content, path.name)
+        except ResourceLimitError as e:
+            self._reject(node, e)
+        self.stats.parsed += 1
+        self._store(node, digest, actions, None)
+        return actions, False
+
+    def _reject(self, node, error):
+        logger.warning("Rejected %s (resource limit): %s", node, error)
+        self.stats.rejected += 1
+        # Stored without its hash, so that it is read again next time, when
+        # the limits may be different.
+        self._store(node, "", [], str(error))
+        raise error
+
+    def _local_references(self, file_id, name):
+        # Only these are needed to follow the definitions an unchanged file
+        # uses; its other references are already stored.
+        return [
+            ActionReference(action_link, None, name, job, line, col)
+            for job, action_link, line, col in self.connection.execute(
+                "SELECT job, action_link, line, col FROM uses "
+                "WHERE file_id = ? AND action_version IS NULL",
+                (file_id,),
+            )
+        ]
+
+    def _store(self, node, digest, actions, rejected):
+        file_id = self.connection.execute(
+            "INSERT INTO files (repository, name, path, content_hash, rejected, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (repository, path) DO UPDATE SET "
+            "content_hash = excluded.content_hash, rejected = excluded.rejected, "
+            "updated = excluded.updated "
+            "RETURNING id",
+            (self.repository, self.name, node, digest, rejected, time.time()),
+        ).fetchone()[0]
+        self.connection.execute("DELETE FROM uses WHERE file_id = ?", (file_id,))
+        self.connection.executemany(
+            "INSERT INTO uses VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    file_id,
+                    action["jobName"],
+                    action["actionLink"],
+                    action["actionVersion"],
+                    action.line,
+                    action.column,
+                )
+                for action in actions
+            ],
+        )
+
+    def remove_missing(self):
+        removed = [
+            (file_id,)
+            for path, (file_id, _) in self.stored.items()
+            if path not in self.seen
+        ]
+        self.connection.executemany("DELETE FROM files WHERE id = ?", removed)
+        self.stats.removed = len(removed)
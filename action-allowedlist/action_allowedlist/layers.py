@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# An approved list can be made of layers: a base approved.json followed by
+# overlays, for example per team and then per repository. Each overlay is
+# either a list of entries to add, or an object with "add", "deprecate" and
+# "revoke" lists. Later layers take precedence, and within a layer the
+# operations apply in that order. The layers are merged into a single list of
+# entries before anything is indexed, so the number of layers does not change
+# the cost of a lookup.
+
+import hashlib
+import json
+from pathlib import Path
+
+from action_allowedlist.log import logger
+from action_allowedlist.rules import RuleMatcher, is_rule
+
+OPERATIONS = ("add", "deprecate", "revoke")
+# Part of the hash of merged lists, so snapshots cached by an older
+# merge_layers are not reused. Bump it when the result of a merge changes.
+MERGE_VERSION = 2
+
+
+def layers_hash(contents):
+    """Hash identifying the merged list of the given layer contents."""
+    if len(contents) == 1:
+        # The same hash as a snapshot of a single approved.json
+        return hashlib.sha256(contents[0]).digest()
+    digest = hashlib.sha256(f"layers v{MERGE_VERSION}\0".encode())
+    for content in contents:
+        digest.update(hashlib.sha256(content).digest())
+    return digest.digest()
+
+
+def parse_overlay(content, name):
+    overlay = json.loads(content)
+    if isinstance(overlay, list):
+        return {"add": overlay}
+    if not isinstance(overlay, dict) or not overlay.keys() <= set(OPERATIONS):
+        raise ValueError(
+            f"{name}: an overlay is a list of entries, or an object with "
+            "'add', 'deprecate' and 'revoke' lists"
+        )
+    return overlay
+
+
+def _key(entry):
+    return (entry["actionLink"], entry["actionVersion"])
+
+
+def merge_layers(approved, overlays):
+    """Applies each overlay in turn to the entries of the base list."""
+    merged = {}
+    for entry in approved:
+        merged.setdefault(_key(entry), []).append(entry)
+
+    for overlay in overlays:
+        added = set()
+        for entry in overlay.get("add", []):
+            key = _key(entry)
+            # An entry replaces what lower layers said about the same
+            # action and version, including a revocation.
+            if key not in added:
+                merged.pop(key, None)
+                added.add(key)
+            merged.setdefault(key, []).append(entry)
+
+        for entry in overlay.get("deprecate", []):
+            key = _key(entry)
+            entries = merged.get(key)
+            if not entries or any(e.get("deny", False) for e in entries):
+                logger.warning(
+                    "Cannot deprecate %s@%s: it is not approved by a lower layer", *key
+                )
+                continue
+            merged[key] = [{**e, "deprecated": True} for e in entries]
+
+        for entry in overlay.get("revoke", []):
+            # Dropping the entries is not enough when a lower layer also
+            # approves the action with a wildcard, so the revocation is kept
+            # as a deny rule.
+            key = _key(entry)
+            merged[key] = [
+                {"actionLink": key[0], "actionVersion": key[1], "deny": True}
+            ]
+
+        _drop_denied(merged, overlay, added)
+
+    return [entry for entries in merged.values() for entry in entries]
+
+
+def _drop_denied(merged, overlay, added):
+    # An exact entry applies before any rule, so a deny rule of this layer
+    # would not reach the exact approvals of lower layers; those are dropped.
+    deny_rules = [entry for entry in overlay.get("add", []) if entry.get("deny", False)]
+    deny_rules += [{**entry, "deny": True} for entry in overlay.get("revoke", [])]
+    if not deny_rules:
+        return
+    matcher = RuleMatcher(deny_rules, builtin=False)
+    for key in list(merged):
+        if key in added or any(is_rule(entry) for entry in merged[key]):
+            continue
+        if matcher.match_rule(*key) is not None:
+            del merged[key]
+
+
+class Layers:
+    """The base approved list and its overlays, read once."""
+
+    def __init__(self, approved_path, overlay_paths=()):
+        self.paths = [Path(approved_path), *map(Path, overlay_paths)]
+        self.contents = [path.read_bytes() for path in self.paths]
+        self.source_hash = layers_hash(self.contents)
+
+    def entries(self):
+        approved = json.loads(self.contents[0])
+        if len(self.contents) == 1:
+            return approved
+        return merge_layers(
+            approved,
+            [
+                parse_overlay(content, path)
+                for path, content in zip(self.paths[1:], self.contents[1:])
+            ],
+        )
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+from pathlib import Path
+
+from action_allowedlist.log import logger
+from action_allowedlist.records import RejectedFile
+from action_allowedlist.workflow_outline import ResourceLimitError
+
+ACTION_FILE_NAMES = ("action.yml", "action.yaml")
+DEFINITION_SUFFIXES = (".yml", ".yaml")
+
+
+def is_local_reference(action):
+    return action["actionVersion"] is None and action["actionLink"].startswith("./")
+
+
+class DependencyGraph:
+    """
+    The workflows of a repository and the local composite actions and reusable
+    workflows they refer to with `uses: ./...`. Each definition is read and
+    parsed once, however many workflows and actions refer to it.
+    """
+
+    def __init__(self, repository_root, read_definition):
+        self.repository_root = Path(repository_root).resolve()
+        # Returns (actions, cache_hit) for a file, like read_workflow_actions.
+        self.read_definition = read_definition
+        self.actions = {}
+        self.roots = []
+        self._root_set = set()
+        self.cycles = []
+        self.rejected = []
+        self._dependencies = {}
+
+    def node_for(self, path: Path):
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.repository_root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def add(self, path: Path, actions):
+        # The caller reports the other actions of a root as it reads them, so
+        # only its local references are kept.
+        node = self.node_for(path)
+        self.actions[node] = [
+            action for action in actions if is_local_reference(action)
+        ]
+        self.roots.append(node)
+        self._root_set.add(node)
+
+    def find_definition(self, action_link):
+        path = (self.repository_root / action_link).resolve()
+        if not path.is_relative_to(self.repository_root):
+            return None
+        if path.is_file():
+            return path if path.suffix in DEFINITION_SUFFIXES else None
+        for name in ACTION_FILE_NAMES:
+            if (path / name).is_file():
+                return path / name
+        return None
+
+    def _load(self, path: Path):
+        node = self.node_for(path)
+        if node not in self.actions:
+            actions, _ = self.read_definition(path)
+            # Definitions are reported by their path, since several of them
+            # are named action.yml.
+            self.actions[node] = [
+                action.replace(workflowFileName=node) for action in actions
+            ]
+        return node
+
+    def dependencies(self, node):
+        if node not in self._dependencies:
+            dependencies = []
+            for action in self.actions[node]:
+                if not is_local_reference(action):
+                    continue
+                path = self.find_definition(action["actionLink"])
+                if path is None:
+                    # For example an action checked out by an earlier step.
+                    logger.debug(
+                        "  Local action not found: [%s] in %s",
+                        action["actionLink"],
+                        node,
+                    )
+                    continue
+                try:
+                    dependency = self._load(path)
+                except ResourceLimitError as e:
+                    rejection = RejectedFile(self.node_for(path), str(e))
+                    if rejection not in self.rejected:
+                        self.rejected.append(rejection)
+                    continue
+                except Exception as e:
+                    logger.warning("Error occurred while reading %s: %s", path, e)
+                    continue
+                if dependency not in dependencies:
+                    dependencies.append(dependency)
+            self._dependencies[node] = dependencies
+        return self._dependencies[node]
+
+    def resolve(self):
+        """Returns the definitions reachable from the roots, excluding the roots."""
+        visited = set()
+        followed = []
+        for root in self.roots:
+            self._visit(root, visited, [], followed)
+        return followed
+
+    def _visit(self, node, visited, stack, followed):
+        if node in stack:
+            cycle = stack[stack.index(node) :] + [node]
+            self.cycles.append(cycle)
+            logger.warning(
+                "Cycle in local actions and reusable workflows: %s",
+                " -> ".join(cycle),
+            )
+            return
+        if node in visited:
+            return
+        visited.add(node)
+        if node not in self._root_set:
+            followed.append(node)
+        stack.append(node)
+        for dependency in self.dependencies(node):
+            self._visit(dependency, visited, stack, followed)
+        stack.pop()
+
+    def followed_actions(self):
+        followed = self.resolve()
+        if followed:
+            logger.info(
+                "Followed [%d] local actions and reusable workflows", len(followed)
+            )
+        for node in followed:
+            for action in self.actions[node]:
+                if not is_local_reference(action):
+                    yield action
+        yield from self.rejected
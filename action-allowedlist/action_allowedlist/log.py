@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import logging
+import os
+import sys
+
+logger = logging.getLogger("action_allowedlist")
+
+# Properties accepted by the ::error and ::warning workflow commands, passed to
+# the logger through `extra`.
+ANNOTATION_PROPERTIES = ("title", "file", "line", "col", "endLine", "endColumn")
+
+
+def _escape_data(value):
+    return str(value).replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _escape_property(value):
+    return _escape_data(value).replace(":", "%3A").replace(",", "%2C")
+
+
+def _location(record):
+    # file:line:col, as compilers print it, when the record has a line.
+    file, line = getattr(record, "file", None), getattr(record, "line", None)
+    if file is None or line is None:
+        return ""
+    col = getattr(record, "col", None)
+    return f"{file}:{line}:{col}: " if col is not None else f"{file}:{line}: "
+
+
+class WorkflowCommandFormatter(logging.Formatter):
+    """
+    Formats debug, warning and error records as GitHub workflow commands when
+    running under Actions, and with a plain level prefix otherwise.
+    """
+
+    def __init__(self, github_actions=None):
+        super().__init__()
+        if github_actions is None:
+            github_actions = os.environ.get("GITHUB_ACTIONS") == "true"
+        self.github_actions = github_actions
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            command = "error"
+        elif record.levelno >= logging.WARNING:
+            command = "warning"
+        elif record.levelno < logging.INFO:
+            command = "debug"
+        else:
+            return message
+
+        if not self.github_actions:
+            return f"{command}: {_location(record)}{message}"
+
+        properties = ",".join(
+            f"{name}={_escape_property(getattr(record, name))}"
+            for name in ANNOTATION_PROPERTIES
+            if getattr(record, name, None) is not None
+        )
+        separator = " " if properties else ""
+        return f"::{command}{separator}{properties}::{_escape_data(message)}"
+
+
+class StdoutHandler(logging.Handler):
+    """
+    Writes to whatever sys.stdout is at the time of the call, so output can be
+    captured with redirect_stdout and stays in order with print(). It does not
+    flush after every record, leaving that to the stream's own buffering.
+    """
+
+    def emit(self, record):
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+def default_level():
+    # GitHub only shows ::debug:: lines when step debug logging is turned on.
+    if os.environ.get("RUNNER_DEBUG") == "1":
+        return logging.DEBUG
+    return logging.INFO
+
+
+def configure(level=None, github_actions=None):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = StdoutHandler()
+    handler.setFormatter(WorkflowCommandFormatter(github_actions))
+    logger.addHandler(handler)
+    logger.setLevel(default_level() if level is None else level)
+    logger.propagate = False
+
+
+def verbosity_level(verbose=0, quiet=0):
+    if verbose == 0 and quiet == 0:
+        return default_level()
+    levels = [logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG]
+    return levels[max(0, min(len(levels) - 1, 2 + verbose - quiet))]
+
+
+configure()
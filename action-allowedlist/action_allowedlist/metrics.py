@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Scan statistics written as an OpenMetrics (or Prometheus) text file, for
+# example for the node-exporter textfile collector. Like timings, recording is
+# off unless enable() is called, and worker processes hand what they recorded
+# back to the parent with collect(). Counters and histograms are added to the
+# values already in the file, so a file rewritten by every scheduled scan
+# keeps counting across runs; gauges describe the latest run.
+
+import re
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from action_allowedlist.files import atomic_write
+from action_allowedlist.log import logger
+
+PREFIX = "action_allowedlist_"
+PARSE_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Name without the prefix: (type, help)
+METRICS = {
+    "files_scanned": ("counter", "Workflow files and local definitions read."),
+    "files_rejected": ("counter", "Files rejected for being over a parse limit."),
+    "references": ("counter", "Action references checked."),
+    "verdicts": ("counter", "Action references checked, by action and verdict."),
+    "cache_hits": ("counter", "Files whose actions were read from the action cache."),
+    "cache_misses": (
+        "counter",
+        "Files parsed because they were not in the action cache.",
+    ),
+    "parse_duration_seconds": ("histogram", "Time to parse one file."),
+    "scan_duration_seconds": (
+        "gauge",
+        "Wall time of the latest scan of the repository.",
+    ),
+    "run_duration_seconds": ("gauge", "Wall time of the latest run."),
+    "last_run_timestamp_seconds": ("gauge", "When the latest run ended."),
+}
+
+_SAMPLE = re.compile(r"([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)")
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+_recorder = None
+_repository = None
+
+
+class _Recorder:
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (name, labels) to a number, or for a histogram the cumulative count
+        # of each bucket, the +Inf bucket last, followed by the sum.
+        self.values = {}
+
+
+def enable():
+    global _recorder
+    _recorder = _Recorder()
+
+
+def is_enabled():
+    return _recorder is not None
+
+
+@contextmanager
+def _scan(name):
+    global _repository
+    _repository = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        set_gauge("scan_duration_seconds", time.perf_counter() - started)
+        _repository = None
+
+
+def repository(name):
+    """Labels what is recorded inside the block with the repository name."""
+    if _recorder is None:
+        return nullcontext()
+    return _scan(name)
+
+
+def _key(name, labels):
+    if _repository is not None:
+        labels = {"repository": _repository, **labels}
+    return name, tuple(sorted(labels.items()))
+
+
+def _combine(name, old, new):
+    if old is None or METRICS[name][0] == "gauge":
+        return new
+    if METRICS[name][0] == "histogram":
+        return [a + b for a, b in zip(old, new)]
+    return old + new
+
+
+def _add(name, value, labels):
+    key = _key(name, labels)
+    _recorder.values[key] = _combine(name, _recorder.values.get(key), value)
+
+
+def inc(name, value=1, **labels):
+    if _recorder is not None:
+        _add(name, value, labels)
+
+
+def set_gauge(name, value, **labels):
+    if _recorder is not None:
+        _add(name, value, labels)
+
+
+def observe(name, value, **labels):
+    if _recorder is not None:
+        histogram = [int(value <= bound) for bound in PARSE_BUCKETS] + [1, value]
+        _add(name, histogram, labels)
+
+
+@contextmanager
+def _timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+def parsing():
+    if _recorder is None:
+        return nullcontext()
+    return _timed("parse_duration_seconds")
+
+
+def collect():
+    # Used by worker processes to hand what they recorded back to the parent.
+    if _recorder is None:
+        return {}
+    values, _recorder.values = _recorder.values, {}
+    return values
+
+
+def merge(values):
+    """
+    Adds values from collect() in a worker. Those recorded without a
+    repository get the one being scanned here.
+    """
+    if _recorder is None:
+        return
+    for (name, labels), value in values.items():
+        labels = dict(labels)
+        if _repository is not None:
+            labels.setdefault("repository", _repository)
+        key = name, tuple(sorted(labels.items()))
+        _recorder.values[key] = _combine(name, _recorder.values.get(key), value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _unescape(value):
+    return re.sub(r"\\(.)", lambda m: "\n" if m[1] == "n" else m[1], value)
+
+
+def _format_value(value):
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(value)
+
+
+def _sample(name, labels, value):
+    if labels:
+        text = ",".join(f'{label}="{_escape(v)}"' for label, v in labels.items())
+        return f"{name}{{{text}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def render(values, openmetrics=True):
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        keys = sorted(key for key in values if key[0] == name)
+        if not keys:
+            continue
+        family = PREFIX + name
+        # The Prometheus format names a counter by its sample.
+        described = family if openmetrics or kind != "counter" else f"{family}_total"
+        lines.append(f"# TYPE {described} {kind}")
+        lines.append(f"# HELP {described} {help_text}")
+        for key in keys:
+            labels, value = dict(key[1]), values[key]
+            if kind == "counter":
+                lines.append(_sample(f"{family}_total", labels, value))
+            elif kind == "gauge":
+                lines.append(_sample(family, labels, value))
+            else:
+                bounds = [repr(bound) for bound in PARSE_BUCKETS] + ["+Inf"]
+                for bound, count in zip(bounds, value):
+                    lines.append(
+                        _sample(f"{family}_bucket", {**labels, "le": bound}, count)
+                    )
+                lines.append(_sample(f"{family}_count", labels, value[-2]))
+                lines.append(_sample(f"{family}_sum", labels, value[-1]))
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _family_of(sample_name):
+    name = sample_name.removeprefix(PREFIX)
+    for suffix, kind in (
+        ("_total", "counter"),
+        ("_bucket", "histogram"),
+        ("_count", "histogram"),
+        ("_sum", "histogram"),
+    ):
+        base = name.removesuffix(suffix)
+        if base != name and METRICS.get(base, ("",))[0] == kind:
+            return base, suffix
+    if METRICS.get(name, ("",))[0] == "gauge":
+        return name, ""
+    return None, None
+
+
+def parse_text(text):
+    """Reads the values of a file written by render()."""
+    values = {}
+    bounds = [repr(bound) for bound in PARSE_BUCKETS] + ["+Inf"]
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE.fullmatch(line)
+        if match is None:
+            raise ValueError(f"Not a metric sample: {line}")
+        name, suffix = _family_of(match[1])
+        if name is None:
+            continue
+        labels = {label: _unescape(v) for label, v in _LABEL.findall(match[2] or "")}
+        value = float(match[3])
+        if METRICS[name][0] != "histogram":
+            values[(name, tuple(sorted(labels.items())))] = value
+            continue
+        bound = labels.pop("le", None)
+        key = name, tuple(sorted(labels.items()))
+        histogram = values.setdefault(key, [0] * (len(bounds) + 1))
+        if suffix == "_bucket" and bound in bounds:
+            histogram[bounds.index(bound)] = value
+        elif suffix == "_sum":
+            histogram[-1] = value
+    return values
+
+
+def write(path, openmetrics=True):
+    """
+    Writes what was recorded, added to the counters and histograms already in
+    the file, atomically so a collector never reads half a file.
+    """
+    path = Path(path)
+    set_gauge("run_duration_seconds", time.perf_counter() - _recorder.started)
+    set_gauge("last_run_timestamp_seconds", round(time.time(), 3))
+    values = {}
+    try:
+        values = parse_text(path.read_text())
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning("Starting over the metrics in %s: %s", path, e)
+    for key, value in _recorder.values.items():
+        values[key] = _combine(key[0], values.get(key), value)
+
+    # Readable by a collector running as another user
+    atomic_write(path, render(values, openmetrics), mode=0o644)
@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Resolves action versions against local bare mirrors of the action
+# repositories, laid out as <mirrors>/<owner>/<repo>.git (for example made with
+# `git clone --mirror` and kept current with `git remote update`). Nothing is
+# fetched from the network.
+
+import json
+import re
+import time
+from pathlib import Path
+
+from action_allowedlist.cat_file import CatFile
+from action_allowedlist.files import atomic_write
+from action_allowedlist.log import logger
+from action_allowedlist.rules import is_rule
+
+SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+# What `git check-ref-format --allow-onelevel` refuses: control characters,
+# spaces and ~^:?*[\, "..", "@{", "//", a component starting with "." or
+# ending with ".lock", and a leading or trailing "/" or trailing ".".
+INVALID_REF_PATTERN = re.compile(
+    r"[\x00-\x20\x7f~^:?*\[\\]|\.\.|@\{|//|(?:^|/)\.|\.lock(?:/|$)|^/|[/.]$|^@$|^-"
+)
+
+DEFAULT_MAX_AGE = 24 * 60 * 60
+CACHE_FILE_NAME = "resolved-refs.json"
+
+
+def is_sha(version):
+    return bool(version) and SHA_PATTERN.fullmatch(version) is not None
+
+
+def is_valid_ref(ref):
+    """
+    Whether ref can be asked of a mirror. Versions come from workflow files,
+    and one holding a newline would be read by cat-file as two requests.
+    """
+    return bool(ref) and INVALID_REF_PATTERN.search(ref) is None
+
+
+def repository_of(action_link):
+    return "/".join(action_link.split("/")[:2])
+
+
+def mirror_state(mirror: Path):
+    # Fetching rewrites FETCH_HEAD or packed-refs, so a resolution made before
+    # the newest of them may be out of date.
+    state = 0.0
+    for name in ("FETCH_HEAD", "packed-refs"):
+        try:
+            state = max(state, (mirror / name).stat().st_mtime)
+        except OSError:
+            pass
+    return state
+
+
+class ResolutionCache:
+    """
+    Resolutions stored in a JSON file. A commit found by its SHA is kept for
+    good, since commits cannot change. Tag resolutions and missing commits are
+    checked again once older than max_age, or after the mirror was fetched.
+    """
+
+    def __init__(self, path, max_age=DEFAULT_MAX_AGE):
+        self.path = Path(path) if path else None
+        self.max_age = max_age
+        self.entries = {}
+        self.changed = False
+        if self.path is not None:
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring resolution cache %s: %s", self.path, e)
+
+    def get(self, repository, ref, state):
+        entry = self.entries.get(repository, {}).get(ref)
+        if entry is None:
+            return False, None
+        sha, checked = entry
+        if sha is not None and sha == ref:
+            return True, sha
+        if checked < state or time.time() - checked > self.max_age:
+            return False, None
+        return True, sha
+
+    def put(self, repository, ref, sha):
+        self.entries.setdefault(repository, {})[ref] = [sha, time.time()]
+        self.changed = True
+
+    def save(self):
+        if self.path is None or not self.changed:
+            return
+        try:
+            atomic_write(self.path, json.dumps(self.entries))
+        except OSError as e:
+            logger.warning("Could not write resolution cache %s: %s", self.path, e)
+            return
+        self.changed = False
+
+
+class MirrorResolver:
+    """
+    Resolves tags, branches and SHAs of actions to commits with one cat-file
+    process per mirror, started on first use and kept until close().
+    """
+
+    def __init__(self, mirrors_dir, cache: ResolutionCache | None = None):
+        self.mirrors_dir = Path(mirrors_dir)
+        self.cache = cache or ResolutionCache(None)
+        self._processes = {}
+        self._mirrors = {}
+        self._states = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for process in self._processes.values():
+            process.close()
+        self._processes.clear()
+        self.cache.save()
+
+    def mirror(self, repository):
+        if repository not in self._mirrors:
+            mirror = None
+            for candidate in (f"{repository}.git", repository):
+                path = self.mirrors_dir / candidate
+                if (path / "HEAD").is_file():
+                    mirror = path
+                    break
+            self._mirrors[repository] = mirror
+            if mirror is not None:
+                self._states[repository] = mirror_state(mirror)
+        return self._mirrors[repository]
+
+    def has_mirror(self, action_link):
+        return self.mirror(repository_of(action_link)) is not None
+
+    def _query(self, repository, revisions):
+        # Returns the commit each revision peels to, or None when it does not exist.
+        if repository not in self._processes:
+            self._processes[repository] = CatFile(
+                self.mirror(repository), contents=False
+            )
+        found = self._processes[repository].query(
+            f"{revision}^{{commit}}" for revision in revisions
+        )
+        return [
+            commit.oid if commit is not None and commit.type == "commit" else None
+            for commit in found
+        ]
+
+    def resolve_many(self, references):
+        """
+        Maps each (actionLink, ref) to the commit it names, or None when the
+        ref is not in the mirror or is not a valid ref name. References
+        without a mirror are left out.
+        """
+        resolved = {}
+        pending = {}
+        for action_link, ref in references:
+            repository = repository_of(action_link)
+            if self.mirror(repository) is None:
+                continue
+            if not is_valid_ref(ref):
+                # Neither asked of the mirror nor cached.
+                logger.debug("Not resolving invalid ref %r of %s", ref, action_link)
+                resolved[(action_link, ref)] = None
+                continue
+            hit, sha = self.cache.get(repository, ref, self._states[repository])
+            if hit:
+                resolved[(action_link, ref)] = sha
+            else:
+                pending.setdefault(repository, {}).setdefault(ref, []).append(
+                    action_link
+                )
+
+        for repository, links_by_ref in pending.items():
+            refs = list(links_by_ref)
+            # A SHA names a commit directly, anything else is a tag or else a
+            # branch; the branches are only asked for when there is no tag.
+            shas = self._query(
+                repository, [ref if is_sha(ref) else f"refs/tags/{ref}" for ref in refs]
+            )
+            retry = [
+                i for i, ref in enumerate(refs) if shas[i] is None and not is_sha(ref)
+            ]
+            if retry:
+                branches = self._query(
+                    repository, [f"refs/heads/{refs[i]}" for i in retry]
+                )
+                for i, sha in zip(retry, branches):
+                    shas[i] = sha
+            for ref, sha in zip(refs, shas):
+                self.cache.put(repository, ref, sha)
+                for action_link in links_by_ref[ref]:
+                    resolved[(action_link, ref)] = sha
+        return resolved
+
+    def resolve(self, action_link, ref):
+        return self.resolve_many([(action_link, ref)]).get((action_link, ref))
+
+
+def open_resolver(mirrors_dir, cache_path=None, max_age=DEFAULT_MAX_AGE):
+    mirrors_dir = Path(mirrors_dir)
+    cache = ResolutionCache(cache_path or mirrors_dir / CACHE_FILE_NAME, max_age)
+    return MirrorResolver(mirrors_dir, cache)
+
+
+class ResolvingIndex:
+    """
+    Wraps an approved index so that an action pinned to a tag or branch is
+    approved when the commit it currently names in the mirror is approved.
+    """
+
+    def __init__(self, approved, resolver: MirrorResolver):
+        self.approved = approved
+        self.resolver = resolver
+
+    def __len__(self):
+        return len(self.approved)
+
+    def __contains__(self, action_link):
+        return action_link in self.approved
+
+    def versions(self, action_link):
+        return self.approved.versions(action_link)
+
+    def lookup(self, action_link, action_version):
+        record = self.approved.lookup(action_link, action_version)
+        if (
+            record is None
+            and action_version
+            and not is_sha(action_version)
+            and self.resolver.has_mirror(action_link)
+        ):
+            sha = self.resolver.resolve(action_link, action_version)
+            if sha is not None:
+                logger.debug("Resolved %s@%s to %s", action_link, action_version, sha)
+                record = self.approved.lookup(action_link, sha)
+        return record
+
+
+def verify_approved(approved, resolver: MirrorResolver):
+    """
+    Checks that every approved SHA exists in its mirror, and that each tag
+    recorded next to it still names that commit. Returns the problems found.
+    """
+    entries = [
+        entry
+        for entry in approved
+        # Local actions have no version and nothing to resolve.
+        if not is_rule(entry) and entry["actionVersion"]
+    ]
+    without_mirror = sorted(
+        {
+            repository_of(entry["actionLink"])
+            for entry in entries
+            if not resolver.has_mirror(entry["actionLink"])
+        }
+    )
+    for repository in without_mirror:
+        logger.warning(
+            "No mirror of %s, its approved versions were not verified", repository
+        )
+
+    references = set()
+    for entry in entries:
+        references.add((entry["actionLink"], entry["actionVersion"]))
+        if entry.get("tag"):
+            references.add((entry["actionLink"], entry["tag"]))
+    resolved = resolver.resolve_many(sorted(references))
+
+    problems = []
+    verified = 0
+    for entry in entries:
+        action_link, version = entry["actionLink"], entry["actionVersion"]
+        if (action_link, version) not in resolved:
+            continue
+        verified += 1
+        if resolved[(action_link, version)] is None:
+            problems.append(f"{action_link}: {version} was not found in the mirror")
+            continue
+        tag = entry.get("tag")
+        if tag and is_sha(version):
+            tag_sha = resolved[(action_link, tag)]
+            if tag_sha is None:
+                problems.append(f"{action_link}: tag {tag} was not found in the mirror")
+            elif tag_sha != version:
+                problems.append(f"{action_link}: tag {tag} is {tag_sha}, not {version}")
+
+    if problems:
+        logger.error(
+            "The following %d approved versions could not be verified:\n%s",
+            len(problems),
+            "\n".join(f"  {problem}" for problem in problems),
+            extra={"file": "approved.json", "title": "Unverified Versions"},
+        )
+    else:
+        logger.info("Verified %d approved versions", verified)
+    return problems
@@ -0,0 +1,250 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, redirect_stdout
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+
+from action_allowedlist.actions_parser import (
+    get_repository_root,
+    init_worker,
+    invoke_validate_actions,
+    iter_tree_actions,
+    iter_used_actions,
+    worker_settings,
+)
+from action_allowedlist import metrics, timings
+from action_allowedlist.approved_snapshot import load_approved_index
+from action_allowedlist.git_diff import get_incremental_workflow_files
+from action_allowedlist.log import logger
+from action_allowedlist.sources import is_archive, is_bare_repository, open_tree
+
+
+class RepositoryResult(NamedTuple):
+    repository: Path
+    found: bool
+    error: str | None
+    output: str
+    files: list
+    metrics: dict
+    # The results of invoke_validate_actions, when they are written out.
+    results: list | None = None
+
+
+class ScanOptions(NamedTuple):
+    # What each repository is scanned with, besides the approved list.
+    ref: str | None = None
+    jobs: int = 1
+    base_ref: str | None = None
+    head_ref: str = "HEAD"
+    # Files whose changes mean every workflow file is scanned with base_ref.
+    approved_paths: tuple = ()
+    keep_results: bool = False
+    # The arguments of mirrors.open_resolver, or None.
+    mirrors: tuple | None = None
+
+
+def find_repositories(checkouts_dir: Path):
+    # Checkouts, bare repositories and archives can sit side by side.
+    return sorted(
+        child
+        for child in checkouts_dir.iterdir()
+        if (child.is_dir() and (child / ".github/workflows").is_dir())
+        or is_bare_repository(child)
+        or is_archive(child)
+    )
+
+
+def read_manifest(manifest_path: Path):
+    repositories = []
+    for line in manifest_path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        repositories.append((manifest_path.parent / line).resolve())
+    return repositories
+
+
+_approved_index = None
+_cache = None
+_options = ScanOptions()
+
+
+def _init_worker(*, approved_index, cache, options, **settings):
+    global _approved_index, _cache, _options
+    _approved_index = approved_index
+    _cache = cache
+    _options = options
+    init_worker(**settings)
+
+
+def scan_repository(repository: Path):
+    # Each repository's output is captured so that parallel workers do not
+    # interleave their lines in the aggregated report.
+    output = io.StringIO()
+    results = [] if _options.keep_results else None
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(redirect_stdout(output))
+            stack.enter_context(metrics.repository(Path(repository).name))
+            actions_found = _iter_repository_actions(repository)
+            approved = _approved_index
+            if _options.mirrors is not None:
+                from action_allowedlist.mirrors import ResolvingIndex, open_resolver
+
+                resolver = stack.enter_context(open_resolver(*_options.mirrors))
+                approved = ResolvingIndex(approved, resolver)
+            found = invoke_validate_actions(
+                approved, actions_found, None if results is None else results.append
+            )
+        return RepositoryResult(
+            repository,
+            found,
+            None,
+            output.getvalue(),
+            timings.collect_files(),
+            metrics.collect(),
+            results,
+        )
+    except Exception as e:
+        return RepositoryResult(
+            repository,
+            True,
+            str(e),
+            output.getvalue(),
+            timings.collect_files(),
+            metrics.collect(),
+        )
+
+
+def _iter_repository_actions(repository):
+    tree = open_tree(repository, _options.ref)
+    if _options.base_ref is not None:
+        if tree is not None:
+            tree.close()
+            raise ValueError("--base-ref needs a checkout")
+        workflow_files = get_incremental_workflow_files(
+            get_repository_root(repository),
+            _options.approved_paths,
+            _options.base_ref,
+            _options.head_ref,
+        )
+        return iter_used_actions(repository, _options.jobs, _cache, workflow_files)
+    if tree is not None:
+        return iter_tree_actions(tree, _options.jobs, _cache)
+    return iter_used_actions(repository, _options.jobs, _cache)
+
+
+def scan_organization(
+    repositories,
+    approved_path: Path,
+    workers=1,
+    cache=None,
+    overlays=(),
+    *,
+    ref=None,
+    jobs=1,
+    base_ref=None,
+    head_ref="HEAD",
+    results_path=None,
+    mirrors=None,
+):
+    """
+    Scans each repository with the approved list, in parallel when workers is
+    over 1. jobs, base_ref, head_ref and mirrors apply to every repository, as
+    they would to a single one. With results_path, the results are written as
+    NDJSON, each with the repository it is from.
+    """
+    logger.info("Repositories to scan: %d", len(repositories))
+    logger.info("Approval file: %s", approved_path)
+    for overlay in overlays:
+        logger.info("Approval overlay: %s", overlay)
+
+    approved_index = load_approved_index(
+        approved_path, overlays=overlays, cache_dir=cache and cache.directory
+    )
+    options = ScanOptions(
+        ref,
+        jobs,
+        base_ref,
+        head_ref,
+        (approved_path, *overlays),
+        results_path is not None,
+        mirrors,
+    )
+    initializer = partial(
+        _init_worker,
+        approved_index=approved_index,
+        cache=cache,
+        options=options,
+        **worker_settings(),
+    )
+
+    with ExitStack() as stack:
+        stream = None
+        if results_path is not None:
+            stream = stack.enter_context(open(results_path, "w", buffering=1))
+        if workers > 1 and len(repositories) > 1:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=workers, initializer=initializer)
+            )
+            results = executor.map(scan_repository, repositories)
+        else:
+            initializer()
+            results = map(scan_repository, repositories)
+        # Reported as each repository finishes, in the order given.
+        found = report_organization(results, stream)
+
+    if cache is not None:
+        cache.prune()
+
+    return found
+
+
+def report_organization(results, stream=None):
+    failed = []
+    count = 0
+    for result in results:
+        count += 1
+        timings.add_files(result.files)
+        metrics.merge(result.metrics)
+        if stream is not None:
+            for record in result.results or ():
+                record = {"repository": str(result.repository), **record}
+                stream.write(json.dumps(record) + "\n")
+        logger.info("::group::%s", result.repository)
+        # Already formatted, at the log level of the worker.
+        print(result.output, end="")
+        if result.error is not None:
+            logger.error(
+                "Error occurred while scanning %s: %s",
+                result.repository,
+                result.error,
+                extra={"title": "Scan Error"},
+            )
+        logger.info("::endgroup::")
+        if result.found:
+            failed.append(result)
+
+    if failed:
+        logger.error(
+            "Scanned %d repositories, %d with denied actions or errors:\n%s",
+            count,
+            len(failed),
+            "\n".join(
+                f"  {result.repository}: "
+                + ("error" if result.error is not None else "denied actions")
+                for result in failed
+            ),
+            extra={"title": "Repositories with Denied Actions"},
+        )
+    else:
+        logger.info("Scanned %d repositories, 0 with denied actions or errors.", count)
+
+    return bool(failed)
@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import sys
+from collections.abc import Mapping
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record(Mapping):
+    """
+    A read-only mapping stored in __slots__ instead of a dict. A slot that was
+    never assigned is a missing key, so the mapping compares equal to the dict
+    it was built from. Only the slots named in _fields are keys.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _fields(self):
+        return self.__slots__
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (name for name in self._fields if hasattr(self, name))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return all(
+                getattr(self, name, None) == getattr(other, name, None)
+                and hasattr(self, name) == hasattr(other, name)
+                for name in self._fields
+            )
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ActionReference(_Record):
+    """
+    An action used by a workflow file, composite action or job. The line and
+    column of its `uses`, when known, are attributes rather than keys.
+    """
+
+    _fields = ("actionLink", "actionVersion", "workflowFileName", "jobName")
+    __slots__ = _fields + ("line", "column")
+
+    def __init__(
+        self,
+        action_link,
+        action_version,
+        workflow_file_name,
+        job_name,
+        line=None,
+        column=None,
+    ):
+        # The same links, versions and file names repeat across many
+        # references, so each distinct string is only stored once.
+        self.actionLink = _intern(action_link)
+        self.actionVersion = _intern(action_version)
+        self.workflowFileName = _intern(workflow_file_name)
+        self.jobName = _intern(job_name)
+        self.line = line
+        self.column = column
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return ActionReference(
+            values["actionLink"],
+            values["actionVersion"],
+            values["workflowFileName"],
+            values["jobName"],
+            values["line"],
+            values["column"],
+        )
+
+
+class ApprovedEntry(_Record):
+    """An entry of approved.json."""
+
+    __slots__ = ("actionLink", "actionVersion", "tag", "deprecated", "deny")
+
+    @classmethod
+    def from_dict(cls, entry):
+        # Entries with properties this record does not know about are kept as
+        # they are rather than losing data.
+        if not entry.keys() <= set(cls.__slots__):
+            return entry
+        record = cls()
+        for name, value in entry.items():
+            setattr(record, name, _intern(value))
+        return record
+
+
+class RejectedFile(_Record):
+    """A workflow file or local definition that was not parsed, and why."""
+
+    __slots__ = ("workflowFileName", "rejected", "reason")
+
+    def __init__(self, workflow_file_name, reason, rejected="resource limit"):
+        self.workflowFileName = workflow_file_name
+        self.rejected = rejected
+        self.reason = reason
@@ -0,0 +1,35 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import json
+
+
+class ResultCollector:
+    """
+    Receives each result from invoke_validate_actions. Results are written as
+    NDJSON the moment they are known, so a consumer reading the stream (or a
+    named pipe) can start before the scan ends. Only the denied actions are
+    kept, for the `actions` output of the GitHub Action.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.denied = {}
+
+    def __call__(self, result):
+        if self.stream is not None:
+            self.stream.write(json.dumps(result) + "\n")
+        if not result["approved"] and "rejected" not in result:
+            self.denied.setdefault((result["actionLink"], result["actionVersion"]))
+
+    def denied_actions(self):
+        return [
+            {"actionLink": action_link, "actionVersion": action_version}
+            for action_link, action_version in self.denied
+        ]
+
+    def write_github_output(self, path):
+        with open(path, "a") as file:
+            file.write(f"actions={json.dumps(self.denied_actions())}\n")
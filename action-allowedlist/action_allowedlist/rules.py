@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Approval rules are approved.json entries with a "*" in actionLink or
+# actionVersion, or with "deny": true. A "*" path segment matches one segment,
+# or any number of remaining segments when it is the last one ("my-org/*"). A
+# version is either "*", an exact version, or a prefix ending in "*" ("v2.*").
+#
+# Precedence: an exact approved.json entry always wins. Otherwise a matching
+# deny rule denies, and otherwise the most specific matching allow rule
+# approves (more literal path segments first, then exact version, then the
+# longest version prefix).
+
+ANY = "*"
+
+# Actions published by GitHub are always approved unless a deny rule says
+# otherwise.
+BUILTIN_RULES = (
+    {"actionLink": "github/*", "actionVersion": ANY},
+    {"actionLink": "actions/*", "actionVersion": ANY},
+)
+
+
+def is_rule(entry):
+    return (
+        ANY in entry["actionLink"]
+        or ANY in (entry["actionVersion"] or "")
+        or bool(entry.get("deny", False))
+    )
+
+
+def is_builtin(rule):
+    return any(rule is builtin for builtin in BUILTIN_RULES)
+
+
+def _prefer(current, entry):
+    # Of two rules with the same pattern, a deny rule wins.
+    if current is None or (entry.get("deny", False) and not current.get("deny", False)):
+        return entry
+    return current
+
+
+class _VersionRules:
+    __slots__ = ("exact", "prefixes", "any")
+
+    def __init__(self):
+        self.exact = {}
+        self.prefixes = {}
+        self.any = None
+
+    def add(self, pattern, entry):
+        if pattern == ANY:
+            self.any = _prefer(self.any, entry)
+        elif ANY not in pattern:
+            self.exact[pattern] = _prefer(self.exact.get(pattern), entry)
+        elif pattern.endswith(ANY) and ANY not in pattern[:-1]:
+            prefix = pattern[:-1]
+            self.prefixes[prefix] = _prefer(self.prefixes.get(prefix), entry)
+        else:
+            raise ValueError(
+                f"Unsupported version pattern '{pattern}': '*' may only end the version"
+            )
+
+    def match(self, version, literals, found):
+        # Cost depends on the length of the version, not the number of rules.
+        if version is not None:
+            if version in self.exact:
+                found.append(((literals, 2, len(version)), self.exact[version]))
+            for length in range(len(version), -1, -1):
+                entry = self.prefixes.get(version[:length])
+                if entry is not None:
+                    found.append(((literals, 1, length), entry))
+        if self.any is not None:
+            found.append(((literals, 0, 0), self.any))
+
+
+class _Node:
+    __slots__ = ("children", "versions", "rest")
+
+    def __init__(self):
+        self.children = {}
+        # Rules whose link ends at this node
+        self.versions = None
+        # Rules whose link ends with "*" after this node
+        self.rest = None
+
+
+class RuleMatcher:
+    """
+    Approval rules compiled into a trie over the path segments of actionLink,
+    so a lookup only follows the segments of the link being checked.
+    """
+
+    def __init__(self, rules=(), builtin=True):
+        self._root = _Node()
+        self.rules = (list(BUILTIN_RULES) if builtin else []) + list(rules)
+        for rule in self.rules:
+            self._add(rule)
+
+    def _add(self, rule):
+        segments = rule["actionLink"].split("/")
+        node = self._root
+        for index, segment in enumerate(segments):
+            if ANY in segment and segment != ANY:
+                raise ValueError(
+                    f"Unsupported link pattern '{rule['actionLink']}': "
+                    "'*' must be a whole path segment"
+                )
+            if segment == ANY and index == len(segments) - 1:
+                if node.rest is None:
+                    node.rest = _VersionRules()
+                node.rest.add(rule["actionVersion"] or "", rule)
+                return
+            node = node.children.setdefault(segment, _Node())
+        if node.versions is None:
+            node.versions = _VersionRules()
+        node.versions.add(rule["actionVersion"] or "", rule)
+
+    def _walk(self, node, segments, index, literals, version, found):
+        if node.rest is not None and index < len(segments):
+            node.rest.match(version, literals, found)
+        if index == len(segments):
+            if node.versions is not None:
+                node.versions.match(version, literals, found)
+            return
+        child = node.children.get(segments[index])
+        if child is not None:
+            self._walk(child, segments, index + 1, literals + 1, version, found)
+        child = node.children.get(ANY)
+        if child is not None:
+            self._walk(child, segments, index + 1, literals, version, found)
+
+    def match_rule(self, action_link, action_version):
+        """Returns the deciding rule, or None when no rule matches."""
+        found = []
+        self._walk(self._root, action_link.split("/"), 0, 0, action_version, found)
+        if not found:
+            return None
+        for _, rule in found:
+            if rule.get("deny", False):
+                return rule
+        return max(found, key=lambda match: match[0])[1]
+
+    def match(self, action_link, action_version):
+        """Returns the rule approving the action, or None when it is not approved."""
+        rule = self.match_rule(action_link, action_version)
+        if rule is None or rule.get("deny", False):
+            return None
+        return rule
@@ -0,0 +1,220 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from action_allowedlist.actions_parser import check_action, get_actions_from_file
+from action_allowedlist.approved_snapshot import load_approved_index
+from action_allowedlist.local_actions import is_local_reference
+from action_allowedlist.log import logger
+from action_allowedlist.workflow_outline import ResourceLimitError
+
+# Number of distinct workflow texts whose extracted actions are kept in memory.
+DEFAULT_PARSE_CACHE_SIZE = 1024
+
+
+def default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / "action-allowedlist.sock"
+
+
+class ApprovedListWatcher:
+    """
+    Holds the approved index in memory and loads it again when approved.json
+    or one of its overlays is replaced or modified, checked with a stat() on
+    every request.
+    """
+
+    def __init__(self, approved_path, overlays=()):
+        self.approved_path = Path(approved_path)
+        self.overlays = [Path(overlay) for overlay in overlays]
+        self._lock = threading.Lock()
+        self._signature = None
+        self._index = None
+
+    def _stat(self):
+        signature = []
+        for path in [self.approved_path, *self.overlays]:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        return tuple(signature)
+
+    def get(self):
+        signature = self._stat()
+        with self._lock:
+            if signature != self._signature:
+                try:
+                    index = load_approved_index(
+                        self.approved_path, overlays=self.overlays
+                    )
+                except (OSError, ValueError) as e:
+                    # Most likely caught halfway through an edit; keep
+                    # answering from the previous list until it is valid.
+                    if self._index is None:
+                        raise
+                    logger.warning(
+                        "Could not reload %s, keeping the previous list: %s",
+                        self.approved_path,
+                        e,
+                    )
+                    return self._index
+                self._index = index
+                self._signature = signature
+                logger.info(
+                    "Loaded approved list %s (%d actions)",
+                    self.approved_path,
+                    len(index),
+                )
+            return self._index
+
+
+def _verdict(approved_version, action_link, action_version):
+    return {
+        "actionLink": action_link,
+        "actionVersion": action_version,
+        "approved": approved_version is not None,
+        "deprecated": approved_version is not None and approved_version.deprecated,
+    }
+
+
+class ValidationService:
+    """Answers validation requests from a warm approved index and parse cache."""
+
+    def __init__(
+        self, approved_path, parse_cache_size=DEFAULT_PARSE_CACHE_SIZE, overlays=()
+    ):
+        self.approved = ApprovedListWatcher(approved_path, overlays)
+        self._extract = lru_cache(maxsize=parse_cache_size)(self._extract_actions)
+
+    @staticmethod
+    def _extract_actions(content):
+        return tuple(
+            (action["actionLink"], action["actionVersion"], action["jobName"])
+            for action in get_actions_from_file(content, "<workflow>")
+            if not is_local_reference(action)
+        )
+
+    def check(self, uses):
+        action_link, separator, action_version = uses.partition("@")
+        if not separator:
+            raise ValueError(
+                f"Expected an action reference like owner/repo@ref: {uses}"
+            )
+        approved = self.approved.get()
+        return _verdict(
+            check_action(approved, action_link, action_version),
+            action_link,
+            action_version,
+        )
+
+    def validate(self, content):
+        approved = self.approved.get()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        try:
+            extracted = self._extract(content)
+        except ResourceLimitError as e:
+            return _rejected("resource limit", e)
+        except Exception as e:
+            # Answered like any other result, so that a client checking
+            # several files goes on with the next one.
+            return _rejected("parse error", e)
+        jobs_by_action = {}
+        for action_link, action_version, job_name in extracted:
+            jobs = jobs_by_action.setdefault((action_link, action_version), [])
+            if job_name is not None and job_name not in jobs:
+                jobs.append(job_name)
+
+        results = []
+        for (action_link, action_version), jobs in jobs_by_action.items():
+            verdict = _verdict(
+                check_action(approved, action_link, action_version, debug),
+                action_link,
+                action_version,
+            )
+            verdict["jobs"] = jobs
+            results.append(verdict)
+        return {
+            "results": results,
+            "denied": sum(not result["approved"] for result in results),
+        }
+
+    def handle(self, request):
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True}
+        if command == "check":
+            return {"results": [self.check(uses) for uses in request["actions"]]}
+        if command == "validate":
+            return self.validate(request["workflow"])
+        raise ValueError(f"Unknown command: {command}")
+
+
+def _rejected(rejected, error):
+    return {"results": [], "denied": 0, "rejected": rejected, "reason": str(error)}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line, each answered with one JSON line.
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.service.handle(json.loads(line))
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class ValidationServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        self.socket_path = Path(socket_path)
+        self.service = service
+        if self.socket_path.exists():
+            if _is_listening(self.socket_path):
+                raise RuntimeError(f"A server is already listening on {socket_path}")
+            # Left behind by a server that did not shut down cleanly.
+            self.socket_path.unlink()
+        super().__init__(str(self.socket_path), _RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _is_listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def send_request(socket_path, request, timeout=30):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as reader:
+            response = json.loads(reader.readline())
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
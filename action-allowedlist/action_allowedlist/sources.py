@@ -0,0 +1,292 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Repositories read without a checkout: a git repository (bare or not) at a
+# given ref, through its objects, or a tar or zip archive of a repository.
+# Files are read into memory and never written to disk.
+
+import posixpath
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+from action_allowedlist.actions_parser import WORKFLOW_SUFFIXES
+from action_allowedlist.cat_file import CatFile, is_safe_name
+from action_allowedlist.git_diff import WORKFLOWS_PATH, run_git
+from action_allowedlist.local_actions import (
+    ACTION_FILE_NAMES,
+    DEFINITION_SUFFIXES,
+    DependencyGraph,
+)
+from action_allowedlist.workflow_outline import get_limits
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+class FileStat(NamedTuple):
+    st_size: int
+
+
+class SourceFile:
+    """
+    A file of a tree, with its content already read, unless it is over the
+    size limit; size is then the size of the file that was left unread.
+    """
+
+    __slots__ = ("tree", "path", "content", "size")
+
+    def __init__(self, tree, path, content, size=None):
+        self.tree = tree
+        self.path = path
+        self.content = content
+        self.size = len(content) if size is None else size
+
+    @property
+    def name(self):
+        return PurePosixPath(self.path).name
+
+    @property
+    def suffix(self):
+        return PurePosixPath(self.path).suffix
+
+    def stat(self):
+        return FileStat(self.size)
+
+    def read_text(self):
+        return self.content.decode()
+
+    def __str__(self):
+        return f"{self.tree}:{self.path}"
+
+
+class Tree(ABC):
+    """The files of a repository, by their path relative to its root."""
+
+    def __init__(self, label):
+        self.label = label
+        # The size of each file left unread for being over the size limit;
+        # read_many gives b"" for these.
+        self._sizes = {}
+
+    def __str__(self):
+        return self.label
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    def workflow_paths(self):
+        pass
+
+    @abstractmethod
+    def read_many(self, paths):
+        """Returns the content of each file, or None when it is not a file."""
+
+    def source_file(self, path, content):
+        return SourceFile(self.label, path, content, self._sizes.get(path))
+
+    def file(self, path):
+        content = self.read_many([path])[0]
+        return None if content is None else self.source_file(path, content)
+
+    def workflow_files(self):
+        paths = self.workflow_paths()
+        return [
+            self.source_file(path, content)
+            for path, content in zip(paths, self.read_many(paths))
+            if content is not None
+        ]
+
+    def dependency_graph(self, read_definition):
+        return TreeDependencyGraph(self, read_definition)
+
+
+class TreeDependencyGraph(DependencyGraph):
+    """A DependencyGraph whose local actions are looked up in a Tree."""
+
+    def __init__(self, tree: Tree, read_definition):
+        super().__init__(".", read_definition)
+        self.tree = tree
+
+    def node_for(self, path):
+        return path.path
+
+    def find_definition(self, action_link):
+        path = posixpath.normpath(action_link)
+        if path == ".." or path.startswith("../"):
+            return None
+        if path.endswith(DEFINITION_SUFFIXES):
+            definition = self.tree.file(path)
+            if definition is not None:
+                return definition
+        for name in ACTION_FILE_NAMES:
+            definition = self.tree.file(posixpath.join(path, name))
+            if definition is not None:
+                return definition
+        return None
+
+
+class GitTree(Tree):
+    """
+    A commit of a git repository. File contents come from a single long-running
+    `git cat-file --batch` process, after their sizes are checked with a
+    `--batch-check` one, so that a file over the size limit is never read.
+    """
+
+    def __init__(self, repository, ref="HEAD"):
+        self.repository = Path(repository)
+        self.commit = run_git(
+            self.repository, "rev-parse", "--verify", f"{ref}^{{commit}}"
+        ).strip()
+        super().__init__(f"{self.repository}@{ref}")
+        self._batch = None
+        self._check = None
+
+    def close(self):
+        if self._batch is not None:
+            self._batch.close()
+            self._check.close()
+            self._batch = None
+            self._check = None
+
+    def workflow_paths(self):
+        output = run_git(
+            self.repository, "ls-tree", "-z", self.commit, f"{WORKFLOWS_PATH}/"
+        )
+        paths = []
+        for line in output.split("\0"):
+            if not line:
+                continue
+            info, path = line.split("\t", 1)
+            if info.split()[1] == "blob" and path.endswith(WORKFLOW_SUFFIXES):
+                paths.append(path)
+        return sorted(paths)
+
+    def read_many(self, paths):
+        if self._batch is None:
+            self._batch = CatFile(self.repository)
+            self._check = CatFile(self.repository, contents=False)
+        # Paths come from `uses: ./...` in workflow files; one that cat-file
+        # cannot be asked for is not a file.
+        safe = [path for path in paths if is_safe_name(path)]
+        max_bytes = get_limits().max_bytes
+        contents = {}
+        readable = []
+        for path, info in zip(
+            safe, self._check.query(f"{self.commit}:{path}" for path in safe)
+        ):
+            if info is None or info.type != "blob":
+                continue
+            if info.size > max_bytes:
+                contents[path] = b""
+                self._sizes[path] = info.size
+            else:
+                readable.append((path, info.oid))
+        for (path, _), found in zip(
+            readable, self._batch.query(oid for _, oid in readable)
+        ):
+            contents[path] = found.content
+        return [contents.get(path) for path in paths]
+
+
+class ArchiveTree(Tree):
+    """
+    A tar or zip archive of a repository. The archive is read in one pass,
+    keeping only the YAML files, which are the only ones ever looked up. A
+    leading directory, such as the one in GitHub source archives, is skipped.
+    Files over the size limit are not read, and are rejected when parsed.
+    """
+
+    def __init__(self, path):
+        super().__init__(str(path))
+        max_bytes = get_limits().max_bytes
+        files = {}
+        sizes = {}
+        for name, size, read in _archive_members(Path(path)):
+            name = posixpath.normpath(name)
+            if not name.startswith("../") and name.endswith(DEFINITION_SUFFIXES):
+                if size > max_bytes:
+                    files[name] = b""
+                    sizes[name] = size
+                else:
+                    files[name] = read()
+        self._root = _archive_root(files)
+        self._files = {
+            name[len(self._root) :]: content
+            for name, content in files.items()
+            if name.startswith(self._root)
+        }
+        self._sizes = {
+            name[len(self._root) :]: size
+            for name, size in sizes.items()
+            if name.startswith(self._root)
+        }
+
+    def workflow_paths(self):
+        return sorted(
+            name
+            for name in self._files
+            if posixpath.dirname(name) == WORKFLOWS_PATH
+            and name.endswith(WORKFLOW_SUFFIXES)
+        )
+
+    def read_many(self, paths):
+        return [self._files.get(path) for path in paths]
+
+
+def _archive_members(path: Path):
+    # Imported here: only archive scans need them.
+    import tarfile
+    import zipfile
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield (
+                        info.filename,
+                        info.file_size,
+                        lambda info=info: archive.read(info),
+                    )
+        return
+    # Read as a stream, so that compressed archives are decompressed once.
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, member.size, archive.extractfile(member).read
+
+
+def _archive_root(names):
+    marker = f"{WORKFLOWS_PATH}/"
+    roots = {name[: name.index(marker)] for name in names if marker in name}
+    roots = {root for root in roots if root == "" or root.count("/") == 1}
+    return min(roots, key=len) if roots else ""
+
+
+def is_bare_repository(path: Path):
+    return (path / "HEAD").is_file() and (path / "objects").is_dir()
+
+
+def is_archive(path: Path):
+    return path.is_file() and path.name.endswith(ARCHIVE_SUFFIXES)
+
+
+def open_tree(path, ref=None):
+    """
+    Returns the Tree to scan for an archive, a bare repository, or any git
+    repository when a ref is given. Returns None for a working tree.
+    """
+    path = Path(path)
+    if path.is_file():
+        return ArchiveTree(path)
+    if ref is not None or is_bare_repository(path):
+        return GitTree(path, ref or "HEAD")
+    return None
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+# Wall and CPU time per phase of the run, plus one record per workflow file.
+# Recording is off unless enable() is called, in which case the module-level
+# recorder is shared by everything in the process, like the YAML backend.
+_recorder = None
+_current_file = None
+
+FILE_STEPS = ("read", "parse")
+PHASE_ORDER = {"discovery": 0, "read": 1, "parse": 2, "validation": 3, "total": 5}
+FILE_COUNTS = ("jobs", "steps", "references")
+
+
+class _Recorder:
+    def __init__(self):
+        self.started = (time.perf_counter(), time.process_time())
+        self.phases = {}
+        self.files = []
+
+
+def enable():
+    global _recorder
+    _recorder = _Recorder()
+
+
+def is_enabled():
+    return _recorder is not None
+
+
+@contextmanager
+def _measure(totals, name):
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        total = totals.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+        total["wall"] += time.perf_counter() - wall
+        total["cpu"] += time.process_time() - cpu
+
+
+def phase(name):
+    if _recorder is None:
+        return nullcontext()
+    return _measure(_recorder.phases, name)
+
+
+@contextmanager
+def _workflow_file(name):
+    global _current_file
+    record = {"file": name, "cached": False, **{count: 0 for count in FILE_COUNTS}}
+    _current_file = record
+    try:
+        yield record
+    finally:
+        _current_file = None
+        _recorder.files.append(record)
+
+
+def workflow_file(name):
+    if _recorder is None:
+        return nullcontext()
+    return _workflow_file(name)
+
+
+def step(name):
+    if _current_file is None:
+        return nullcontext()
+    return _measure(_current_file, name)
+
+
+def add_counts(cached=False, **counts):
+    if _current_file is None:
+        return
+    _current_file["cached"] = _current_file["cached"] or cached
+    for count, value in counts.items():
+        _current_file[count] += value
+
+
+def collect_files():
+    # Used by worker processes to hand their file records back to the parent.
+    if _recorder is None:
+        return []
+    files, _recorder.files = _recorder.files, []
+    return files
+
+
+def add_files(files):
+    if _recorder is not None:
+        _recorder.files.extend(files)
+
+
+def report():
+    wall, cpu = _recorder.started
+    phases = {name: dict(total) for name, total in _recorder.phases.items()}
+    # File steps may have run in several processes, so they are totals over
+    # files rather than a slice of the run's wall time.
+    for name in FILE_STEPS:
+        steps = [record[name] for record in _recorder.files if name in record]
+        if steps:
+            phases[name] = {
+                "wall": sum(s["wall"] for s in steps),
+                "cpu": sum(s["cpu"] for s in steps),
+            }
+    phases["total"] = {
+        "wall": time.perf_counter() - wall,
+        "cpu": time.process_time() - cpu,
+    }
+    phases = dict(sorted(phases.items(), key=lambda item: PHASE_ORDER.get(item[0], 4)))
+
+    counts = {"files": len(_recorder.files)}
+    for count in FILE_COUNTS:
+        counts[count] = sum(record[count] for record in _recorder.files)
+    counts["cached_files"] = sum(record["cached"] for record in _recorder.files)
+
+    return {"phases": phases, "counts": counts, "files": _recorder.files}
+
+
+def write_json(path):
+    with open(path, "w") as file:
+        json.dump(report(), file, indent=2)
+
+
+def write_step_summary(path):
+    document = report()
+    lines = [
+        "### Action allowedlist timings",
+        "",
+        "| Phase | Wall (s) | CPU (s) |",
+        "| --- | ---: | ---: |",
+    ]
+    for name, total in document["phases"].items():
+        lines.append(f"| {name} | {total['wall']:.3f} | {total['cpu']:.3f} |")
+    lines += ["", "| Count | Value |", "| --- | ---: |"]
+    for name, value in document["counts"].items():
+        lines.append(f"| {name} | {value} |")
+    with open(path, "a") as file:
+        file.write("\n".join(lines) + "\n\n")
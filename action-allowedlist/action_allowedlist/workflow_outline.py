@@ -0,0 +1,299 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Reads the outline of a workflow file or composite action from the YAML event
+# stream: only the values on the way to jobs.*.uses, jobs.*.steps[*].uses and
+# runs.steps[*].uses are constructed, and everything else is skipped event by
+# event without building nodes or Python objects. The result has the same
+# shape as safe_load would give for those keys, so malformed files fail the
+# same way. Anchored nodes are recorded as they go by, so aliases and merge
+# keys (<<) read the same as with safe_load; an alias is only expanded where
+# its value is read.
+#
+# Every file is parsed within ParseLimits, so that a hostile workflow, such as
+# an alias bomb, is rejected instead of tying up the runner.
+
+import time
+from typing import NamedTuple
+
+from action_allowedlist.yaml_backend import get_loader
+
+MERGE_TAG = "tag:yaml.org,2002:merge"
+
+# A schema says which keys of a mapping to read (None stands for every key)
+# and what to expect under them; a list gives the schema of every item.
+SCALAR = "scalar"
+LOCATED = "located"
+STEP = {"uses": LOCATED}
+STEPS = [STEP]
+JOB = {"uses": LOCATED, "steps": STEPS}
+WORKFLOW = {"jobs": {None: JOB}, "runs": {"using": SCALAR, "steps": STEPS}}
+
+# Events read between two checks of the parse time.
+TIME_CHECK_INTERVAL = 1024
+
+
+class ParseLimits(NamedTuple):
+    max_bytes: int = 4 * 1024 * 1024
+    max_aliases: int = 1000
+    max_depth: int = 100
+    max_seconds: float = 10.0
+
+
+class ResourceLimitError(Exception):
+    """A file that was not parsed because it is over one of the ParseLimits."""
+
+
+_limits = ParseLimits()
+
+
+def set_limits(limits: ParseLimits):
+    global _limits
+    _limits = limits
+
+
+def get_limits():
+    return _limits
+
+
+def check_size(size, limits=None):
+    """Raises ResourceLimitError for a file of size bytes over the limits."""
+    limits = limits or _limits
+    if size > limits.max_bytes:
+        raise ResourceLimitError(f"larger than {limits.max_bytes} bytes")
+
+
+class LocatedStr(str):
+    """A string scalar with the 1-based line and column where it starts."""
+
+    __slots__ = ("line", "column")
+
+
+class _OutlineReader:
+    def __init__(self, loader, limits: ParseLimits):
+        import yaml
+
+        self.yaml = yaml
+        self.loader = loader
+        self.limits = limits
+        self.deadline = time.monotonic() + limits.max_seconds
+        self.anchors = {}
+        self.aliases = 0
+        self.depth = 0
+        self.count = 0
+        self._recording = []
+        self._replay = []
+
+    def next_event(self, expand=True):
+        events = self.yaml.events
+        while True:
+            if self._replay:
+                event = next(self._replay[-1], None)
+                if event is None:
+                    self._replay.pop()
+                    continue
+            else:
+                event = self.loader.get_event()
+                if self._recording or getattr(event, "anchor", None) is not None:
+                    self._record(event)
+            if isinstance(event, events.AliasEvent):
+                recorded = self.anchors.get(event.anchor)
+                if recorded is None:
+                    raise self.yaml.composer.ComposerError(
+                        None,
+                        None,
+                        f"found undefined alias {event.anchor}",
+                        event.start_mark,
+                    )
+                if expand:
+                    # Each expansion counts, including those of aliases
+                    # inside an expanded node.
+                    self.aliases += 1
+                    if self.aliases > self.limits.max_aliases:
+                        raise ResourceLimitError(
+                            f"more than {self.limits.max_aliases} aliases expanded"
+                            f", at line {event.start_mark.line + 1}"
+                        )
+                    self._replay.append(iter(recorded))
+                    continue
+            break
+
+        self.count += 1
+        if isinstance(event, events.CollectionStartEvent):
+            self.depth += 1
+            if self.depth > self.limits.max_depth:
+                raise ResourceLimitError(
+                    f"nested more than {self.limits.max_depth} levels deep"
+                    f", at line {event.start_mark.line + 1}"
+                )
+        elif isinstance(event, events.CollectionEndEvent):
+            self.depth -= 1
+        if not self.count % TIME_CHECK_INTERVAL and time.monotonic() > self.deadline:
+            raise ResourceLimitError(f"not parsed within {self.limits.max_seconds:g}s")
+        return event
+
+    def _record(self, event):
+        # Events are recorded as parsed, with aliases left unexpanded.
+        events = self.yaml.events
+        for recording in self._recording:
+            recording[0].append(event)
+        is_node = isinstance(event, (events.ScalarEvent, events.CollectionStartEvent))
+        if is_node and event.anchor is not None:
+            self._recording.append([[event], 0])
+        if isinstance(event, events.CollectionStartEvent):
+            depth = 1
+        elif isinstance(event, events.CollectionEndEvent):
+            depth = -1
+        else:
+            depth = 0
+        for recording in self._recording:
+            recording[1] += depth
+        while self._recording and self._recording[-1][1] == 0:
+            recorded, _ = self._recording.pop()
+            self.anchors[recorded[0].anchor] = recorded
+
+    def tag(self, event):
+        # The same resolution as the composer does for scalars.
+        if event.tag is None or event.tag == "!":
+            return self.loader.resolve(
+                self.yaml.nodes.ScalarNode, event.value, event.implicit
+            )
+        return event.tag
+
+    def construct(self, event, tag):
+        node = self.yaml.nodes.ScalarNode(
+            tag, event.value, event.start_mark, event.end_mark, event.style
+        )
+        constructors = self.loader.yaml_constructors
+        constructor = constructors.get(tag, constructors.get(None))
+        return constructor(self.loader, node)
+
+    def skip(self, event):
+        events = self.yaml.events
+        depth = 1 if isinstance(event, events.CollectionStartEvent) else 0
+        while depth:
+            event = self.next_event(expand=False)
+            if isinstance(event, events.CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, events.CollectionEndEvent):
+                depth -= 1
+
+    def read(self, event, schema):
+        events = self.yaml.events
+        if schema is None:
+            self.skip(event)
+            return None
+        if isinstance(event, events.ScalarEvent):
+            value = self.construct(event, self.tag(event))
+            if schema == LOCATED and isinstance(value, str):
+                value = LocatedStr(value)
+                value.line = event.start_mark.line + 1
+                value.column = event.start_mark.column + 1
+            return value
+        if isinstance(event, events.SequenceStartEvent):
+            item_schema = schema[0] if isinstance(schema, list) else None
+            items = []
+            while True:
+                event = self.next_event(expand=item_schema is not None)
+                if isinstance(event, events.SequenceEndEvent):
+                    return items
+                items.append(self.read(event, item_schema))
+        return dict(self.pairs(event, schema if isinstance(schema, dict) else {}))
+
+    def pairs(self, event, schema):
+        events = self.yaml.events
+        merged = []
+        pairs = []
+        while True:
+            key_event = self.next_event()
+            if isinstance(key_event, events.MappingEndEvent):
+                break
+            if not isinstance(key_event, events.ScalarEvent):
+                # A collection as a key; none of the keys read are like that.
+                self.skip(key_event)
+                self.skip(self.next_event(expand=False))
+                continue
+            tag = self.tag(key_event)
+            if tag == MERGE_TAG:
+                merged.extend(self.merge(self.next_event(), schema))
+                continue
+            key = self.construct(key_event, tag)
+            value_schema = schema[key] if key in schema else schema.get(None)
+            # An alias is left unexpanded when its value is skipped.
+            value_event = self.next_event(expand=value_schema is not None)
+            if value_schema is None:
+                self.skip(value_event)
+            else:
+                pairs.append((key, self.read(value_event, value_schema)))
+        # As in SafeConstructor.flatten_mapping, the mapping's own keys come
+        # after, and so override, the merged ones.
+        return merged + pairs
+
+    def merge(self, event, schema):
+        events = self.yaml.events
+        if isinstance(event, events.MappingStartEvent):
+            return self.pairs(event, schema)
+        if isinstance(event, events.SequenceStartEvent):
+            mappings = []
+            while True:
+                event = self.next_event()
+                if isinstance(event, events.SequenceEndEvent):
+                    break
+                if not isinstance(event, events.MappingStartEvent):
+                    raise self.yaml.constructor.ConstructorError(
+                        "while constructing a mapping",
+                        None,
+                        "expected a mapping for merging",
+                        event.start_mark,
+                    )
+                mappings.append(self.pairs(event, schema))
+            # Earlier mappings in the list take precedence.
+            return [pair for pairs in reversed(mappings) for pair in pairs]
+        raise self.yaml.constructor.ConstructorError(
+            "while constructing a mapping",
+            None,
+            "expected a mapping or list of mappings for merging",
+            event.start_mark,
+        )
+
+    def read_document(self, schema):
+        events = self.yaml.events
+        self.next_event()  # StreamStartEvent
+        event = self.next_event()
+        if isinstance(event, events.StreamEndEvent):
+            return None
+        outline = self.read(self.next_event(), schema)
+        self.next_event()  # DocumentEndEvent
+        event = self.next_event()
+        if not isinstance(event, events.StreamEndEvent):
+            raise self.yaml.composer.ComposerError(
+                "expected a single document in the stream",
+                None,
+                "but found another document",
+                event.start_mark,
+            )
+        return outline
+
+
+def load_outline(stream, schema=WORKFLOW, limits=None):
+    """
+    Returns the parts of the document that the schema asks for, like
+    safe_load(stream) with everything else left out. String values read as
+    LOCATED are LocatedStr. Raises ResourceLimitError for a document over the
+    limits, by default those given to set_limits().
+    """
+    limits = limits or _limits
+    if isinstance(stream, str):
+        size = len(stream) if stream.isascii() else len(stream.encode())
+    elif isinstance(stream, bytes):
+        size = len(stream)
+    else:
+        size = 0
+    check_size(size, limits)
+    loader = get_loader()(stream)
+    try:
+        return _OutlineReader(loader, limits).read_document(schema)
+    finally:
+        loader.dispose()
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Backend names in order of preference, known without importing PyYAML so that
+# commands which never parse YAML do not pay for loading it.
+BACKENDS = ("libyaml", "python")
+
+_loaders = None
+_backend = None
+
+
+def get_loaders():
+    global _loaders
+    if _loaders is None:
+        import yaml
+
+        # CSafeLoader is only present when PyYAML was built against libyaml.
+        _loaders = {
+            "libyaml": getattr(yaml, "CSafeLoader", None),
+            "python": yaml.SafeLoader,
+        }
+    return _loaders
+
+
+def available_backends():
+    return [name for name, loader in get_loaders().items() if loader is not None]
+
+
+def select_backend(name="auto"):
+    global _backend
+    if name == "auto":
+        name = available_backends()[0]
+    elif name not in BACKENDS:
+        raise ValueError(
+            f"Unknown YAML backend '{name}', expected one of: auto, {', '.join(BACKENDS)}"
+        )
+    elif get_loaders()[name] is None:
+        raise RuntimeError(
+            f"YAML backend '{name}' is not available in this Python environment"
+        )
+    _backend = name
+    return name
+
+
+def get_backend():
+    if _backend is None:
+        select_backend()
+    return _backend
+
+
+def get_loader():
+    return get_loaders()[get_backend()]
+
+
+def safe_load(stream):
+    # The same as yaml.load(stream, Loader=get_loader()).
+    loader = get_loader()(stream)
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
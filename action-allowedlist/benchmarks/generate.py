@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import argparse
+import hashlib
+import json
+import random
+from pathlib import Path
+
+
+def fake_sha(rng: random.Random):
+    return hashlib.sha1(rng.randbytes(16)).hexdigest()
+
+
+def generate_approved(rng: random.Random, approved_entries, deprecated_ratio=0.1):
+    approved = []
+    for index in range(approved_entries):
+        entry = {
+            "actionLink": f"owner{index % 97}/action-{index}",
+            "actionVersion": fake_sha(rng),
+            "tag": f"v{index % 7}",
+        }
+        if rng.random() < deprecated_ratio:
+            entry["deprecated"] = True
+        approved.append(entry)
+    return approved
+
+
+def generate_workflow(rng: random.Random, approved, jobs, steps, denied_ratio):
+    lines = ["name: Synthetic", "on: [push, pull_request]", "jobs:"]
+    for job in range(jobs):
+        lines += [f"  job-{job}:", "    runs-on: ubuntu-latest", "    steps:"]
+        for step in range(steps):
+            roll = rng.random()
+            if roll < 0.2:
+                uses = f"actions/checkout@{fake_sha(rng)}"
+            elif roll < 0.2 + denied_ratio or not approved:
+                uses = f"unknown{rng.randrange(50)}/action@{fake_sha(rng)}"
+            else:
+                entry = rng.choice(approved)
+                uses = f"{entry['actionLink']}@{entry['actionVersion']}"
+            lines += [
+                f"      - name: Step {step}",
+                f"        uses: {uses}",
+                "        with:",
+                f"          input: value-{step}",
+            ]
+        lines += ["      - name: Script", "        run: echo done"]
+    return "\n".join(lines) + "\n"
+
+
+def generate_repository(
+    directory: Path,
+    workflows=10,
+    jobs=5,
+    steps=10,
+    approved_entries=1000,
+    denied_ratio=0.05,
+    seed=0,
+):
+    """
+    Write a synthetic repository with workflows * jobs * steps action references,
+    plus an approved.json next to it. Returns (repository, approved_path).
+    """
+    rng = random.Random(seed)
+    approved = generate_approved(rng, approved_entries)
+
+    repository = Path(directory) / "repository"
+    workflows_dir = repository / ".github" / "workflows"
+    workflows_dir.mkdir(parents=True, exist_ok=True)
+    for workflow in range(workflows):
+        (workflows_dir / f"workflow-{workflow:05d}.yml").write_text(
+            generate_workflow(rng, approved, jobs, steps, denied_ratio)
+        )
+
+    approved_path = Path(directory) / "approved.json"
+    approved_path.write_text(json.dumps(approved, indent=2))
+    return repository, approved_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic repository and approved list."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--workflows", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--approved-entries", type=int, default=1000)
+    parser.add_argument("--denied-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    repository, approved_path = generate_repository(
+        args.directory,
+        args.workflows,
+        args.jobs,
+        args.steps,
+        args.approved_entries,
+        args.denied_ratio,
+        args.seed,
+    )
+    print(f"Repository: {repository}")
+    print(f"Approval file: {approved_path}")
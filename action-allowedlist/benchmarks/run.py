@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from action_allowedlist.actions_parser import (  # noqa: E402
+    find_workflow_files,
+    get_all_used_actions,
+    invoke_validate_actions,
+    iter_used_actions,
+)
+from action_allowedlist.approved_index import ApprovedIndex  # noqa: E402
+from action_allowedlist.yaml_backend import get_backend, select_backend  # noqa: E402
+from benchmarks.generate import generate_repository  # noqa: E402
+
+# Number of action references -> (workflows, jobs per workflow, steps per job)
+SCALES = {
+    "10": (1, 2, 5),
+    "1k": (10, 10, 10),
+    "10k": (100, 10, 10),
+    "100k": (1000, 10, 10),
+}
+
+
+def measure(function, repeat):
+    """
+    Run function repeat times with its output discarded. Returns the timings
+    and the peak traced memory of one extra run.
+    """
+    timings = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, {
+        "seconds": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+        },
+        "repeat": repeat,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_scale(name, approved_entries, repeat, seed):
+    workflows, jobs, steps = SCALES[name]
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repository, approved_path = generate_repository(
+            temp_dir, workflows, jobs, steps, approved_entries, seed=seed
+        )
+
+        workflow_files, discovery = measure(
+            lambda: find_workflow_files(repository), repeat
+        )
+        actions, parsing = measure(lambda: get_all_used_actions(repository), repeat)
+        approved_index = ApprovedIndex.from_file(approved_path)
+        _, validation = measure(
+            lambda: invoke_validate_actions(approved_index, actions), repeat
+        )
+        # Parsing and validation streamed together, as the CLI runs them.
+        _, streaming = measure(
+            lambda: invoke_validate_actions(
+                approved_index, iter_used_actions(repository)
+            ),
+            repeat,
+        )
+
+        for phase, measurement in [
+            ("discovery", discovery),
+            ("parsing", parsing),
+            ("validation", validation),
+            ("streaming", streaming),
+        ]:
+            results.append(
+                {
+                    "scale": name,
+                    "phase": phase,
+                    "workflow_files": len(workflow_files),
+                    "references": len(actions),
+                    "approved_entries": approved_entries,
+                    **measurement,
+                }
+            )
+    return results
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results):
+    previous = {(r["scale"], r["phase"]): r for r in baseline["results"]}
+    print(f"{'scale':>6} {'phase':<11} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in results["results"]:
+        key = (result["scale"], result["phase"])
+        if key not in previous:
+            continue
+        before = previous[key]["seconds"]["median"]
+        after = result["seconds"]["median"]
+        ratio = after / before if before else float("inf")
+        print(f"{key[0]:>6} {key[1]:<11} {before:>10.4f} {after:>10.4f} {ratio:>6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark discovery, parsing and validation."
+    )
+    parser.add_argument(
+        "--scales",
+        default="10,1k,10k",
+        help=f"Comma-separated scales to run, from: {', '.join(SCALES)}.",
+    )
+    parser.add_argument("--approved-entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--yaml-backend", default="auto")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against.")
+    args = parser.parse_args()
+
+    select_backend(args.yaml_backend)
+    results = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "yaml_backend": get_backend(),
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+    for scale in args.scales.split(","):
+        print(f"Running scale {scale}", file=sys.stderr)
+        results["results"].extend(
+            run_scale(scale, args.approved_entries, args.repeat, args.seed)
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), results)
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipapp
+from pathlib import Path
+
+PACKAGE = Path(__file__).resolve().parent / "action_allowedlist"
+
+LAUNCHER = """\
+import runpy
+
+runpy.run_module("action_allowedlist", run_name="__main__", alter_sys=True)
+"""
+
+
+def build(target: Path, include_pyyaml=False, interpreter="/usr/bin/env python3"):
+    """
+    Write a single-file zipapp of the action_allowedlist package. PyYAML is
+    expected on the target system unless include_pyyaml is set, in which case
+    it is installed into the archive. Extension modules cannot be imported
+    from a zip, so the bundled copy only offers the pure Python backend.
+    """
+    with tempfile.TemporaryDirectory() as staging:
+        staging = Path(staging)
+        shutil.copytree(
+            PACKAGE,
+            staging / "action_allowedlist",
+            ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+        )
+        (staging / "__main__.py").write_text(LAUNCHER)
+        if include_pyyaml:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "pip",
+                    "install",
+                    "--quiet",
+                    "--no-compile",
+                    "--target",
+                    str(staging),
+                    "--requirement",
+                    str(PACKAGE.parent / "requirements.txt"),
+                ],
+                check=True,
+            )
+        zipapp.create_archive(staging, target, interpreter=interpreter, compressed=True)
+    return target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build action_allowedlist as a single-file zipapp."
+    )
+    parser.add_argument(
+        "-o", "--output", default="action_allowedlist.pyz", help="Archive path."
+    )
+    parser.add_argument(
+        "--include-pyyaml",
+        action="store_true",
+        help="Bundle PyYAML (pure Python loader only) into the archive.",
+    )
+    args = parser.parse_args()
+
+    print(f"Wrote {build(Path(args.output), args.include_pyyaml)}")
@@ -9,4 +9,4 @@ location=$PWD
 cd /app > /dev/null
 
 # Run the application using the virtual environment
-/app/.venv/bin/python action_allowedlist $location "/app/approved.json"
+/app/.venv/bin/python action_allowedlist $location "/app/approved.json" "$@"
@@ -0,0 +1,14 @@
+import logging
+
+import pytest
+
+from action_allowedlist.log import logger
+
+
+@pytest.fixture
+def debug_logging():
+    """Turn on debug output from the action_allowedlist logger for one test."""
+    previous = logger.level
+    logger.setLevel(logging.DEBUG)
+    yield
+    logger.setLevel(previous)
@@ -0,0 +1,32 @@
+import subprocess
+from pathlib import Path
+
+
+def git(repository: Path, *args):
+    """Runs git in repository as a test user, returning its output."""
+    return subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "-C",
+            str(repository),
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def write(path: Path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def workflow(*uses):
+    """A workflow file with one job whose steps use each of uses."""
+    steps = "".join(f"      - uses: {u}\n" for u in uses)
+    return f"on: push\njobs:\n  build:\n    steps:\n{steps}"
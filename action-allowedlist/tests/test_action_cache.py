@@ -0,0 +1,145 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from action_allowedlist.action_cache import ActionCache
+from action_allowedlist.actions_parser import get_all_used_actions
+from action_allowedlist.workflow_outline import ParseLimits, set_limits
+
+WORKFLOW = """
+name: Test
+on: [push]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - uses: some/custom-action@v1
+"""
+
+
+class TestActionCache:
+    """Test cases for the ActionCache class."""
+
+    def test_miss_then_hit(self):
+        """Test that a stored entry is returned for identical content."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ActionCache(temp_dir)
+            actions = [
+                {
+                    "actionLink": "actions/checkout",
+                    "actionVersion": "v4",
+                    "workflowFileName": "test.yml",
+                    "jobName": "test",
+                }
+            ]
+
+            assert cache.get(WORKFLOW) is None
+            cache.put(WORKFLOW, actions)
+
+            assert cache.get(WORKFLOW) == [
+                {
+                    "actionLink": "actions/checkout",
+                    "actionVersion": "v4",
+                    "jobName": "test",
+                }
+            ]
+            assert cache.get(WORKFLOW + "\n# changed") is None
+            assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_put_leaves_no_temporary_files(self):
+        """Test that entries are written through an atomic rename."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ActionCache(temp_dir)
+            cache.put(WORKFLOW, [])
+
+            files = [path.name for path in Path(temp_dir).rglob("*") if path.is_file()]
+
+            assert files == [f"{cache.key(WORKFLOW)}.json"]
+
+    def test_prune_evicts_least_recently_used(self):
+        """Test that the oldest entries are removed first once over the size limit."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ActionCache(temp_dir)
+            contents = [f"{WORKFLOW}# {index}" for index in range(3)]
+            for index, content in enumerate(contents):
+                cache.put(content, [])
+                path = cache._path(cache.key(content))
+                os.utime(path, (1000 + index, 1000 + index))
+            entry_size = cache._path(cache.key(contents[0])).stat().st_size
+
+            # Reading the oldest entry makes it the most recently used one.
+            cache.get(contents[0])
+            cache.max_bytes = entry_size * 2
+            removed = cache.prune()
+
+            assert removed == 1
+            assert cache.get(contents[0]) is not None
+            assert cache.get(contents[1]) is None
+            assert cache.get(contents[2]) is not None
+
+
+class TestGetAllUsedActionsWithCache:
+    """Test cases for get_all_used_actions with a cache."""
+
+    def test_unchanged_files_skip_parsing(self):
+        """Test that a second scan reads every file from the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / "repo" / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            (workflows_dir / "test.yml").write_text(WORKFLOW)
+            cache = ActionCache(Path(temp_dir) / "cache")
+
+            with patch("builtins.print"):
+                first = get_all_used_actions(Path(temp_dir) / "repo", cache=cache)
+                with patch(
+                    "action_allowedlist.actions_parser.get_actions_from_file"
+                ) as mock_parse:
+                    second = get_all_used_actions(Path(temp_dir) / "repo", cache=cache)
+
+            mock_parse.assert_not_called()
+            assert second == first
+            assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_entries_kept_per_parse_limits(self):
+        """Test that a file parsed under looser limits is checked again."""
+        aliases = "x: &a actions/checkout@v4\n" + WORKFLOW + "      - uses: *a\n" * 20
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / "repo" / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            (workflows_dir / "test.yml").write_text(aliases)
+            cache = ActionCache(Path(temp_dir) / "cache")
+
+            try:
+                with patch("builtins.print"):
+                    set_limits(ParseLimits(max_aliases=100))
+                    first = get_all_used_actions(Path(temp_dir) / "repo", cache=cache)
+                    set_limits(ParseLimits(max_aliases=10))
+                    second = get_all_used_actions(Path(temp_dir) / "repo", cache=cache)
+            finally:
+                set_limits(ParseLimits())
+
+            assert len(first) == 22
+            assert [action["rejected"] for action in second] == ["resource limit"]
+            assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_cache_counts_reported(self, capsys):
+        """Test that hit and miss counts are printed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / "repo" / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            (workflows_dir / "a.yml").write_text(WORKFLOW)
+            (workflows_dir / "b.yml").write_text(WORKFLOW)
+            cache = ActionCache(Path(temp_dir) / "cache")
+
+            actions = get_all_used_actions(Path(temp_dir) / "repo", cache=cache)
+
+            # Both files have the same content, so the second is a hit.
+            assert "Action cache: 1 hits, 1 misses" in capsys.readouterr().out
+            assert [action["workflowFileName"] for action in actions] == [
+                "a.yml",
+                "a.yml",
+                "b.yml",
+                "b.yml",
+            ]
@@ -7,12 +7,17 @@ from unittest.mock import patch
 import yaml
 
 from action_allowedlist.actions_parser import (
+    ApprovedIndex,
     load_json_file,
     load_yaml_file,
     get_actions_from_file,
     get_all_used_actions,
     invoke_validate_actions,
+    iter_used_actions,
+    validate_actions,
 )
+from action_allowedlist.records import RejectedFile
+from action_allowedlist.workflow_outline import ParseLimits, set_limits
 
 
 class TestLoadJsonFile:
@@ -85,6 +90,77 @@ class TestLoadYamlFile:
             os.unlink(temp_file)
 
 
+class TestApprovedIndex:
+    """Test cases for the ApprovedIndex lookup table."""
+
+    def setup_method(self):
+        """Set up an approved list with several versions of one action."""
+        self.approved_actions = [
+            {
+                "actionLink": "some/custom-action",
+                "actionVersion": "abc123",
+                "tag": "v1",
+                "deprecated": True,
+            },
+            {
+                "actionLink": "some/custom-action",
+                "actionVersion": "def456",
+                "tag": "v2",
+            },
+            {"actionLink": "./local-action", "actionVersion": None},
+        ]
+
+    def test_lookup_approved_version(self):
+        """Test looking up an approved link and version."""
+        index = ApprovedIndex(self.approved_actions)
+
+        record = index.lookup("some/custom-action", "def456")
+
+        assert record is not None
+        assert record.tag == "v2"
+        assert record.deprecated is False
+        assert record.entries == (self.approved_actions[1],)
+
+    def test_lookup_deprecated_version(self):
+        """Test that the deprecated flag is carried into the record."""
+        index = ApprovedIndex(self.approved_actions)
+
+        record = index.lookup("some/custom-action", "abc123")
+
+        assert record.deprecated is True
+        assert record.tag == "v1"
+
+    def test_lookup_unknown_version(self):
+        """Test looking up a version that is not approved."""
+        index = ApprovedIndex(self.approved_actions)
+
+        assert index.lookup("some/custom-action", "zzz999") is None
+        assert index.lookup("unknown/action", "abc123") is None
+
+    def test_versions_in_file_order(self):
+        """Test that approved versions are listed in approved.json order."""
+        index = ApprovedIndex(self.approved_actions)
+
+        assert "some/custom-action" in index
+        assert "unknown/action" not in index
+        assert index.versions("some/custom-action") == ["abc123", "def456"]
+        assert index.versions("unknown/action") == []
+        assert len(index) == 3
+
+    def test_invoke_validate_actions_accepts_index(self):
+        """Test that a prebuilt index can be passed instead of a file path."""
+        index = ApprovedIndex(self.approved_actions)
+        actions_config = [
+            {"actionLink": "some/custom-action", "actionVersion": "def456"},
+            {"actionLink": "some/custom-action", "actionVersion": "zzz999"},
+        ]
+
+        with patch("builtins.print"):
+            result = invoke_validate_actions(index, actions_config)
+
+        assert result is True
+
+
 class TestGetActionsFromFile:
     """Test cases for get_actions_from_file function."""
 
@@ -109,11 +185,13 @@ jobs:
                 "actionLink": "actions/checkout",
                 "actionVersion": "v4",
                 "workflowFileName": "test.yml",
+                "jobName": "test",
             },
             {
                 "actionLink": "actions/setup-python",
                 "actionVersion": "v5",
                 "workflowFileName": "test.yml",
+                "jobName": "test",
             },
         ]
 
@@ -144,16 +222,19 @@ jobs:
                 "actionLink": "actions/checkout",
                 "actionVersion": "v4",
                 "workflowFileName": "multi.yml",
+                "jobName": "build",
             },
             {
                 "actionLink": "actions/setup-node",
                 "actionVersion": "v4",
                 "workflowFileName": "multi.yml",
+                "jobName": "test",
             },
             {
                 "actionLink": "github/super-linter",
                 "actionVersion": "v7",
                 "workflowFileName": "multi.yml",
+                "jobName": "test",
             },
         ]
 
@@ -181,16 +262,19 @@ jobs:
                 "actionLink": "actions/checkout",
                 "actionVersion": "v4",
                 "workflowFileName": "codeql.yml",
+                "jobName": "analyze",
             },
             {
                 "actionLink": "github/codeql-action/init",
                 "actionVersion": "v3",
                 "workflowFileName": "codeql.yml",
+                "jobName": "analyze",
             },
             {
                 "actionLink": "github/codeql-action/analyze",
                 "actionVersion": "v3",
                 "workflowFileName": "codeql.yml",
+                "jobName": "analyze",
             },
         ]
 
@@ -265,6 +349,7 @@ jobs:
                 "actionLink": "actions/setup-python",
                 "actionVersion": "v5",
                 "workflowFileName": "invalid.yml",
+                "jobName": "test",
             }
         ]
 
@@ -315,11 +400,13 @@ jobs:
                     "actionLink": "actions/checkout",
                     "actionVersion": "v4",
                     "workflowFileName": "test1.yml",
+                    "jobName": "test",
                 },
                 {
                     "actionLink": "github/super-linter",
                     "actionVersion": "v7",
                     "workflowFileName": "test2.yml",
+                    "jobName": "test",
                 },
             ]
 
@@ -358,6 +445,7 @@ jobs:
                     "actionLink": "actions/setup-node",
                     "actionVersion": "v4",
                     "workflowFileName": "test.yml",
+                    "jobName": "test",
                 }
             ]
 
@@ -406,11 +494,149 @@ jobs:
                     "actionLink": "actions/checkout",
                     "actionVersion": "v4",
                     "workflowFileName": "valid.yml",
+                    "jobName": "test",
                 }
             ]
 
             assert actions == expected
 
+    def test_get_all_used_actions_parallel_matches_serial(self):
+        """Test that parsing with several jobs returns the serial result in file order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+
+            for index in range(6):
+                (workflows_dir / f"workflow{index}.yml").write_text(
+                    f"""
+name: Workflow {index}
+on: [push]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: some/action-{index}@v{index}
+"""
+                )
+
+            with patch("builtins.print"):
+                serial = get_all_used_actions(Path(temp_dir))
+                parallel = get_all_used_actions(Path(temp_dir), jobs=3)
+
+            assert parallel == serial
+            assert [action["actionLink"] for action in parallel] == [
+                f"some/action-{index}" for index in range(6)
+            ]
+
+    def test_get_all_used_actions_parallel_with_malformed_yaml(self, capsys):
+        """Test that a malformed file does not abort a parallel batch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+
+            (workflows_dir / "a-invalid.yml").write_text(
+                "invalid: yaml\n\t bad_indentation: and tabs"
+            )
+            (workflows_dir / "b-valid.yml").write_text(
+                """
+name: Valid
+on: [push]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+"""
+            )
+
+            actions = get_all_used_actions(Path(temp_dir), jobs=2)
+
+            assert any(
+                "Error occurred while reading" in line and "a-invalid.yml" in line
+                for line in capsys.readouterr().out.splitlines()
+            )
+            assert actions == [
+                {
+                    "actionLink": "actions/checkout",
+                    "actionVersion": "v4",
+                    "workflowFileName": "b-valid.yml",
+                    "jobName": "test",
+                }
+            ]
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_get_all_used_actions_rejects_files_over_limits(self, jobs):
+        """Test that workflows and local actions over the parse limits are rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            (workflows_dir / "a-deep.yml").write_text(
+                "jobs: {build: {steps: " + "[" * 20 + "]" * 20 + "}}"
+            )
+            (workflows_dir / "b-valid.yml").write_text(
+                """
+jobs:
+  test:
+    steps:
+      - uses: actions/checkout@v4
+      - uses: ./deep-action
+"""
+            )
+            (Path(temp_dir) / "deep-action").mkdir()
+            (Path(temp_dir) / "deep-action" / "action.yml").write_text(
+                "runs: {using: composite, steps: " + "[" * 20 + "]" * 20 + "}"
+            )
+
+            set_limits(ParseLimits(max_depth=10))
+            try:
+                with patch("builtins.print"):
+                    actions = get_all_used_actions(Path(temp_dir), jobs=jobs)
+            finally:
+                set_limits(ParseLimits())
+
+            assert [dict(action) for action in actions] == [
+                {
+                    "workflowFileName": "a-deep.yml",
+                    "rejected": "resource limit",
+                    "reason": "nested more than 10 levels deep, at line 1",
+                },
+                {
+                    "actionLink": "actions/checkout",
+                    "actionVersion": "v4",
+                    "workflowFileName": "b-valid.yml",
+                    "jobName": "test",
+                },
+                {
+                    "workflowFileName": "deep-action/action.yml",
+                    "rejected": "resource limit",
+                    "reason": "nested more than 10 levels deep, at line 1",
+                },
+            ]
+
+    def test_get_all_used_actions_does_not_read_large_files(self):
+        """Test that a file over the size limit is rejected before it is read."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            (workflows_dir / "large.yml").write_text("jobs: {}\n" + "#" * 100)
+
+            set_limits(ParseLimits(max_bytes=50))
+            try:
+                with patch("builtins.print"), patch.object(
+                    Path, "read_text", side_effect=AssertionError("read")
+                ):
+                    actions = get_all_used_actions(Path(temp_dir))
+            finally:
+                set_limits(ParseLimits())
+
+            assert [dict(action) for action in actions] == [
+                {
+                    "workflowFileName": "large.yml",
+                    "rejected": "resource limit",
+                    "reason": "larger than 50 bytes",
+                },
+            ]
+
 
 class TestInvokeValidateActions:
     """Test cases for invoke_validate_actions function."""
@@ -592,7 +818,7 @@ class TestInvokeValidateActions:
         finally:
             os.unlink(approved_file)
 
-    def test_auto_approval_debug_messages(self):
+    def test_auto_approval_debug_messages(self, capsys, debug_logging):
         """Test that auto-approval generates correct debug messages."""
         with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
             json.dump([], f)
@@ -604,24 +830,23 @@ class TestInvokeValidateActions:
         ]
 
         try:
-            with patch("builtins.print") as mock_print:
-                invoke_validate_actions(approved_file, actions_config)
+            invoke_validate_actions(approved_file, actions_config)
 
-                # Check that debug messages were printed
-                print_calls = [call.args[0] for call in mock_print.call_args_list]
+            # Check that debug messages were written
+            output_lines = capsys.readouterr().out.splitlines()
 
-                # Check for auto-approval messages
-                github_debug = any(
-                    "Auto-approving github action: github/super-linter" in call
-                    for call in print_calls
-                )
-                actions_debug = any(
-                    "Auto-approving actions action: actions/checkout" in call
-                    for call in print_calls
-                )
+            # Check for auto-approval messages
+            github_debug = any(
+                "Auto-approving github action: github/super-linter" in line
+                for line in output_lines
+            )
+            actions_debug = any(
+                "Auto-approving actions action: actions/checkout" in line
+                for line in output_lines
+            )
 
-                assert github_debug, "Should print debug message for github action"
-                assert actions_debug, "Should print debug message for actions action"
+            assert github_debug, "Should print debug message for github action"
+            assert actions_debug, "Should print debug message for actions action"
         finally:
             os.unlink(approved_file)
 
@@ -646,6 +871,110 @@ class TestInvokeValidateActions:
         finally:
             os.unlink(approved_file)
 
+    def test_denied_action_lists_use_sites(self, capsys):
+        """Test that a denied action is reported once with every place it is used."""
+        actions_config = [
+            {
+                "actionLink": "unknown/action",
+                "actionVersion": "v1",
+                "workflowFileName": "build.yml",
+                "jobName": job_name,
+            }
+            for job_name in ["build", "test"]
+        ] + [
+            {
+                "actionLink": "unknown/action",
+                "actionVersion": "v1",
+                "workflowFileName": "release.yml",
+                "jobName": "publish",
+            }
+        ]
+
+        with patch.object(
+            ApprovedIndex, "lookup", autospec=True, return_value=None
+        ) as mock_lookup:
+            result = invoke_validate_actions(
+                ApprovedIndex(self.approved_actions), actions_config
+            )
+
+        assert result is True
+        mock_lookup.assert_called_once()
+        output = capsys.readouterr().out
+        assert "The following 1 actions/versions were denied:" in output
+        assert (
+            "unknown/action v1 used in build.yml (build, test), release.yml (publish)"
+            in output
+        )
+
+    def test_denied_use_annotations(self, capsys):
+        """Test that each denied use is annotated at its line under GitHub Actions."""
+        from action_allowedlist import log
+
+        workflow = "jobs:\n  build:\n    steps:\n      - uses: unknown/action@v1\n"
+        actions_config = get_actions_from_file(workflow, "build.yml")
+
+        log.configure(github_actions=True)
+        try:
+            result = invoke_validate_actions(
+                ApprovedIndex(self.approved_actions), actions_config
+            )
+        finally:
+            log.configure()
+
+        assert result is True
+        output = capsys.readouterr().out
+        assert (
+            "::error title=Denied Action,file=.github/workflows/build.yml,line=4,col=15"
+            "::unknown/action@v1 is not approved"
+        ) in output
+        assert "::error title=Denied Actions::The following 1" in output
+
+    def test_aliased_uses_annotated_once(self, capsys):
+        """Test that uses sharing one position get a single annotation."""
+        workflow = (
+            "x: &a unknown/action@v1\njobs:\n  build:\n    steps:\n"
+            + "      - uses: *a\n" * 50
+        )
+        actions_config = get_actions_from_file(workflow, "a.yml")
+
+        result = invoke_validate_actions(
+            ApprovedIndex(self.approved_actions), actions_config
+        )
+
+        assert result is True
+        output = capsys.readouterr().out
+        assert output.count("is not approved") == 1
+        assert (
+            ".github/workflows/a.yml:1:4: unknown/action@v1 is not approved "
+            "(50 uses at this position)"
+        ) in output
+
+    def test_rejected_file_fails(self, capsys):
+        """Test that a rejected file is reported and fails the check."""
+        results = []
+        actions_config = [
+            RejectedFile("bomb.yml", "more than 1000 aliases expanded, at line 9")
+        ]
+
+        result = invoke_validate_actions(
+            ApprovedIndex(self.approved_actions), actions_config, results.append
+        )
+
+        assert result is True
+        assert results == [
+            {
+                "workflowFileName": "bomb.yml",
+                "rejected": "resource limit",
+                "reason": "more than 1000 aliases expanded, at line 9",
+                "approved": False,
+                "deprecated": False,
+            }
+        ]
+        assert (
+            "error: Rejected bomb.yml (resource limit): "
+            "more than 1000 aliases expanded, at line 9" in capsys.readouterr().out
+        )
+
     def test_empty_actions_config(self):
         """Test with empty actions configuration."""
         with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
@@ -661,3 +990,78 @@ class TestInvokeValidateActions:
             assert result is False  # No actions to deny
         finally:
             os.unlink(approved_file)
+
+
+class TestStreaming:
+    """Test cases for the streaming parse and validation pipeline."""
+
+    def test_workflow_files_read_on_demand(self):
+        """Test that a workflow file is only read when its actions are needed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workflows_dir = Path(temp_dir) / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            for name in ["a.yml", "b.yml"]:
+                (workflows_dir / name).write_text(
+                    "on: push\njobs:\n  test:\n    steps:\n      - uses: first/action@v1\n"
+                )
+
+            actions = iter_used_actions(Path(temp_dir))
+            assert next(actions)["workflowFileName"] == "a.yml"
+
+            (workflows_dir / "b.yml").write_text(
+                "on: push\njobs:\n  test:\n    steps:\n      - uses: second/action@v2\n"
+            )
+
+            assert [action["actionLink"] for action in actions] == ["second/action"]
+
+    def test_one_result_per_reference(self):
+        """Test that each use gets a result while each action is only checked once."""
+        index = ApprovedIndex(
+            [{"actionLink": "some/action", "actionVersion": "v1", "deprecated": True}]
+        )
+        actions = [
+            {
+                "actionLink": "some/action",
+                "actionVersion": "v1",
+                "workflowFileName": "a.yml",
+                "jobName": "build",
+            },
+            {
+                "actionLink": "some/action",
+                "actionVersion": "v1",
+                "workflowFileName": "b.yml",
+                "jobName": "test",
+            },
+            {"actionLink": "other/action", "actionVersion": "v2"},
+        ]
+
+        with patch.object(index, "lookup", wraps=index.lookup) as mock_lookup:
+            results = list(validate_actions(index, iter(actions)))
+
+        assert mock_lookup.call_count == 2
+        assert results == [
+            {
+                "actionLink": "some/action",
+                "actionVersion": "v1",
+                "workflowFileName": "a.yml",
+                "jobName": "build",
+                "approved": True,
+                "deprecated": True,
+            },
+            {
+                "actionLink": "some/action",
+                "actionVersion": "v1",
+                "workflowFileName": "b.yml",
+                "jobName": "test",
+                "approved": True,
+                "deprecated": True,
+            },
+            {
+                "actionLink": "other/action",
+                "actionVersion": "v2",
+                "workflowFileName": None,
+                "jobName": None,
+                "approved": False,
+                "deprecated": False,
+            },
+        ]
@@ -0,0 +1,151 @@
+import json
+import pickle
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from action_allowedlist.approved_index import ApprovedIndex
+from action_allowedlist.approved_snapshot import (
+    ApprovedSnapshot,
+    compile_snapshot,
+    load_approved_index,
+    snapshot_path_for,
+)
+
+APPROVED_JSON = Path(__file__).parent.parent / "approved.json"
+
+
+@pytest.fixture
+def approved_file():
+    """A temporary approved.json with deprecated, tagged and local entries."""
+    approved_actions = [
+        {
+            "actionLink": "some/custom-action",
+            "actionVersion": "def456",
+            "tag": "v2",
+        },
+        {
+            "actionLink": "some/custom-action",
+            "actionVersion": "abc123",
+            "tag": "v1",
+            "deprecated": True,
+        },
+        {"actionLink": "./local-action", "actionVersion": None},
+        {"actionLink": "some/custom-action-two", "actionVersion": "abc123"},
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "approved.json"
+        path.write_text(json.dumps(approved_actions))
+        yield path
+
+
+class TestApprovedSnapshot:
+    """Test cases for compiling and reading approved list snapshots."""
+
+    def test_matches_approved_index(self, approved_file):
+        """Test that the snapshot answers every query like the in-memory index."""
+        snapshot = ApprovedSnapshot(compile_snapshot(approved_file))
+        index = ApprovedIndex.from_file(approved_file)
+
+        assert len(snapshot) == len(index)
+        for link in ["some/custom-action", "some/custom-action-two", "./local-action"]:
+            assert link in snapshot
+            assert snapshot.versions(link) == index.versions(link)
+        for link, version in [
+            ("some/custom-action", "abc123"),
+            ("some/custom-action", "def456"),
+            ("some/custom-action", "zzz999"),
+            ("some/custom-action-two", "abc123"),
+            ("./local-action", None),
+            ("./local-action", ""),
+        ]:
+            assert snapshot.lookup(link, version) == index.lookup(link, version)
+
+    def test_unknown_link(self, approved_file):
+        """Test that a link prefix of an approved link is not itself approved."""
+        snapshot = ApprovedSnapshot(compile_snapshot(approved_file))
+
+        assert "some/custom" not in snapshot
+        assert snapshot.versions("some/custom") == []
+        assert snapshot.lookup("some/custom", "abc123") is None
+
+    def test_repository_approved_list(self):
+        """Test the snapshot of the approved.json shipped with the action."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot_path = compile_snapshot(
+                APPROVED_JSON, Path(temp_dir) / "approved.snapshot"
+            )
+            snapshot = ApprovedSnapshot(snapshot_path)
+        index = ApprovedIndex.from_file(APPROVED_JSON)
+
+        for entry in json.loads(APPROVED_JSON.read_text()):
+            link, version = entry["actionLink"], entry["actionVersion"]
+            assert snapshot.lookup(link, version) == index.lookup(link, version)
+            assert snapshot.versions(link) == index.versions(link)
+
+    def test_rules(self, approved_file):
+        """Test that rules are stored apart and matched like the in-memory index."""
+        approved = json.loads(approved_file.read_text()) + [
+            {"actionLink": "my-org/*", "actionVersion": "*"},
+            {"actionLink": "some/custom-action", "actionVersion": "v2.*", "tag": "v2"},
+            {"actionLink": "actions/cache", "actionVersion": "v1", "deny": True},
+        ]
+        approved_file.write_text(json.dumps(approved))
+        snapshot = ApprovedSnapshot(compile_snapshot(approved_file))
+        index = ApprovedIndex.from_file(approved_file)
+
+        assert len(snapshot) == len(index)
+        assert "my-org/*" not in snapshot
+        for link, version in [
+            ("my-org/tool", "abc123"),
+            ("some/custom-action", "def456"),
+            ("some/custom-action", "v2.1"),
+            ("actions/cache", "v1"),
+            ("actions/cache", "v2"),
+            ("other/action", "v1"),
+        ]:
+            assert snapshot.lookup(link, version) == index.lookup(link, version)
+        assert snapshot.lookup("some/custom-action", "v2.1").tag == "v2"
+        assert snapshot.lookup("actions/cache", "v1") is None
+
+    def test_pickle_reopens_file(self, approved_file):
+        """Test that worker processes receive the path rather than a copy."""
+        snapshot = ApprovedSnapshot(compile_snapshot(approved_file))
+
+        copy = pickle.loads(pickle.dumps(snapshot))
+
+        assert copy.path == snapshot.path
+        assert copy.lookup("some/custom-action", "def456").tag == "v2"
+
+    def test_not_a_snapshot(self, approved_file):
+        """Test that a file without the snapshot header is rejected."""
+        with pytest.raises(ValueError):
+            ApprovedSnapshot(approved_file)
+
+
+class TestLoadApprovedIndex:
+    """Test cases for load_approved_index function."""
+
+    def test_without_snapshot(self, approved_file):
+        """Test that approved.json is decoded when there is no snapshot."""
+        assert isinstance(load_approved_index(approved_file), ApprovedIndex)
+
+    def test_with_current_snapshot(self, approved_file):
+        """Test that a snapshot matching approved.json is used."""
+        compile_snapshot(approved_file)
+
+        assert isinstance(load_approved_index(approved_file), ApprovedSnapshot)
+
+    def test_with_out_of_date_snapshot(self, approved_file, capsys):
+        """Test that a snapshot of an older approved.json is ignored."""
+        compile_snapshot(approved_file)
+        approved_file.write_text("[]")
+
+        index = load_approved_index(approved_file)
+
+        assert isinstance(index, ApprovedIndex)
+        assert len(index) == 0
+        assert capsys.readouterr().out == (
+            f"Ignoring out of date approved list snapshot {snapshot_path_for(approved_file)}\n"
+        )
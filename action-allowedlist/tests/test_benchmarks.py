@@ -0,0 +1,58 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from action_allowedlist.actions_parser import get_all_used_actions
+from benchmarks.generate import generate_repository
+from benchmarks.run import run_scale
+
+
+class TestGenerateRepository:
+    """Test cases for the synthetic repository generator."""
+
+    def test_reference_counts(self):
+        """Test that the generated workflows hold workflows * jobs * steps references."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repository, approved_path = generate_repository(
+                temp_dir, workflows=3, jobs=2, steps=4, approved_entries=20
+            )
+
+            with patch("builtins.print"):
+                actions = get_all_used_actions(repository)
+
+            assert len(actions) == 3 * 2 * 4
+            assert len(json.loads(approved_path.read_text())) == 20
+
+    def test_same_seed_same_output(self):
+        """Test that generation is repeatable for a given seed."""
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            generate_repository(first, workflows=2, seed=7)
+            generate_repository(second, workflows=2, seed=7)
+
+            for name in [
+                "approved.json",
+                "repository/.github/workflows/workflow-00001.yml",
+            ]:
+                assert (Path(first) / name).read_text() == (
+                    Path(second) / name
+                ).read_text()
+
+
+class TestRunScale:
+    """Test cases for the benchmark runner."""
+
+    def test_results_for_each_phase(self):
+        """Test that every phase is measured and reported."""
+        results = run_scale("10", approved_entries=10, repeat=1, seed=0)
+
+        assert [result["phase"] for result in results] == [
+            "discovery",
+            "parsing",
+            "validation",
+            "streaming",
+        ]
+        for result in results:
+            assert result["references"] == 10
+            assert result["seconds"]["min"] >= 0
+            assert result["peak_memory_bytes"] > 0
@@ -0,0 +1,60 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from action_allowedlist.cat_file import CatFile
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+
+@pytest.fixture
+def repository(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    oid = subprocess.run(
+        ["git", "-C", str(tmp_path), "hash-object", "-w", "--stdin"],
+        input="some content\n",
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    return tmp_path, oid
+
+
+class TestCatFile:
+    """Test cases for CatFile class."""
+
+    def test_query(self, repository):
+        """Test reading objects, and only their info with contents=False."""
+        path, oid = repository
+
+        cat_file = CatFile(path)
+        try:
+            assert cat_file.query([oid, "0" * 40, "no such name"]) == [
+                (oid, "blob", 13, b"some content\n"),
+                None,
+                None,
+            ]
+        finally:
+            cat_file.close()
+
+        cat_file = CatFile(Path(path), contents=False)
+        try:
+            assert cat_file.query([oid]) == [(oid, "blob", 13, None)]
+        finally:
+            cat_file.close()
+
+    @pytest.mark.parametrize("name", ["HEAD\nHEAD", "HEAD\0"])
+    def test_refuses_unsafe_names(self, repository, name):
+        """Test that a name cat-file would read as two requests is refused."""
+        path, oid = repository
+
+        cat_file = CatFile(path)
+        try:
+            with pytest.raises(ValueError):
+                cat_file.query([oid, name])
+            # Nothing of the batch was written, so later answers are in step.
+            assert cat_file.query([oid])[0].oid == oid
+        finally:
+            cat_file.close()
@@ -0,0 +1,45 @@
+import os
+import stat
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist.files import atomic_write
+
+
+def test_writes_text_and_bytes():
+    """Test that text and bytes replace the file and leave nothing behind."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "data"
+        atomic_write(path, "text")
+        assert path.read_text() == "text"
+
+        atomic_write(path, b"\x00bytes")
+
+        assert path.read_bytes() == b"\x00bytes"
+        assert os.listdir(temp_dir) == ["data"]
+
+
+def test_mode():
+    """Test that the mode is applied before the file appears."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "data"
+        atomic_write(path, "text", mode=0o644)
+
+        assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+
+def test_failed_write_keeps_old_file():
+    """Test that a failure removes the temporary file and keeps the old one."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "data"
+        path.write_text("old")
+
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                atomic_write(path, "new")
+
+        assert path.read_text() == "old"
+        assert os.listdir(temp_dir) == ["data"]
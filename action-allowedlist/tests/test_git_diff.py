@@ -0,0 +1,155 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from action_allowedlist.git_diff import (
+    get_changed_definition_files,
+    get_changed_workflow_files,
+    has_changed,
+)
+from tests.helpers import git
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+ROOT = Path(__file__).parent.parent
+
+WORKFLOW = """
+name: Test
+on: [push]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+"""
+
+
+@pytest.fixture
+def repository():
+    """A git repository with two workflows and an approval file on its first commit."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repository = Path(temp_dir)
+        workflows_dir = repository / ".github" / "workflows"
+        workflows_dir.mkdir(parents=True)
+        (workflows_dir / "build.yml").write_text(WORKFLOW)
+        (workflows_dir / "test.yml").write_text(WORKFLOW)
+        (repository / "approved.json").write_text("[]")
+        git(repository, "init", "-q")
+        git(repository, "add", "-A")
+        git(repository, "commit", "-q", "-m", "base")
+        git(repository, "tag", "base")
+        yield repository
+
+
+class TestGetChangedWorkflowFiles:
+    """Test cases for get_changed_workflow_files function."""
+
+    def test_added_and_modified_files(self, repository):
+        """Test that only added or modified workflow files are returned."""
+        workflows_dir = repository / ".github" / "workflows"
+        (workflows_dir / "test.yml").write_text(WORKFLOW + "# changed\n")
+        (workflows_dir / "new.yml").write_text(WORKFLOW)
+        (workflows_dir / "notes.md").write_text("not a workflow")
+        (repository / "README.md").write_text("outside the workflows directory")
+        git(repository, "add", "-A")
+        git(repository, "commit", "-q", "-m", "head")
+
+        changed = get_changed_workflow_files(repository, "base", "HEAD")
+
+        assert changed == [workflows_dir / "new.yml", workflows_dir / "test.yml"]
+
+    def test_deleted_files_are_ignored(self, repository):
+        """Test that a deleted workflow is not returned for scanning."""
+        git(repository, "rm", "-q", ".github/workflows/build.yml")
+        git(repository, "commit", "-q", "-m", "head")
+
+        assert get_changed_workflow_files(repository, "base", "HEAD") == []
+
+    def test_unknown_ref(self, repository):
+        """Test that an unknown ref raises an error naming the git command."""
+        with pytest.raises(RuntimeError, match="git diff"):
+            get_changed_workflow_files(repository, "does-not-exist", "HEAD")
+
+
+class TestGetChangedDefinitionFiles:
+    """Test cases for get_changed_definition_files function."""
+
+    def test_yaml_outside_workflows(self, repository):
+        """Test that YAML files anywhere but the workflows directory are returned."""
+        (repository / ".github/actions/setup").mkdir(parents=True)
+        (repository / ".github/actions/setup/action.yml").write_text("runs: {}")
+        (repository / "deploy.yaml").write_text("runs: {}")
+        (repository / "README.md").write_text("not YAML")
+        (repository / ".github/workflows/build.yml").write_text(WORKFLOW + "# x\n")
+        git(repository, "add", "-A")
+        git(repository, "commit", "-q", "-m", "head")
+
+        assert get_changed_definition_files(repository, "base", "HEAD") == [
+            ".github/actions/setup/action.yml",
+            "deploy.yaml",
+        ]
+
+    def test_changed_local_action_scans_everything(self, repository):
+        """Test that a pull request changing only a local action is checked."""
+        (repository / ".github/actions/setup").mkdir(parents=True)
+        action_path = repository / ".github/actions/setup/action.yml"
+        action_path.write_text("runs:\n  using: composite\n  steps: []\n")
+        (repository / ".github/workflows/build.yml").write_text(
+            WORKFLOW + "      - uses: ./.github/actions/setup\n"
+        )
+        git(repository, "add", "-A")
+        git(repository, "commit", "-q", "-m", "local action")
+        git(repository, "tag", "-f", "base")
+        action_path.write_text(
+            "runs:\n  using: composite\n  steps:\n    - uses: denied/action@v1\n"
+        )
+        git(repository, "commit", "-q", "-am", "head")
+
+        process = subprocess.run(
+            [
+                sys.executable,
+                "action_allowedlist",
+                str(repository),
+                str(repository / "approved.json"),
+                "--base-ref",
+                "base",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+
+        assert "scanning all workflow files" in process.stdout
+        assert "denied/action" in process.stdout
+        assert process.returncode == 1
+
+
+class TestHasChanged:
+    """Test cases for has_changed function."""
+
+    def test_approval_file_changed(self, repository):
+        """Test detecting a change to the approval file."""
+        (repository / "approved.json").write_text('[{"actionLink": "a/b"}]')
+        git(repository, "commit", "-q", "-am", "head")
+
+        assert has_changed(repository, "base", "HEAD", repository / "approved.json")
+
+    def test_approval_file_unchanged(self, repository):
+        """Test that an unchanged approval file is not reported."""
+        (repository / ".github" / "workflows" / "new.yml").write_text(WORKFLOW)
+        git(repository, "add", "-A")
+        git(repository, "commit", "-q", "-m", "head")
+
+        assert not has_changed(repository, "base", "HEAD", repository / "approved.json")
+
+    def test_approval_file_outside_repository(self, repository):
+        """Test that an approval file outside the repository is never changed."""
+        with tempfile.TemporaryDirectory() as other_dir:
+            approved_path = Path(other_dir) / "approved.json"
+            approved_path.write_text("[]")
+
+            assert not has_changed(repository, "base", "HEAD", approved_path)
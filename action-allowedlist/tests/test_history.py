@@ -0,0 +1,230 @@
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist import history
+from action_allowedlist.approved_index import ApprovedIndex
+from action_allowedlist.cat_file import CatFile
+from action_allowedlist.history import report_history, scan_history
+from action_allowedlist.workflow_outline import ParseLimits, set_limits
+from tests.helpers import git, workflow
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+ROOT = Path(__file__).parent.parent
+
+
+def commit(repository: Path, message, files, date):
+    for name, content in files.items():
+        path = repository / ".github/workflows" / name
+        if content is None:
+            path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+    git(repository, "add", "-A")
+    subprocess.run(
+        ["git", "-C", str(repository), "commit", "-q", "-m", message],
+        check=True,
+        env={
+            "GIT_AUTHOR_NAME": "Test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "Test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            "GIT_AUTHOR_DATE": date,
+            "GIT_COMMITTER_DATE": date,
+        },
+    )
+    return git(repository, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repository():
+    """
+    main: add a.yml using bad/action, add unchanged commits, then drop it.
+    feature: branches off before the removal and still uses it.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repository = Path(temp_dir)
+        git(repository, "init", "-q", "-b", "main")
+        commits = {}
+        commits["readme"] = commit(
+            repository,
+            "readme",
+            {"README.yml": "not a workflow"},
+            "2024-01-01T00:00:00Z",
+        )
+        commits["added"] = commit(
+            repository,
+            "add",
+            {
+                "README.yml": None,
+                "a.yml": workflow("bad/action@v1", "good/action@v1"),
+                "b.yml": workflow("good/action@v1"),
+            },
+            "2024-01-02T00:00:00Z",
+        )
+        (repository / "other.txt").write_text("x")
+        commits["unrelated"] = commit(
+            repository, "unrelated", {}, "2024-01-03T00:00:00Z"
+        )
+        git(repository, "branch", "feature")
+        commits["removed"] = commit(
+            repository,
+            "remove",
+            {"a.yml": workflow("good/action@v1")},
+            "2024-01-04T00:00:00Z",
+        )
+        yield repository, commits
+
+
+APPROVED = ApprovedIndex([{"actionLink": "good/action", "actionVersion": "v1"}])
+
+
+class TestScanHistory:
+    """Test cases for scan_history function."""
+
+    def test_first_and_last_commit(self, repository):
+        """Test that a denied action is reported with where it appeared."""
+        repository, commits = repository
+
+        findings = scan_history(repository, APPROVED)
+
+        assert list(findings) == [("bad/action", "v1")]
+        record = history.finding_record(
+            ("bad/action", "v1"), findings[("bad/action", "v1")]
+        )
+        assert record["firstCommit"] == commits["added"]
+        assert record["firstCommitDate"] == "2024-01-02T00:00:00+00:00"
+        assert record["lastCommit"] == commits["unrelated"]
+        assert record["commits"] == 2
+        assert record["workflowFileNames"] == ["a.yml"]
+        assert record["refs"] == ["feature"]
+
+    def test_each_blob_parsed_once(self, repository, capsys):
+        """Test that workflow files shared by several commits are parsed once."""
+        repository, _ = repository
+
+        with patch.object(
+            history, "get_actions_from_file", wraps=history.get_actions_from_file
+        ) as parse:
+            scan_history(repository, APPROVED)
+
+        # README.yml, the first a.yml, and b.yml, which the last a.yml is
+        # identical to and so shares its blob with.
+        assert parse.call_count == 3
+        assert "Read 3 distinct workflow directories" in capsys.readouterr().out
+
+    def test_revisions(self, repository):
+        """Test limiting the walk to the history of one branch."""
+        repository, commits = repository
+
+        findings = scan_history(repository, APPROVED, [f"{commits['unrelated']}..main"])
+
+        assert findings == {}
+
+    def test_report(self, repository, capsys):
+        """Test the summary of findings."""
+        repository, commits = repository
+
+        assert report_history(scan_history(repository, APPROVED)) is True
+        output = capsys.readouterr().out
+        assert f"bad/action v1: first {commits['added'][:12]}" in output
+        assert "2 commits, in a.yml; still used by feature" in output
+
+    def test_rejected_blob(self, repository, capsys):
+        """Test that a file over the parse limits is reported, not skipped."""
+        repository, _ = repository
+        nested = "x:\n" + "".join("  " * i + "- \n" for i in range(1, 150))
+        deep = commit(
+            repository,
+            "deep",
+            {"deep.yml": workflow("evil/thing@deadbeef") + nested},
+            "2024-01-05T00:00:00Z",
+        )
+
+        findings = scan_history(repository, APPROVED, ["main"])
+
+        rejected = [key for key, finding in findings.items() if finding.rejected]
+        assert len(rejected) == 1
+        record = history.finding_record(rejected[0], findings[rejected[0]])
+        assert record["rejected"] == "resource limit"
+        assert (record["firstCommit"], record["workflowFileNames"]) == (
+            deep,
+            ["deep.yml"],
+        )
+        assert report_history(findings) is True
+        output = capsys.readouterr().out
+        assert "1 workflow files in the history were not parsed" in output
+        assert "1 commits, in deep.yml; still used by main" in output
+
+    def test_large_blob_not_read(self, repository):
+        """Test that a blob over the size limit is rejected before it is read."""
+        repository, _ = repository
+        commit(
+            repository,
+            "large",
+            {"large.yml": workflow("evil/thing@deadbeef") + "#" * 300},
+            "2024-01-05T00:00:00Z",
+        )
+
+        read = []
+        query = CatFile.iter_query
+
+        def spy(cat_file, names):
+            names = list(names)
+            if cat_file.contents:
+                read.extend(names)
+            return query(cat_file, names)
+
+        set_limits(ParseLimits(max_bytes=200))
+        try:
+            with patch.object(CatFile, "iter_query", spy):
+                findings = scan_history(repository, APPROVED, ["main"])
+        finally:
+            set_limits(ParseLimits())
+
+        rejected = [f.rejected for f in findings.values() if f.rejected]
+        assert [r.reason for r in rejected] == ["larger than 200 bytes"]
+        # The blob is named by its oid.
+        assert rejected[0].workflowFileName not in read
+
+
+class TestHistoryCommandLine:
+    """Test cases for the history command."""
+
+    def test_output(self, repository):
+        """Test writing the findings as JSON lines."""
+        repository, commits = repository
+        approved = repository / "approved.json"
+        approved.write_text(
+            json.dumps([{"actionLink": "good/action", "actionVersion": "v1"}])
+        )
+        output = repository / "history.ndjson"
+
+        process = subprocess.run(
+            [
+                sys.executable,
+                "action_allowedlist",
+                "history",
+                str(repository),
+                str(approved),
+                "--output",
+                str(output),
+            ],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+
+        assert process.returncode == 1
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [(r["actionLink"], r["lastCommit"]) for r in records] == [
+            ("bad/action", commits["unrelated"])
+        ]
@@ -0,0 +1,231 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist.approved_index import ApprovedIndex
+from action_allowedlist.inventory import (
+    ORDER,
+    USES_QUERY,
+    Inventory,
+    UseRecord,
+    format_use,
+)
+from action_allowedlist.workflow_outline import ParseLimits, get_limits, set_limits
+from tests.helpers import workflow, write
+
+ROOT = Path(__file__).parent.parent
+
+COMPOSITE_ACTION = """
+runs:
+  using: composite
+  steps:
+    - uses: some/setup-tool@v1
+"""
+
+APPROVED = ApprovedIndex(
+    [
+        {"actionLink": "some/setup-tool", "actionVersion": "v1", "deprecated": True},
+        {"actionLink": "owner/repo", "actionVersion": "abc123"},
+    ]
+)
+
+
+@pytest.fixture
+def org(tmp_path):
+    org = tmp_path / "org"
+    write(
+        org / "a/.github/workflows/ci.yml",
+        workflow("actions/checkout@v4", "./.github/actions/setup", "owner/repo@abc123"),
+    )
+    write(org / "a/.github/actions/setup/action.yml", COMPOSITE_ACTION)
+    write(org / "b/.github/workflows/test.yml", workflow("owner/repo@abc999"))
+    return org
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    with Inventory(tmp_path / "inventory.db") as inventory:
+        yield inventory
+
+
+def summary(uses):
+    return [
+        (
+            Path(use.repository).name,
+            use.workflowFileName,
+            use.actionVersion,
+            use.verdict,
+        )
+        for use in uses
+    ]
+
+
+class TestUpdate:
+    """Test cases for updating the inventory."""
+
+    def test_stores_every_reference(self, org, inventory):
+        """Test that workflows and the definitions they use are stored."""
+        stats = inventory.update_repository(org / "a")
+        inventory.update_verdicts(APPROVED)
+
+        assert (stats.parsed, stats.unchanged) == (2, 0)
+        uses = inventory.uses_in_repository(str(org / "a"))
+        assert [(use.workflowFileName, use.actionLink, use.line) for use in uses] == [
+            (".github/actions/setup/action.yml", "some/setup-tool", 5),
+            (".github/workflows/ci.yml", "actions/checkout", 5),
+            (".github/workflows/ci.yml", "./.github/actions/setup", 6),
+            (".github/workflows/ci.yml", "owner/repo", 7),
+        ]
+        assert [use.verdict for use in uses] == [
+            "deprecated",
+            "approved",
+            None,
+            "approved",
+        ]
+
+    def test_incremental(self, org, inventory):
+        """Test that only changed files are parsed and missing ones removed."""
+        inventory.update_repository(org / "a")
+        inventory.update_repository(org / "b")
+
+        with patch("action_allowedlist.inventory.get_actions_from_file") as parse:
+            stats = inventory.update_repository(org / "a")
+        parse.assert_not_called()
+        # The local action was followed from what is stored for ci.yml.
+        assert (stats.parsed, stats.unchanged, stats.removed) == (0, 2, 0)
+
+        write(org / "a/.github/workflows/ci.yml", workflow("owner/repo@v2"))
+        stats = inventory.update_repository(org / "a")
+        assert (stats.parsed, stats.unchanged, stats.removed) == (1, 0, 1)
+        assert [use.actionLink for use in inventory.uses_in_repository("a")] == [
+            "owner/repo"
+        ]
+        assert len(inventory.uses_in_repository("b")) == 1
+
+    def test_rejected(self, org, inventory):
+        """Test that a file over the parse limits is recorded as rejected."""
+        previous = get_limits()
+        set_limits(ParseLimits(max_bytes=10))
+        try:
+            stats = inventory.update_repository(org / "b")
+        finally:
+            set_limits(previous)
+
+        assert stats.rejected == 1
+        assert inventory.rejected_files() == [
+            (str(org / "b"), ".github/workflows/test.yml", "larger than 10 bytes")
+        ]
+        stats = inventory.update_repository(org / "b")
+        assert (stats.parsed, stats.rejected) == (1, 0)
+        assert inventory.rejected_files() == []
+
+    def test_forget_repositories(self, org, inventory):
+        """Test that repositories no longer under the directory are removed."""
+        inventory.update_repository(org / "a")
+        inventory.update_repository(org / "b")
+
+        assert inventory.forget_repositories([org / "b"], org) == [str(org / "a")]
+        assert inventory.uses_in_repository("a") == []
+        assert len(inventory.uses_in_repository("b")) == 1
+
+
+class TestQueries:
+    """Test cases for querying the inventory."""
+
+    @pytest.fixture(autouse=True)
+    def populate(self, org, inventory):
+        inventory.update_repository(org / "a")
+        inventory.update_repository(org / "b")
+        inventory.update_verdicts(APPROVED)
+
+    def test_uses_of_action(self, inventory):
+        """Test lookups by action, version and version prefix."""
+        assert summary(inventory.uses_of_action("owner/repo")) == [
+            ("a", ".github/workflows/ci.yml", "abc123", "approved"),
+            ("b", ".github/workflows/test.yml", "abc999", "denied"),
+        ]
+        assert summary(inventory.uses_of_action("owner/repo", "abc999")) == [
+            ("b", ".github/workflows/test.yml", "abc999", "denied"),
+        ]
+        assert len(inventory.uses_of_action("owner/repo", "abc*")) == 2
+        assert len(inventory.uses_of_action("owner/repo", "*")) == 2
+        assert inventory.uses_of_action("owner/repo", "abc") == []
+
+    def test_uses_with_verdict(self, inventory):
+        """Test lookups by verdict, which follow the latest approved list."""
+        assert summary(inventory.uses_with_verdict("deprecated")) == [
+            ("a", ".github/actions/setup/action.yml", "v1", "deprecated"),
+        ]
+        inventory.update_verdicts(ApprovedIndex([]))
+        assert len(inventory.uses_with_verdict("deprecated")) == 0
+        assert len(inventory.uses_with_verdict("denied")) == 3
+
+    @pytest.mark.parametrize(
+        "where",
+        [
+            "WHERE uses.action_link = ?",
+            "WHERE uses.action_link = ? "
+            "AND uses.action_version >= ? AND uses.action_version < ?",
+            "WHERE files.repository = ? OR files.name = ?",
+            "WHERE verdicts.verdict = ?",
+        ],
+    )
+    def test_queries_use_indexes(self, inventory, where):
+        """Test that no query reads a whole table."""
+        plan = inventory.connection.execute(
+            "EXPLAIN QUERY PLAN " + USES_QUERY + where + ORDER,
+            ["x"] * where.count("?"),
+        ).fetchall()
+        assert not [row for row in plan if row[-1].startswith("SCAN")]
+
+    def test_format_use(self):
+        """Test the line printed for a use."""
+        use = UseRecord("/r/a", "ci.yml", "build", "owner/repo", "v1", 3, 15, "denied")
+        assert format_use(use) == "/r/a ci.yml:3:15 (build): owner/repo@v1 denied"
+
+
+class TestCommandLine:
+    """Test cases for the inventory command."""
+
+    def run(self, *args):
+        return subprocess.run(
+            [sys.executable, "action_allowedlist", "inventory", *map(str, args)],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+
+    def test_update_and_query(self, org, tmp_path):
+        """Test an organization update and queries of it."""
+        approved = tmp_path / "approved.json"
+        approved.write_text('[{"actionLink": "owner/repo", "actionVersion": "abc123"}]')
+        database = tmp_path / "inventory.db"
+
+        process = self.run(database, "update", approved, org, "--org")
+        assert process.returncode == 0, process.stderr
+        assert f"{org / 'a'}: 2 files stored" in process.stdout
+
+        process = self.run(database, "action", "owner/repo@abc9*", "--json")
+        assert process.returncode == 0
+        assert [json.loads(line) for line in process.stdout.splitlines()] == [
+            {
+                "repository": str(org / "b"),
+                "workflowFileName": ".github/workflows/test.yml",
+                "jobName": "build",
+                "actionLink": "owner/repo",
+                "actionVersion": "abc999",
+                "line": 5,
+                "column": 15,
+                "verdict": "denied",
+            }
+        ]
+
+        process = self.run(database, "status", "denied")
+        assert process.stdout.count("\n") == 2
+
+        process = self.run(database, "action", "not/used")
+        assert (process.returncode, process.stdout) == (1, "")
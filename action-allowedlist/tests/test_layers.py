@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist.approved_index import ApprovedIndex
+from action_allowedlist.approved_snapshot import (
+    ApprovedSnapshot,
+    compile_snapshot,
+    load_approved_index,
+)
+from action_allowedlist.layers import (
+    MERGE_VERSION,
+    Layers,
+    merge_layers,
+    parse_overlay,
+)
+
+ROOT = Path(__file__).parent.parent
+
+BASE = [
+    {"actionLink": "some/action", "actionVersion": "abc123", "tag": "v1"},
+    {"actionLink": "some/action", "actionVersion": "def456", "tag": "v2"},
+    {"actionLink": "my-org/*", "actionVersion": "*"},
+]
+
+
+@pytest.fixture
+def layer_files():
+    """A base approved.json, a team overlay and a repository overlay."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        (temp_dir / "approved.json").write_text(json.dumps(BASE))
+        (temp_dir / "team.json").write_text(
+            json.dumps([{"actionLink": "team/action", "actionVersion": "v1"}])
+        )
+        (temp_dir / "repository.json").write_text(
+            json.dumps(
+                {
+                    "deprecate": [
+                        {"actionLink": "some/action", "actionVersion": "abc123"}
+                    ],
+                    "revoke": [{"actionLink": "my-org/tool", "actionVersion": "v1"}],
+                }
+            )
+        )
+        yield temp_dir
+
+
+class TestMergeLayers:
+    """Test cases for merge_layers function."""
+
+    def test_add_replaces_lower_layers(self):
+        """Test that an added entry replaces entries for the same action and version."""
+        merged = merge_layers(
+            BASE,
+            [
+                {
+                    "add": [
+                        {
+                            "actionLink": "some/action",
+                            "actionVersion": "abc123",
+                            "tag": "x",
+                        }
+                    ]
+                }
+            ],
+        )
+
+        assert ApprovedIndex(merged).lookup("some/action", "abc123").tag == "x"
+        assert len(merged) == len(BASE)
+
+    def test_deprecate(self, capsys):
+        """Test deprecating an approved version, and one that was never approved."""
+        merged = merge_layers(
+            BASE,
+            [
+                {
+                    "deprecate": [
+                        {"actionLink": "some/action", "actionVersion": "abc123"},
+                        {"actionLink": "other/action", "actionVersion": "v1"},
+                    ]
+                }
+            ],
+        )
+        index = ApprovedIndex(merged)
+
+        assert index.lookup("some/action", "abc123").deprecated is True
+        assert index.lookup("some/action", "abc123").tag == "v1"
+        assert index.lookup("some/action", "def456").deprecated is False
+        assert BASE[0].get("deprecated") is None
+        assert "Cannot deprecate other/action@v1" in capsys.readouterr().out
+
+    def test_revoke(self):
+        """Test that a revocation removes an entry and overrides wildcard rules."""
+        merged = merge_layers(
+            BASE,
+            [
+                {
+                    "revoke": [
+                        {"actionLink": "some/action", "actionVersion": "abc123"},
+                        {"actionLink": "my-org/tool", "actionVersion": "v1"},
+                    ]
+                }
+            ],
+        )
+        index = ApprovedIndex(merged)
+
+        assert index.lookup("some/action", "abc123") is None
+        assert index.lookup("my-org/tool", "v1") is None
+        assert index.lookup("my-org/tool", "v2") is not None
+
+    def test_deny_rule_overrides_lower_exact_entries(self):
+        """Test that a deny rule in an overlay revokes exact entries below it."""
+        base = BASE + [
+            {"actionLink": "tj-actions/changed-files", "actionVersion": "abc"},
+        ]
+        deny = {"actionLink": "tj-actions/*", "actionVersion": "*", "deny": True}
+        exact = {"actionLink": "tj-actions/other", "actionVersion": "v1"}
+
+        index = ApprovedIndex(merge_layers(base, [{"add": [deny, exact]}]))
+
+        assert index.lookup("tj-actions/changed-files", "abc") is None
+        # An exact entry of the same layer still applies before its rules.
+        assert index.lookup("tj-actions/other", "v1") is not None
+        assert index.lookup("some/action", "abc123") is not None
+
+        revoked = merge_layers(
+            base, [{"revoke": [{"actionLink": "some/*", "actionVersion": "*"}]}]
+        )
+        index = ApprovedIndex(revoked)
+        assert index.lookup("some/action", "abc123") is None
+        assert index.lookup("tj-actions/changed-files", "abc") is not None
+
+    def test_deny_rule_then_later_layer_restores(self):
+        """Test that a layer above the deny rule can approve an exact version."""
+        deny = {"actionLink": "some/*", "actionVersion": "*", "deny": True}
+        entry = {"actionLink": "some/action", "actionVersion": "abc123"}
+
+        merged = merge_layers(BASE, [{"add": [deny]}, {"add": [entry]}])
+
+        assert ApprovedIndex(merged).lookup("some/action", "abc123") is not None
+        assert ApprovedIndex(merged).lookup("some/action", "def456") is None
+
+    def test_later_layer_restores(self):
+        """Test that a later layer can approve again what an earlier one revoked."""
+        entry = {"actionLink": "some/action", "actionVersion": "abc123"}
+
+        merged = merge_layers(BASE, [{"revoke": [entry]}, {"add": [entry]}])
+
+        assert ApprovedIndex(merged).lookup("some/action", "abc123") is not None
+
+    def test_invalid_overlay(self):
+        """Test that an overlay with unknown operations is rejected."""
+        assert parse_overlay(b"[]", "overlay.json") == {"add": []}
+        with pytest.raises(ValueError):
+            parse_overlay(b'{"remove": []}', "overlay.json")
+
+
+class TestLayers:
+    """Test cases for Layers class and loading merged lists."""
+
+    def test_hash(self, layer_files):
+        """Test that one layer hashes like its file, and every layer changes the hash."""
+        approved = layer_files / "approved.json"
+        single = Layers(approved)
+        layered = Layers(approved, [layer_files / "team.json"])
+
+        assert single.source_hash == hashlib.sha256(approved.read_bytes()).digest()
+        assert layered.source_hash != single.source_hash
+        assert (
+            Layers(approved, [layer_files / "repository.json"]).source_hash
+            != layered.source_hash
+        )
+
+    def test_hash_includes_merge_version(self, layer_files):
+        """Test that merged lists hash differently after a change to merging."""
+        approved = layer_files / "approved.json"
+        overlays = [layer_files / "team.json"]
+        before = Layers(approved, overlays).source_hash
+
+        with patch("action_allowedlist.layers.MERGE_VERSION", MERGE_VERSION + 1):
+            assert Layers(approved, overlays).source_hash != before
+            assert (
+                Layers(approved).source_hash
+                == hashlib.sha256(approved.read_bytes()).digest()
+            )
+
+    def test_merged_snapshot_cached(self, layer_files, capsys):
+        """Test that the merged list is written once to the cache directory and reused."""
+        approved = layer_files / "approved.json"
+        overlays = [layer_files / "team.json", layer_files / "repository.json"]
+        cache_dir = layer_files / "cache"
+        cache_dir.mkdir()
+
+        first = load_approved_index(approved, overlays=overlays, cache_dir=cache_dir)
+        second = load_approved_index(approved, overlays=overlays, cache_dir=cache_dir)
+
+        assert isinstance(first, ApprovedSnapshot)
+        assert second.path == first.path
+        assert len(list(cache_dir.iterdir())) == 1
+        assert second.lookup("team/action", "v1") is not None
+        assert second.lookup("some/action", "abc123").deprecated is True
+        assert second.lookup("my-org/tool", "v1") is None
+        assert capsys.readouterr().out == ""
+
+        overlays[0].write_text("[]")
+        third = load_approved_index(approved, overlays=overlays, cache_dir=cache_dir)
+        assert third.lookup("team/action", "v1") is None
+        assert len(list(cache_dir.iterdir())) == 2
+
+    def test_compiled_merged_snapshot(self, layer_files):
+        """Test that compile --overlay writes the snapshot found without a cache directory."""
+        approved = layer_files / "approved.json"
+        overlays = [layer_files / "team.json"]
+
+        snapshot_path = compile_snapshot(approved, overlays=overlays)
+
+        index = load_approved_index(approved, overlays=overlays)
+        assert isinstance(index, ApprovedSnapshot)
+        assert index.path == snapshot_path
+        assert isinstance(load_approved_index(approved), ApprovedIndex)
+
+    def test_scan_with_overlays(self, layer_files):
+        """Test a scan using overlays given on the command line."""
+        workflows_dir = layer_files / "repository" / ".github" / "workflows"
+        workflows_dir.mkdir(parents=True)
+        (workflows_dir / "test.yml").write_text(
+            "on: push\njobs:\n  test:\n    steps:\n      - uses: team/action@v1\n"
+        )
+
+        def scan(*overlays):
+            return subprocess.run(
+                [
+                    sys.executable,
+                    "action_allowedlist",
+                    str(layer_files / "repository"),
+                    str(layer_files / "approved.json"),
+                    *(f"--overlay={layer_files / overlay}" for overlay in overlays),
+                ],
+                capture_output=True,
+                text=True,
+                cwd=ROOT,
+                env={**os.environ, "GITHUB_OUTPUT": ""},
+            )
+
+        assert scan().returncode == 1
+        process = scan("team.json", "repository.json")
+        assert process.returncode == 0
+        assert f"Approval overlay: {layer_files / 'team.json'}" in process.stdout
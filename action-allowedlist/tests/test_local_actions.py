@@ -0,0 +1,178 @@
+import tempfile
+from pathlib import Path
+
+from action_allowedlist.action_cache import ActionCache
+from action_allowedlist.actions_parser import (
+    get_actions_from_file,
+    get_all_used_actions,
+    read_workflow_actions,
+)
+from action_allowedlist.local_actions import DependencyGraph
+from tests.helpers import workflow, write
+
+COMPOSITE_ACTION = """
+name: Setup
+runs:
+  using: composite
+  steps:
+    - uses: some/setup-tool@v1
+    - run: echo done
+      shell: bash
+"""
+
+
+class TestGetActionsFromDefinitions:
+    """Test cases for extracting references that point to other definitions."""
+
+    def test_reusable_workflow_job(self):
+        """Test that a job calling a reusable workflow is recorded."""
+        content = """
+on: push
+jobs:
+  remote:
+    uses: some-org/workflows/.github/workflows/build.yml@v2
+  local:
+    uses: ./.github/workflows/reusable.yml
+"""
+        assert get_actions_from_file(content, "caller.yml") == [
+            {
+                "actionLink": "some-org/workflows/.github/workflows/build.yml",
+                "actionVersion": "v2",
+                "workflowFileName": "caller.yml",
+                "jobName": "remote",
+            },
+            {
+                "actionLink": "./.github/workflows/reusable.yml",
+                "actionVersion": None,
+                "workflowFileName": "caller.yml",
+                "jobName": "local",
+            },
+        ]
+
+    def test_composite_action_steps(self):
+        """Test that the steps of a composite action are recorded."""
+        assert get_actions_from_file(COMPOSITE_ACTION, "action.yml") == [
+            {
+                "actionLink": "some/setup-tool",
+                "actionVersion": "v1",
+                "workflowFileName": "action.yml",
+                "jobName": None,
+            }
+        ]
+
+
+class TestDependencyGraph:
+    """Test cases for resolving local actions and reusable workflows."""
+
+    def test_composite_action_parsed_once(self):
+        """Test that a composite action used by many workflows is read once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            write(root / ".github/actions/setup/action.yml", COMPOSITE_ACTION)
+            for index in range(3):
+                write(
+                    root / f".github/workflows/w{index}.yml",
+                    workflow("./.github/actions/setup", "other/action@v1"),
+                )
+
+            reads = []
+
+            def read_definition(path):
+                reads.append(path)
+                return read_workflow_actions(path)
+
+            graph = DependencyGraph(root, read_definition)
+            for path in sorted((root / ".github/workflows").glob("*.yml")):
+                graph.add(path, read_workflow_actions(path)[0])
+            actions = list(graph.followed_actions())
+
+        assert [path.name for path in reads] == ["action.yml"]
+        assert [(a["actionLink"], a["workflowFileName"]) for a in actions] == [
+            ("some/setup-tool", ".github/actions/setup/action.yml"),
+        ]
+
+    def test_cycle_detected(self, capsys):
+        """Test that reusable workflows calling each other are reported, not followed forever."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            write(
+                root / "shared/a.yml",
+                "on: workflow_call\njobs:\n  call:\n    uses: ./shared/b.yml\n",
+            )
+            write(
+                root / "shared/b.yml",
+                "on: workflow_call\njobs:\n  call:\n    uses: ./shared/a.yml\n"
+                "  build:\n    steps:\n      - uses: some/action@v1\n",
+            )
+            write(root / ".github/workflows/main.yml", workflow("./shared/a.yml"))
+
+            graph = DependencyGraph(root, read_workflow_actions)
+            path = root / ".github/workflows/main.yml"
+            graph.add(path, read_workflow_actions(path)[0])
+            actions = list(graph.followed_actions())
+
+        assert graph.cycles == [["shared/a.yml", "shared/b.yml", "shared/a.yml"]]
+        assert (
+            "Cycle in local actions and reusable workflows" in capsys.readouterr().out
+        )
+        assert [a["actionLink"] for a in actions] == ["some/action"]
+
+    def test_missing_and_outside_definitions_ignored(self):
+        """Test that local references without a definition in the repository are skipped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "repository"
+            write(Path(temp_dir) / "outside/action.yml", COMPOSITE_ACTION)
+            write(
+                root / ".github/workflows/main.yml",
+                workflow("./checked-out-later", "./../outside", "some/action@v1"),
+            )
+
+            graph = DependencyGraph(root, read_workflow_actions)
+            path = root / ".github/workflows/main.yml"
+            graph.add(path, read_workflow_actions(path)[0])
+
+            assert list(graph.followed_actions()) == []
+            assert graph.resolve() == []
+
+
+class TestGetAllUsedActionsWithLocalActions:
+    """Test cases for get_all_used_actions following local definitions."""
+
+    def test_yaml_extension_and_reusable_workflow(self):
+        """Test that .yaml workflows are found and reusable workflows are not read twice."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            write(
+                root / ".github/workflows/caller.yaml",
+                "on: push\njobs:\n  call:\n    uses: ./.github/workflows/reusable.yml\n",
+            )
+            write(
+                root / ".github/workflows/reusable.yml",
+                "on: workflow_call\njobs:\n  build:\n    steps:\n"
+                "      - uses: ./.github/actions/setup\n",
+            )
+            write(root / ".github/actions/setup/action.yaml", COMPOSITE_ACTION)
+
+            serial = get_all_used_actions(root)
+            parallel = get_all_used_actions(root, jobs=2)
+
+        assert serial == parallel
+        assert [(a["actionLink"], a["workflowFileName"]) for a in serial] == [
+            ("some/setup-tool", ".github/actions/setup/action.yaml"),
+        ]
+
+    def test_definitions_use_cache(self):
+        """Test that definitions are read through the action cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "repository"
+            write(root / ".github/actions/setup/action.yml", COMPOSITE_ACTION)
+            write(
+                root / ".github/workflows/main.yml", workflow("./.github/actions/setup")
+            )
+            cache = ActionCache(Path(temp_dir) / "cache")
+
+            first = get_all_used_actions(root, cache=cache)
+            second = get_all_used_actions(root, cache=cache)
+
+        assert first == second
+        assert (cache.hits, cache.misses) == (2, 2)
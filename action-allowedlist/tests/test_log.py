@@ -0,0 +1,110 @@
+import logging
+
+from action_allowedlist.log import WorkflowCommandFormatter, logger, verbosity_level
+
+
+def make_record(level, message, *args, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestWorkflowCommandFormatter:
+    """Test cases for WorkflowCommandFormatter class."""
+
+    def test_workflow_commands(self):
+        """Test that records become workflow commands under GitHub Actions."""
+        formatter = WorkflowCommandFormatter(github_actions=True)
+
+        assert formatter.format(make_record(logging.INFO, "plain %s", "text")) == (
+            "plain text"
+        )
+        assert formatter.format(make_record(logging.DEBUG, "detail")) == (
+            "::debug::detail"
+        )
+        assert (
+            formatter.format(
+                make_record(
+                    logging.ERROR,
+                    "line one\nline two",
+                    file="a.py",
+                    title="Denied: x, y",
+                )
+            )
+            == "::error title=Denied%3A x%2C y,file=a.py::line one%0Aline two"
+        )
+
+    def test_plain_output(self):
+        """Test that records get a level prefix outside of GitHub Actions."""
+        formatter = WorkflowCommandFormatter(github_actions=False)
+
+        assert formatter.format(make_record(logging.INFO, "info")) == "info"
+        assert formatter.format(make_record(logging.DEBUG, "detail")) == (
+            "debug: detail"
+        )
+        assert (
+            formatter.format(
+                make_record(logging.WARNING, "careful", title="Deprecated Actions")
+            )
+            == "warning: careful"
+        )
+
+    def test_plain_output_location(self):
+        """Test that a record with a file and line is prefixed with its location."""
+        formatter = WorkflowCommandFormatter(github_actions=False)
+
+        assert (
+            formatter.format(
+                make_record(logging.ERROR, "denied", file="a.yml", line=3, col=9)
+            )
+            == "error: a.yml:3:9: denied"
+        )
+        assert (
+            formatter.format(make_record(logging.ERROR, "denied", file="a.yml"))
+            == "error: denied"
+        )
+
+
+class TestLogger:
+    """Test cases for the action_allowedlist logger."""
+
+    def test_debug_arguments_not_formatted(self, capsys):
+        """Test that debug messages cost nothing when debug is off."""
+
+        class Expensive:
+            def __str__(self):
+                raise AssertionError("formatted a disabled debug message")
+
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            logger.debug("Found %s", Expensive())
+        finally:
+            logger.setLevel(level)
+
+        assert capsys.readouterr().out == ""
+
+    def test_debug_enabled(self, capsys, debug_logging):
+        """Test that debug messages are written to stdout when enabled."""
+        logger.debug("Found %s", "something")
+
+        assert "Found something" in capsys.readouterr().out
+
+
+class TestVerbosityLevel:
+    """Test cases for verbosity_level function."""
+
+    def test_default(self, monkeypatch):
+        """Test that RUNNER_DEBUG picks the level without any flags."""
+        monkeypatch.delenv("RUNNER_DEBUG", raising=False)
+        assert verbosity_level() == logging.INFO
+
+        monkeypatch.setenv("RUNNER_DEBUG", "1")
+        assert verbosity_level() == logging.DEBUG
+
+    def test_flags(self):
+        """Test that -v and -q step through the levels and stop at the ends."""
+        assert verbosity_level(verbose=1) == logging.DEBUG
+        assert verbosity_level(verbose=3) == logging.DEBUG
+        assert verbosity_level(quiet=1) == logging.WARNING
+        assert verbosity_level(quiet=5) == logging.ERROR
@@ -0,0 +1,182 @@
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist import metrics
+from action_allowedlist.actions_parser import (
+    ApprovedIndex,
+    get_all_used_actions,
+    invoke_validate_actions,
+)
+
+ROOT = Path(__file__).parent.parent
+
+WORKFLOW = """
+on: [push]
+jobs:
+  build:
+    steps:
+      - uses: actions/checkout@v4
+      - uses: some/action@v1
+      - uses: unknown/action@v2
+"""
+
+
+@pytest.fixture(autouse=True)
+def reset_recorder():
+    """Leave metrics disabled for other tests."""
+    yield
+    metrics._recorder = None
+    metrics._repository = None
+
+
+@pytest.fixture
+def repository():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workflows_dir = Path(temp_dir) / "repo" / ".github" / "workflows"
+        workflows_dir.mkdir(parents=True)
+        (workflows_dir / "a.yml").write_text(WORKFLOW)
+        (workflows_dir / "b.yml").write_text(WORKFLOW.replace("v2", "v3"))
+        yield Path(temp_dir) / "repo"
+
+
+def values_of(name):
+    return {
+        labels: value
+        for (metric, labels), value in metrics._recorder.values.items()
+        if metric == name
+    }
+
+
+class TestRecording:
+    """Test cases for what a scan records."""
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_scan(self, repository, jobs):
+        """Test counts by repository, including those of parse workers."""
+        metrics.enable()
+        approved = ApprovedIndex(
+            [{"actionLink": "some/action", "actionVersion": "v1", "deprecated": True}]
+        )
+
+        with patch("builtins.print"), metrics.repository("repo"):
+            actions = get_all_used_actions(repository, jobs=jobs)
+            invoke_validate_actions(approved, actions)
+
+        repo = (("repository", "repo"),)
+        assert values_of("files_scanned") == {repo: 2}
+        assert values_of("references") == {repo: 6}
+        assert values_of("verdicts") == {
+            (("action", "actions/checkout"), *repo, ("verdict", "approved")): 2,
+            (("action", "some/action"), *repo, ("verdict", "deprecated")): 2,
+            (("action", "unknown/action"), *repo, ("verdict", "denied")): 2,
+        }
+        histogram = values_of("parse_duration_seconds")[repo]
+        assert histogram[-2] == 2
+        assert list(values_of("scan_duration_seconds")) == [repo]
+
+    def test_disabled(self, repository):
+        """Test that nothing is recorded unless enabled."""
+        with patch("builtins.print"):
+            get_all_used_actions(repository)
+
+        assert metrics._recorder is None
+        assert metrics.collect() == {}
+
+
+class TestTextFile:
+    """Test cases for writing the text file."""
+
+    def test_render_and_parse(self):
+        """Test that a rendered file reads back to the same values."""
+        metrics.enable()
+        with metrics.repository('odd "name"\\'):
+            metrics.inc("files_scanned", 3)
+            metrics.observe("parse_duration_seconds", 0.003)
+            metrics.observe("parse_duration_seconds", 20)
+        values = metrics.collect()
+
+        text = metrics.render(values)
+
+        assert text.endswith("# EOF\n")
+        assert (
+            'action_allowedlist_files_scanned_total{repository="odd \\"name\\"\\\\"} 3'
+            in text
+        )
+        assert (
+            "action_allowedlist_parse_duration_seconds_bucket"
+            '{repository="odd \\"name\\"\\\\",le="0.005"} 1'
+        ) in text
+        assert metrics.parse_text(text) == {
+            key: pytest.approx(value) for key, value in values.items()
+        }
+
+    def test_prometheus_format(self):
+        """Test that the Prometheus format names counters by their sample."""
+        text = metrics.render({("references", ()): 2}, openmetrics=False)
+
+        assert text == (
+            "# TYPE action_allowedlist_references_total counter\n"
+            "# HELP action_allowedlist_references_total Action references checked.\n"
+            "action_allowedlist_references_total 2\n"
+        )
+
+    def test_write_adds_to_counters(self, tmp_path):
+        """Test that counters add up across runs and gauges are replaced."""
+        path = tmp_path / "scan.prom"
+        for repository in ["a", "a", "b"]:
+            metrics.enable()
+            with metrics.repository(repository):
+                metrics.inc("files_scanned", 2)
+                metrics.observe("parse_duration_seconds", 0.01)
+            metrics.write(path)
+
+        values = metrics.parse_text(path.read_text())
+        assert values[("files_scanned", (("repository", "a"),))] == 4
+        assert values[("files_scanned", (("repository", "b"),))] == 2
+        assert values[("parse_duration_seconds", (("repository", "a"),))][-2] == 2
+        assert [key for key in values if key[0] == "run_duration_seconds"] == [
+            ("run_duration_seconds", ())
+        ]
+        assert path.stat().st_mode & 0o777 == 0o644
+
+    def test_write_replaces_unreadable_file(self, tmp_path, capsys):
+        """Test that a file that is not a metrics file is started over."""
+        path = tmp_path / "scan.prom"
+        path.write_text("not a metrics file\n")
+        metrics.enable()
+        metrics.inc("references")
+
+        metrics.write(path)
+
+        assert "Starting over the metrics" in capsys.readouterr().out
+        assert "action_allowedlist_references_total 1\n" in path.read_text()
+
+    def test_command_line(self, repository, tmp_path):
+        """Test that a scan writes the file, also when actions are denied."""
+        approved = tmp_path / "approved.json"
+        approved.write_text("[]")
+        path = tmp_path / "scan.prom"
+
+        process = subprocess.run(
+            [
+                sys.executable,
+                "action_allowedlist",
+                str(repository),
+                str(approved),
+                "--metrics",
+                str(path),
+            ],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+
+        assert process.returncode == 1
+        values = metrics.parse_text(path.read_text())
+        assert values[("files_scanned", (("repository", "repo"),))] == 2
+        assert values[("references", (("repository", "repo"),))] == 6
@@ -0,0 +1,227 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from action_allowedlist.approved_index import ApprovedIndex
+from action_allowedlist.mirrors import (
+    CACHE_FILE_NAME,
+    MirrorResolver,
+    ResolutionCache,
+    ResolvingIndex,
+    open_resolver,
+    verify_approved,
+)
+from tests.helpers import git
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def mirrors():
+    """A mirrors directory with some-org/action.git, tagged v1 (annotated) and v2."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "source"
+        source.mkdir()
+        git(source, "init", "-q", "-b", "main")
+        git(source, "commit", "-q", "--allow-empty", "-m", "first")
+        git(source, "tag", "-a", "v1", "-m", "v1")
+        first = git(source, "rev-parse", "HEAD")
+        git(source, "commit", "-q", "--allow-empty", "-m", "second")
+        git(source, "tag", "v2")
+        second = git(source, "rev-parse", "HEAD")
+
+        mirrors_dir = temp_dir / "mirrors"
+        (mirrors_dir / "some-org").mkdir(parents=True)
+        git(
+            temp_dir,
+            "clone",
+            "-q",
+            "--mirror",
+            str(source),
+            "mirrors/some-org/action.git",
+        )
+        yield mirrors_dir, first, second
+
+
+class TestMirrorResolver:
+    """Test cases for MirrorResolver class."""
+
+    def test_resolve_tags_branches_and_shas(self, mirrors):
+        """Test resolving annotated and light tags, branches and SHAs in one batch."""
+        mirrors_dir, first, second = mirrors
+        link = "some-org/action/sub/path"
+
+        with MirrorResolver(mirrors_dir) as resolver:
+            resolved = resolver.resolve_many(
+                [
+                    (link, "v1"),
+                    (link, "v2"),
+                    (link, "main"),
+                    (link, first),
+                    (link, "v3"),
+                    (link, "0" * 40),
+                    ("other-org/action", "v1"),
+                ]
+            )
+
+        assert resolved == {
+            (link, "v1"): first,
+            (link, "v2"): second,
+            (link, "main"): second,
+            (link, first): first,
+            (link, "v3"): None,
+            (link, "0" * 40): None,
+        }
+
+    def test_many_references(self, mirrors):
+        """Test that batches larger than the pipe buffer do not block."""
+        mirrors_dir, _, second = mirrors
+
+        with MirrorResolver(mirrors_dir) as resolver:
+            resolved = resolver.resolve_many(
+                [("some-org/action", f"missing-{i}") for i in range(3000)]
+                + [("some-org/action", "v2")]
+            )
+
+        assert len(resolved) == 3001
+        assert resolved[("some-org/action", "v2")] == second
+
+    def test_cache(self, mirrors):
+        """Test that resolutions are reused until they expire or the mirror is fetched."""
+        mirrors_dir, first, second = mirrors
+        cache_path = mirrors_dir / CACHE_FILE_NAME
+
+        with open_resolver(mirrors_dir) as resolver:
+            resolver.resolve_many(
+                [("some-org/action", "v2"), ("some-org/action", first)]
+            )
+        assert cache_path.exists()
+
+        # Point the cached tag somewhere else to see whether the mirror is asked.
+        entries = json.loads(cache_path.read_text())
+        entries["some-org/action"]["v2"][0] = first
+        cache_path.write_text(json.dumps(entries))
+
+        with open_resolver(mirrors_dir) as resolver:
+            assert resolver.resolve("some-org/action", "v2") == first
+            assert resolver._processes == {}
+
+        with open_resolver(mirrors_dir, max_age=0) as resolver:
+            time.sleep(0.01)
+            assert resolver.resolve("some-org/action", "v2") == second
+
+        # A known commit is kept however old its entry is.
+        cache = ResolutionCache(cache_path, max_age=0)
+        assert cache.get("some-org/action", first, time.time()) == (True, first)
+
+    def test_invalid_refs(self, mirrors):
+        """Test that a ref holding a newline cannot shift the answers of cat-file."""
+        mirrors_dir, first, second = mirrors
+        link = "some-org/action"
+
+        with open_resolver(mirrors_dir) as resolver:
+            resolved = resolver.resolve_many(
+                [(link, f"zzz\n{first}"), (link, "bad"), (link, "v2"), (link, "a..b")]
+            )
+
+        assert resolved == {
+            (link, f"zzz\n{first}"): None,
+            (link, "bad"): None,
+            (link, "v2"): second,
+            (link, "a..b"): None,
+        }
+        entries = json.loads((mirrors_dir / CACHE_FILE_NAME).read_text())
+        assert sorted(entries[link]) == ["bad", "v2"]
+        assert entries[link]["bad"][0] is None
+
+
+class TestResolvingIndex:
+    """Test cases for ResolvingIndex class."""
+
+    def test_tag_resolved_to_approved_sha(self, mirrors):
+        """Test that a tag is approved through the SHA it names."""
+        mirrors_dir, first, second = mirrors
+        index = ApprovedIndex(
+            [{"actionLink": "some-org/action", "actionVersion": first, "tag": "v1"}]
+        )
+
+        with MirrorResolver(mirrors_dir) as resolver:
+            approved = ResolvingIndex(index, resolver)
+
+            assert approved.lookup("some-org/action", "v1").tag == "v1"
+            assert approved.lookup("some-org/action", "v2") is None
+            assert approved.lookup("other-org/action", "v1") is None
+            assert approved.lookup("some-org/action", f"zzz\n{first}") is None
+
+
+class TestVerifyApproved:
+    """Test cases for verify_approved function."""
+
+    def test_problems(self, mirrors, capsys):
+        """Test reporting unknown SHAs and tags that moved."""
+        mirrors_dir, first, second = mirrors
+        approved = [
+            {"actionLink": "some-org/action", "actionVersion": first, "tag": "v1"},
+            {"actionLink": "some-org/action", "actionVersion": first, "tag": "v2"},
+            {"actionLink": "some-org/action", "actionVersion": "1" * 40},
+            {"actionLink": "some-org/action", "actionVersion": second, "tag": "v9"},
+            {"actionLink": "some-org/*", "actionVersion": "*"},
+            {"actionLink": "other-org/action", "actionVersion": first},
+            {"actionLink": "./local-action", "actionVersion": None},
+        ]
+
+        with MirrorResolver(mirrors_dir) as resolver:
+            problems = verify_approved(approved, resolver)
+
+        assert problems == [
+            f"some-org/action: tag v2 is {second}, not {first}",
+            f"some-org/action: {'1' * 40} was not found in the mirror",
+            "some-org/action: tag v9 was not found in the mirror",
+        ]
+        output = capsys.readouterr().out
+        assert "No mirror of other-org/action" in output
+
+    def test_command_line(self, mirrors):
+        """Test the verify command and tag resolution in a scan."""
+        mirrors_dir, first, _ = mirrors
+        temp_dir = mirrors_dir.parent
+        (temp_dir / "approved.json").write_text(
+            json.dumps(
+                [{"actionLink": "some-org/action", "actionVersion": first, "tag": "v1"}]
+            )
+        )
+        workflows_dir = temp_dir / "repository" / ".github" / "workflows"
+        workflows_dir.mkdir(parents=True)
+        (workflows_dir / "test.yml").write_text(
+            "on: push\njobs:\n  test:\n    steps:\n      - uses: some-org/action@v1\n"
+        )
+
+        def run(*args):
+            return subprocess.run(
+                [sys.executable, "action_allowedlist", *args],
+                capture_output=True,
+                text=True,
+                cwd=ROOT,
+                env={**os.environ, "GITHUB_OUTPUT": ""},
+            )
+
+        approved_path = str(temp_dir / "approved.json")
+        repository = str(temp_dir / "repository")
+        assert (
+            run("verify", approved_path, "--mirrors", str(mirrors_dir)).returncode == 0
+        )
+        assert run(repository, approved_path).returncode == 1
+        assert (
+            run(repository, approved_path, "--mirrors", str(mirrors_dir)).returncode
+            == 0
+        )
@@ -0,0 +1,255 @@
+import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist.org_scan import (
+    find_repositories,
+    read_manifest,
+    scan_organization,
+)
+from tests.helpers import git
+
+APPROVED_WORKFLOW = """
+name: Approved
+on: [push]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - uses: some/custom-action@v1
+"""
+
+DENIED_WORKFLOW = """
+name: Denied
+on: [push]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: unknown/action@v1
+"""
+
+
+def create_repository(checkouts_dir: Path, name, workflow_content):
+    workflows_dir = checkouts_dir / name / ".github" / "workflows"
+    workflows_dir.mkdir(parents=True)
+    (workflows_dir / "ci.yml").write_text(workflow_content)
+    return checkouts_dir / name
+
+
+def create_approved_file(directory: Path):
+    approved_file = directory / "approved.json"
+    approved_file.write_text(
+        json.dumps([{"actionLink": "some/custom-action", "actionVersion": "v1"}])
+    )
+    return approved_file
+
+
+class TestFindRepositories:
+    """Test cases for find_repositories function."""
+
+    def test_finds_only_directories_with_workflows(self):
+        """Test that only checkouts containing .github/workflows are returned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            create_repository(checkouts, "repo-b", APPROVED_WORKFLOW)
+            create_repository(checkouts, "repo-a", APPROVED_WORKFLOW)
+            (checkouts / "no-workflows").mkdir()
+            (checkouts / "file.txt").write_text("not a repository")
+
+            repositories = find_repositories(checkouts)
+
+            assert repositories == [checkouts / "repo-a", checkouts / "repo-b"]
+
+
+class TestReadManifest:
+    """Test cases for read_manifest function."""
+
+    def test_reads_paths_relative_to_manifest(self):
+        """Test that blank lines and comments are skipped and paths are resolved."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = Path(temp_dir) / "repos.txt"
+            manifest.write_text("# nightly audit\nrepo-a\n\n  repo-b  \n")
+
+            repositories = read_manifest(manifest)
+
+            assert repositories == [
+                (Path(temp_dir) / "repo-a").resolve(),
+                (Path(temp_dir) / "repo-b").resolve(),
+            ]
+
+
+class TestScanOrganization:
+    """Test cases for scan_organization function."""
+
+    def test_all_repositories_approved(self):
+        """Test an organization where every repository is approved."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            repositories = [
+                create_repository(checkouts, "repo-a", APPROVED_WORKFLOW),
+                create_repository(checkouts, "repo-b", APPROVED_WORKFLOW),
+            ]
+            approved_file = create_approved_file(checkouts)
+
+            with patch("builtins.print"):
+                result = scan_organization(repositories, approved_file)
+
+            assert result is False
+
+    def test_denied_repository_reported_separately(self, capsys):
+        """Test that a denied repository fails the run and is named in the report."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            repositories = [
+                create_repository(checkouts, "repo-a", APPROVED_WORKFLOW),
+                create_repository(checkouts, "repo-b", DENIED_WORKFLOW),
+            ]
+            approved_file = create_approved_file(checkouts)
+
+            result = scan_organization(repositories, approved_file)
+
+            output = capsys.readouterr().out
+            assert result is True
+            assert f"::group::{repositories[0]}\n" in output
+            assert f"::group::{repositories[1]}\n" in output
+            assert (
+                "error: Scanned 2 repositories, 1 with denied actions or errors:\n"
+                f"  {repositories[1]}: denied actions\n"
+            ) in output
+
+    def test_quiet(self, capsys):
+        """Test that only errors are shown at the error level."""
+        from action_allowedlist.log import logger
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            repositories = [create_repository(checkouts, "repo-a", APPROVED_WORKFLOW)]
+            approved_file = create_approved_file(checkouts)
+
+            previous = logger.level
+            logger.setLevel(logging.ERROR)
+            try:
+                with patch(
+                    "action_allowedlist.org_scan._iter_repository_actions",
+                    side_effect=OSError("cannot read"),
+                ):
+                    assert scan_organization(repositories, approved_file) is True
+            finally:
+                logger.setLevel(previous)
+
+            assert capsys.readouterr().out.splitlines() == [
+                f"error: Error occurred while scanning {repositories[0]}: cannot read",
+                "error: Scanned 1 repositories, 1 with denied actions or errors:",
+                f"  {repositories[0]}: error",
+            ]
+
+    def test_process_pool_matches_serial_scan(self, capsys):
+        """Test that scanning with several workers gives the same report."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            repositories = [
+                create_repository(checkouts, "repo-a", APPROVED_WORKFLOW),
+                create_repository(checkouts, "repo-b", DENIED_WORKFLOW),
+                create_repository(checkouts, "repo-c", APPROVED_WORKFLOW),
+            ]
+            approved_file = create_approved_file(checkouts)
+
+            serial = scan_organization(repositories, approved_file, workers=1)
+            serial_report = capsys.readouterr().out
+            parallel = scan_organization(repositories, approved_file, workers=2)
+            parallel_report = capsys.readouterr().out
+
+            assert serial is parallel is True
+            assert "unknown/action v1" in serial_report
+            assert serial_report == parallel_report
+
+    def test_results_written_for_every_repository(self, capsys):
+        """Test --results in organization mode, with parsing jobs in each worker."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            repositories = [
+                create_repository(checkouts, "repo-a", APPROVED_WORKFLOW),
+                create_repository(checkouts, "repo-b", DENIED_WORKFLOW),
+            ]
+            (repositories[0] / ".github/workflows/other.yml").write_text(
+                DENIED_WORKFLOW
+            )
+            approved_file = create_approved_file(checkouts)
+            results_path = checkouts / "results.ndjson"
+
+            found = scan_organization(
+                repositories, approved_file, 2, jobs=2, results_path=results_path
+            )
+
+            records = [
+                json.loads(line) for line in results_path.read_text().splitlines()
+            ]
+            assert found is True
+            assert [
+                (Path(r["repository"]).name, r["workflowFileName"], r["approved"])
+                for r in records
+            ] == [
+                ("repo-a", "ci.yml", True),
+                ("repo-a", "ci.yml", True),
+                ("repo-a", "other.yml", False),
+                ("repo-b", "ci.yml", False),
+            ]
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+    def test_base_ref_and_mirrors(self, capsys):
+        """Test that --base-ref and --mirrors apply to every repository."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkouts = Path(temp_dir)
+            repository = create_repository(checkouts, "repo-a", DENIED_WORKFLOW)
+            git(repository, "init", "-q", "-b", "main")
+            git(repository, "add", "-A")
+            git(repository, "commit", "-q", "-m", "base")
+            git(repository, "tag", "base")
+            (repository / ".github/workflows/new.yml").write_text(
+                DENIED_WORKFLOW.replace("unknown/action@v1", "some-org/action@v1")
+            )
+            git(repository, "add", "-A")
+            git(repository, "commit", "-q", "-m", "head")
+
+            source = checkouts / "source"
+            source.mkdir()
+            git(source, "init", "-q")
+            git(source, "commit", "-q", "--allow-empty", "-m", "first")
+            git(source, "tag", "v1")
+            sha = git(source, "rev-parse", "HEAD")
+            mirrors = checkouts / "mirrors"
+            git(
+                checkouts,
+                "clone",
+                "-q",
+                "--mirror",
+                str(source),
+                str(mirrors / "some-org/action.git"),
+            )
+            approved_file = checkouts / "approved.json"
+            approved_file.write_text(
+                json.dumps([{"actionLink": "some-org/action", "actionVersion": sha}])
+            )
+
+            # Only new.yml is scanned, and v1 is found to be the approved commit.
+            found = scan_organization(
+                [repository],
+                approved_file,
+                base_ref="base",
+                mirrors=(mirrors, None, 60),
+            )
+            assert found is False
+            assert (
+                "Found [1] added or modified workflow files" in capsys.readouterr().out
+            )
+
+            assert (
+                scan_organization([repository], approved_file, base_ref="base") is True
+            )
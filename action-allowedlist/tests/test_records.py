@@ -0,0 +1,73 @@
+import json
+import pickle
+
+import pytest
+
+from action_allowedlist.records import ActionReference, ApprovedEntry
+
+
+class TestActionReference:
+    """Test cases for ActionReference class."""
+
+    def test_dict_view(self):
+        """Test that a reference reads and compares like the dict it replaces."""
+        reference = ActionReference("actions/checkout", "v4", "test.yml", "build")
+        as_dict = {
+            "actionLink": "actions/checkout",
+            "actionVersion": "v4",
+            "workflowFileName": "test.yml",
+            "jobName": "build",
+        }
+
+        assert reference == as_dict
+        assert as_dict == reference
+        assert dict(reference) == as_dict
+        assert reference["actionLink"] == "actions/checkout"
+        assert reference.get("missing") is None
+        assert json.loads(json.dumps(dict(reference))) == as_dict
+        with pytest.raises(KeyError):
+            reference["missing"]
+
+    def test_no_instance_dict(self):
+        """Test that references are stored in slots."""
+        reference = ActionReference("actions/checkout", "v4", "test.yml", None)
+
+        assert not hasattr(reference, "__dict__")
+
+    def test_strings_interned(self):
+        """Test that equal strings from different references are shared."""
+        first = ActionReference("".join(["some/", "action"]), "v1", "a.yml", "job")
+        second = ActionReference("".join(["some/", "action"]), "v1", "b.yml", "job")
+
+        assert first.actionLink is second.actionLink
+
+    def test_replace_and_pickle(self):
+        """Test copying with a change, and sending a reference to another process."""
+        reference = ActionReference("some/action", "v1", "action.yml", None)
+
+        moved = reference.replace(workflowFileName=".github/actions/a/action.yml")
+
+        assert moved["workflowFileName"] == ".github/actions/a/action.yml"
+        assert reference["workflowFileName"] == "action.yml"
+        assert pickle.loads(pickle.dumps(moved)) == moved
+
+
+class TestApprovedEntry:
+    """Test cases for ApprovedEntry class."""
+
+    def test_missing_keys_stay_missing(self):
+        """Test that an entry without tag or deprecated equals its JSON object."""
+        entry = {"actionLink": "some/action", "actionVersion": "abc123"}
+
+        record = ApprovedEntry.from_dict(entry)
+
+        assert isinstance(record, ApprovedEntry)
+        assert record == entry
+        assert "tag" not in record
+        assert record.get("deprecated", False) is False
+
+    def test_unknown_keys_keep_dict(self):
+        """Test that an entry with other properties is kept as it is."""
+        entry = {"actionLink": "some/action", "actionVersion": "v1", "note": "x"}
+
+        assert ApprovedEntry.from_dict(entry) is entry
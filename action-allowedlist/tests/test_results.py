@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from action_allowedlist.results import ResultCollector
+
+ROOT = Path(__file__).parent.parent
+
+
+def result(action_link, action_version, approved):
+    return {
+        "actionLink": action_link,
+        "actionVersion": action_version,
+        "workflowFileName": "test.yml",
+        "jobName": "test",
+        "approved": approved,
+        "deprecated": False,
+    }
+
+
+class TestResultCollector:
+    """Test cases for ResultCollector class."""
+
+    def test_ndjson_and_denied_actions(self):
+        """Test that every result is streamed and denied actions are listed once."""
+        stream = io.StringIO()
+        collector = ResultCollector(stream)
+
+        collector(result("actions/checkout", "v4", True))
+        collector(result("unknown/action", "v1", False))
+        collector(result("unknown/action", "v1", False))
+
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line)["approved"] for line in lines] == [True, False, False]
+        assert collector.denied_actions() == [
+            {"actionLink": "unknown/action", "actionVersion": "v1"}
+        ]
+
+    def test_github_output(self):
+        """Test that the actions output is appended to the GITHUB_OUTPUT file."""
+        collector = ResultCollector()
+        collector(result("unknown/action", "v1", False))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "output"
+            output.write_text("other=value\n")
+            collector.write_github_output(output)
+
+            assert output.read_text() == (
+                "other=value\n"
+                'actions=[{"actionLink": "unknown/action", "actionVersion": "v1"}]\n'
+            )
+
+
+class TestResultsCommandLine:
+    """Test cases for the --results option and the actions output."""
+
+    def test_scan_writes_results(self):
+        """Test a scan writing NDJSON results and the GitHub output."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_dir = Path(temp_dir)
+            workflows_dir = temp_dir / "repository" / ".github" / "workflows"
+            workflows_dir.mkdir(parents=True)
+            (workflows_dir / "test.yml").write_text(
+                "on: push\njobs:\n  test:\n    steps:\n"
+                "      - uses: actions/checkout@v4\n"
+                "      - uses: unknown/action@v1\n"
+            )
+            (temp_dir / "approved.json").write_text("[]")
+
+            process = subprocess.run(
+                [
+                    sys.executable,
+                    "action_allowedlist",
+                    str(temp_dir / "repository"),
+                    str(temp_dir / "approved.json"),
+                    "--results",
+                    str(temp_dir / "results.ndjson"),
+                ],
+                capture_output=True,
+                text=True,
+                cwd=ROOT,
+                env={**os.environ, "GITHUB_OUTPUT": str(temp_dir / "output")},
+            )
+
+            assert process.returncode == 1
+            results = [
+                json.loads(line)
+                for line in (temp_dir / "results.ndjson").read_text().splitlines()
+            ]
+            assert [(r["actionLink"], r["approved"]) for r in results] == [
+                ("actions/checkout", True),
+                ("unknown/action", False),
+            ]
+            assert (temp_dir / "output").read_text() == (
+                'actions=[{"actionLink": "unknown/action", "actionVersion": "v1"}]\n'
+            )
@@ -0,0 +1,133 @@
+import pytest
+
+from action_allowedlist.approved_index import ApprovedIndex
+from action_allowedlist.rules import BUILTIN_RULES, RuleMatcher, is_rule
+
+
+class TestRuleMatcher:
+    """Test cases for RuleMatcher class."""
+
+    def test_owner_wildcard(self):
+        """Test that a trailing '*' matches one or more path segments."""
+        matcher = RuleMatcher([{"actionLink": "my-org/*", "actionVersion": "*"}])
+
+        assert matcher.match("my-org/action", "v1") is not None
+        assert matcher.match("my-org/action/sub/path", "abc123") is not None
+        assert matcher.match("my-org", "v1") is None
+        assert matcher.match("other-org/action", "v1") is None
+
+    def test_segment_wildcard(self):
+        """Test that a '*' in the middle matches exactly one segment."""
+        matcher = RuleMatcher(
+            [{"actionLink": "my-org/*/setup", "actionVersion": "*"}], builtin=False
+        )
+
+        assert matcher.match("my-org/tools/setup", "v1") is not None
+        assert matcher.match("my-org/tools/build", "v1") is None
+        assert matcher.match("my-org/tools/x/setup", "v1") is None
+
+    def test_version_prefix(self):
+        """Test that a version ending in '*' matches by prefix."""
+        matcher = RuleMatcher([{"actionLink": "owner/repo", "actionVersion": "v2.*"}])
+
+        assert matcher.match("owner/repo", "v2.1.0") is not None
+        assert matcher.match("owner/repo", "v3.0.0") is None
+        assert matcher.match("owner/repo", None) is None
+
+    def test_most_specific_rule_wins(self):
+        """Test that literal segments, then exact versions, then longer prefixes win."""
+        rules = [
+            {"actionLink": "owner/*", "actionVersion": "*", "tag": "owner"},
+            {"actionLink": "owner/repo", "actionVersion": "*", "tag": "any"},
+            {"actionLink": "owner/repo", "actionVersion": "v2*", "tag": "v2"},
+            {"actionLink": "owner/repo", "actionVersion": "v2.1*", "tag": "v2.1"},
+        ]
+        matcher = RuleMatcher(rules)
+
+        assert matcher.match("owner/other", "v1")["tag"] == "owner"
+        assert matcher.match("owner/repo", "v1")["tag"] == "any"
+        assert matcher.match("owner/repo", "v2.0")["tag"] == "v2"
+        assert matcher.match("owner/repo", "v2.1.3")["tag"] == "v2.1"
+
+    def test_deny_wins_over_allow(self):
+        """Test that a matching deny rule overrides any allow rule."""
+        matcher = RuleMatcher(
+            [
+                {"actionLink": "my-org/*", "actionVersion": "*"},
+                {"actionLink": "my-org/*", "actionVersion": "v1*", "deny": True},
+                {"actionLink": "actions/cache", "actionVersion": "v1", "deny": True},
+            ]
+        )
+
+        assert matcher.match("my-org/action", "v2") is not None
+        assert matcher.match("my-org/action", "v1.2") is None
+        assert matcher.match_rule("my-org/action", "v1.2")["deny"] is True
+        assert matcher.match("actions/cache", "v1") is None
+        assert matcher.match("actions/cache", "v2") is not None
+
+    def test_builtin_rules(self):
+        """Test that github/* and actions/* are approved case-sensitively."""
+        matcher = RuleMatcher()
+
+        assert matcher.match("github/super-linter", "v4") in BUILTIN_RULES
+        assert matcher.match("actions/checkout", "v4") in BUILTIN_RULES
+        assert matcher.match("GitHub/super-linter", "v4") is None
+        assert matcher.match("actions", "v4") is None
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            {"actionLink": "my-org/act*", "actionVersion": "*"},
+            {"actionLink": "my-org/action", "actionVersion": "v*.1"},
+        ],
+    )
+    def test_unsupported_patterns(self, rule):
+        """Test that '*' inside a segment or a version is rejected."""
+        with pytest.raises(ValueError):
+            RuleMatcher([rule])
+
+    def test_is_rule(self):
+        """Test telling rules apart from exact entries."""
+        assert is_rule({"actionLink": "my-org/*", "actionVersion": "abc"})
+        assert is_rule({"actionLink": "my/action", "actionVersion": "v1", "deny": True})
+        assert not is_rule({"actionLink": "./local-action", "actionVersion": None})
+
+
+class TestApprovedIndexRules:
+    """Test cases for rules in ApprovedIndex."""
+
+    def test_exact_entry_before_rules(self):
+        """Test that an exact entry is used before any rule."""
+        index = ApprovedIndex(
+            [
+                {"actionLink": "my-org/*", "actionVersion": "*", "deny": True},
+                {"actionLink": "my-org/action", "actionVersion": "abc123"},
+                {
+                    "actionLink": "actions/checkout",
+                    "actionVersion": "v2",
+                    "deprecated": True,
+                },
+            ]
+        )
+
+        assert index.lookup("my-org/action", "abc123") is not None
+        assert index.lookup("my-org/action", "def456") is None
+        assert index.lookup("actions/checkout", "v2").deprecated is True
+        assert index.lookup("actions/checkout", "v4").deprecated is False
+
+    def test_rule_properties(self):
+        """Test that tag and deprecated come from the matching rule."""
+        rule = {
+            "actionLink": "owner/repo",
+            "actionVersion": "v1.*",
+            "tag": "v1",
+            "deprecated": True,
+        }
+        index = ApprovedIndex([rule])
+
+        record = index.lookup("owner/repo", "v1.4")
+
+        assert record.tag == "v1"
+        assert record.deprecated is True
+        assert record.entries == (rule,)
+        assert index.versions("owner/repo") == []
@@ -0,0 +1,235 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from action_allowedlist.server import (
+    ApprovedListWatcher,
+    ValidationServer,
+    ValidationService,
+    send_request,
+)
+from action_allowedlist.workflow_outline import ParseLimits, set_limits
+
+ROOT = Path(__file__).parent.parent
+
+WORKFLOW = """
+on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - uses: some/custom-action@v1
+      - uses: unknown/action@v2
+  test:
+    steps:
+      - uses: unknown/action@v2
+      - uses: ./local-action
+"""
+
+
+def write_approved(path: Path, entries, mtime_ns=None):
+    path.write_text(json.dumps(entries))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def approved_path():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "approved.json"
+        write_approved(
+            path,
+            [
+                {"actionLink": "some/custom-action", "actionVersion": "v1"},
+                {
+                    "actionLink": "some/old-action",
+                    "actionVersion": "v1",
+                    "deprecated": True,
+                },
+            ],
+            mtime_ns=1_000_000_000,
+        )
+        yield path
+
+
+class TestApprovedListWatcher:
+    """Test cases for ApprovedListWatcher class."""
+
+    def test_reloads_when_file_changes(self, approved_path):
+        """Test that a modified approved.json is picked up on the next request."""
+        watcher = ApprovedListWatcher(approved_path)
+        first = watcher.get()
+
+        assert watcher.get() is first
+
+        write_approved(approved_path, [], mtime_ns=2_000_000_000)
+
+        assert len(watcher.get()) == 0
+
+    def test_reloads_when_overlay_changes(self, approved_path):
+        """Test that overlays are merged and watched like approved.json."""
+        overlay_path = approved_path.with_name("overlay.json")
+        write_approved(
+            overlay_path,
+            {"revoke": [{"actionLink": "some/custom-action", "actionVersion": "v1"}]},
+            mtime_ns=1_000_000_000,
+        )
+        watcher = ApprovedListWatcher(approved_path, [overlay_path])
+
+        assert watcher.get().lookup("some/custom-action", "v1") is None
+
+        write_approved(overlay_path, [], mtime_ns=2_000_000_000)
+
+        assert watcher.get().lookup("some/custom-action", "v1") is not None
+
+    def test_keeps_previous_list_when_invalid(self, approved_path, capsys):
+        """Test that a half written approved.json does not drop the loaded list."""
+        watcher = ApprovedListWatcher(approved_path)
+        first = watcher.get()
+
+        approved_path.write_text("[{")
+        os.utime(approved_path, ns=(3_000_000_000, 3_000_000_000))
+
+        assert watcher.get() is first
+        assert "keeping the previous list" in capsys.readouterr().out
+
+
+class TestValidationService:
+    """Test cases for ValidationService class."""
+
+    def test_check(self, approved_path):
+        """Test checking single action references."""
+        service = ValidationService(approved_path)
+
+        assert service.check("some/custom-action@v1")["approved"] is True
+        assert service.check("some/old-action@v1")["deprecated"] is True
+        assert service.check("some/custom-action@v2")["approved"] is False
+        assert service.check("actions/anything@main")["approved"] is True
+        with pytest.raises(ValueError):
+            service.check("some/custom-action")
+
+    def test_validate(self, approved_path):
+        """Test that each action of a workflow is reported once with its jobs."""
+        service = ValidationService(approved_path)
+
+        response = service.validate(WORKFLOW)
+
+        assert response["denied"] == 1
+        assert [
+            (r["actionLink"], r["approved"], r["jobs"]) for r in response["results"]
+        ] == [
+            ("actions/checkout", True, ["build"]),
+            ("some/custom-action", True, ["build"]),
+            ("unknown/action", False, ["build", "test"]),
+        ]
+
+    def test_validate_rejected(self, approved_path):
+        """Test that a workflow over the parse limits is reported as rejected."""
+        service = ValidationService(approved_path)
+        set_limits(ParseLimits(max_depth=2))
+        try:
+            response = service.validate(WORKFLOW)
+        finally:
+            set_limits(ParseLimits())
+
+        assert response["rejected"] == "resource limit"
+        assert "levels deep" in response["reason"]
+        assert response["results"] == []
+
+    def test_validate_parse_error(self, approved_path):
+        """Test that a YAML syntax error is a result, not a server error."""
+        service = ValidationService(approved_path)
+
+        response = service.handle({"command": "validate", "workflow": "jobs: ["})
+
+        assert response["rejected"] == "parse error"
+        assert response["results"] == []
+
+    def test_parse_cache(self, approved_path):
+        """Test that the same workflow text is only parsed once."""
+        service = ValidationService(approved_path)
+
+        service.validate(WORKFLOW)
+        service.validate(WORKFLOW)
+
+        info = service._extract.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+
+class TestValidationServer:
+    """Test cases for the Unix socket server and client."""
+
+    def test_round_trip(self, approved_path):
+        """Test requests sent over the socket, including an approved list reload."""
+        socket_path = approved_path.parent / "server.sock"
+        with ValidationServer(socket_path, ValidationService(approved_path)) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                assert send_request(socket_path, {"command": "ping"}) == {"ok": True}
+                response = send_request(
+                    socket_path,
+                    {"command": "check", "actions": ["some/custom-action@v1"]},
+                )
+                assert response["results"][0]["approved"] is True
+
+                write_approved(approved_path, [], mtime_ns=2_000_000_000)
+                response = send_request(
+                    socket_path,
+                    {"command": "check", "actions": ["some/custom-action@v1"]},
+                )
+                assert response["results"][0]["approved"] is False
+
+                with pytest.raises(RuntimeError, match="Unknown command"):
+                    send_request(socket_path, {"command": "nope"})
+            finally:
+                server.shutdown()
+                thread.join()
+
+        assert not socket_path.exists()
+
+    def test_client_goes_on_after_parse_error(self, approved_path):
+        """Test that the client checks every file and exits 1 for a bad one."""
+        socket_path = approved_path.parent / "server.sock"
+        bad = approved_path.parent / "bad.yml"
+        bad.write_text("jobs: [")
+        good = approved_path.parent / "good.yml"
+        good.write_text(WORKFLOW)
+        with ValidationServer(socket_path, ValidationService(approved_path)) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                process = subprocess.run(
+                    [
+                        sys.executable,
+                        "action_allowedlist",
+                        "client",
+                        "--socket",
+                        str(socket_path),
+                        "validate",
+                        str(bad),
+                        str(good),
+                    ],
+                    capture_output=True,
+                    text=True,
+                    cwd=ROOT,
+                )
+            finally:
+                server.shutdown()
+                thread.join()
+
+        assert process.returncode == 1
+        assert f"{bad}: rejected (parse error)" in process.stdout
+        assert f"{good}: unknown/action@v2 is not approved" in process.stdout
+
+    def test_no_server(self, approved_path):
+        """Test that the client fails cleanly when nothing is listening."""
+        with pytest.raises(OSError):
+            send_request(approved_path.parent / "missing.sock", {"command": "ping"})
@@ -0,0 +1,236 @@
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist.actions_parser import get_all_used_actions, iter_tree_actions
+from action_allowedlist.cat_file import CatFile
+from action_allowedlist.org_scan import find_repositories, scan_organization
+from action_allowedlist.sources import ArchiveTree, GitTree, Tree, open_tree
+from action_allowedlist.workflow_outline import ParseLimits, set_limits
+from tests.helpers import git
+
+COMPOSITE_ACTION = """
+name: Setup
+runs:
+  using: composite
+  steps:
+    - uses: some/setup-tool@v1
+"""
+
+WORKFLOW = """
+on: push
+jobs:
+  build:
+    steps:
+      - uses: actions/checkout@v4
+      - uses: ./.github/actions/setup
+      - uses: ./not-in-repository
+"""
+
+
+@pytest.fixture
+def repository():
+    """A checkout with a workflow that uses a local composite action."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir) / "repository"
+        for path, content in [
+            (".github/workflows/build.yml", WORKFLOW),
+            (".github/workflows/README.md", "not a workflow"),
+            (".github/actions/setup/action.yml", COMPOSITE_ACTION),
+            ("src/main.py", "print()"),
+        ]:
+            (root / path).parent.mkdir(parents=True, exist_ok=True)
+            (root / path).write_text(content)
+        yield root
+
+
+def actions_of(actions):
+    return [
+        (a["actionLink"], a["actionVersion"], a["workflowFileName"], a["jobName"])
+        for a in actions
+    ]
+
+
+def test_tree_is_abstract():
+    """Test that a Tree must say how to list and read its files."""
+    with pytest.raises(TypeError):
+        Tree("label")
+
+
+class TestArchiveTree:
+    """Test cases for ArchiveTree class."""
+
+    def test_tar_with_leading_directory(self, repository):
+        """Test a compressed tar archive laid out like a GitHub source archive."""
+        archive = repository.parent / "repository.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(repository, arcname="owner-repository-abc123")
+
+        tree = open_tree(archive)
+
+        assert isinstance(tree, ArchiveTree)
+        assert tree.workflow_paths() == [".github/workflows/build.yml"]
+        assert actions_of(iter_tree_actions(tree)) == actions_of(
+            get_all_used_actions(repository)
+        )
+
+    def test_zip(self, repository):
+        """Test a zip archive of the repository contents."""
+        archive = repository.parent / "repository.zip"
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            for path in repository.rglob("*"):
+                zip_file.write(path, path.relative_to(repository).as_posix())
+
+        actions = list(iter_tree_actions(open_tree(archive)))
+
+        assert actions_of(actions) == actions_of(get_all_used_actions(repository))
+
+    def test_member_over_size_limit(self, repository):
+        """Test that a member over the size limit is rejected without reading it."""
+        archive = repository.parent / "repository.tar"
+        with tarfile.open(archive, "w") as tar:
+            tar.add(repository, arcname="repository")
+
+        set_limits(ParseLimits(max_bytes=100))
+        try:
+            with patch.object(tarfile.ExFileObject, "read") as read:
+                tree = open_tree(archive)
+            actions = list(iter_tree_actions(tree))
+        finally:
+            set_limits(ParseLimits())
+
+        # Only the composite action, of 78 bytes, is read.
+        assert read.call_count == 1
+        assert [dict(action) for action in actions] == [
+            {
+                "workflowFileName": "build.yml",
+                "rejected": "resource limit",
+                "reason": "larger than 100 bytes",
+            }
+        ]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+class TestGitTree:
+    """Test cases for GitTree class."""
+
+    def test_read_at_ref(self, repository):
+        """Test reading a bare repository at an older ref without a checkout."""
+        expected = actions_of(get_all_used_actions(repository))
+        git(repository, "init", "-q")
+        git(repository, "add", ".")
+        git(repository, "commit", "-q", "-m", "first")
+        git(repository, "tag", "v1")
+        (repository / ".github/workflows/build.yml").write_text(
+            "on: push\njobs:\n  build:\n    steps:\n      - uses: other/action@v2\n"
+        )
+        git(repository, "commit", "-q", "-am", "second")
+        bare = repository.parent / "repository.git"
+        git(repository.parent, "clone", "-q", "--bare", str(repository), str(bare))
+
+        head = open_tree(bare)
+        assert isinstance(head, GitTree)
+        assert actions_of(iter_tree_actions(head)) == [
+            ("other/action", "v2", "build.yml", "build")
+        ]
+        assert head._batch is None
+
+        assert actions_of(iter_tree_actions(open_tree(bare, "v1"), jobs=2)) == expected
+
+    def test_local_path_with_newline(self, repository):
+        """Test that a local path cannot add requests to cat-file."""
+        (repository / ".github/actions/evil").mkdir()
+        (repository / ".github/actions/evil/action.yml").write_text(
+            COMPOSITE_ACTION.replace("some/setup-tool@v1", "evil/thing@v1")
+        )
+        (repository / ".github/workflows/build.yml").write_text(
+            "on: push\njobs:\n  build:\n    steps:\n"
+            '      - uses: "./x\\nHEAD:.github/actions/setup/action.yml'
+            '\\nHEAD:.github/actions/setup"\n'
+            "      - uses: ./.github/actions/evil\n"
+        )
+        git(repository, "init", "-q")
+        git(repository, "add", ".")
+        git(repository, "commit", "-q", "-m", "first")
+
+        actions = actions_of(iter_tree_actions(open_tree(repository, "HEAD")))
+
+        assert actions == [
+            ("evil/thing", "v1", ".github/actions/evil/action.yml", None)
+        ]
+
+    def test_blob_over_size_limit(self, repository):
+        """Test that a blob over the size limit is rejected without reading it."""
+        git(repository, "init", "-q")
+        git(repository, "add", ".")
+        git(repository, "commit", "-q", "-m", "first")
+        read = []
+        query = CatFile.iter_query
+
+        def spy(cat_file, names):
+            names = list(names)
+            if cat_file.contents:
+                read.extend(names)
+            return query(cat_file, names)
+
+        set_limits(ParseLimits(max_bytes=100))
+        try:
+            with patch.object(CatFile, "iter_query", spy):
+                actions = list(iter_tree_actions(open_tree(repository, "HEAD")))
+        finally:
+            set_limits(ParseLimits())
+
+        assert [dict(action) for action in actions] == [
+            {
+                "workflowFileName": "build.yml",
+                "rejected": "resource limit",
+                "reason": "larger than 100 bytes",
+            }
+        ]
+        # Only the sizes were asked for; the workflow is rejected before the
+        # local action it uses is looked up.
+        assert read == []
+
+    def test_unknown_ref(self, repository):
+        """Test that a ref missing from the repository is an error."""
+        git(repository, "init", "-q")
+
+        with pytest.raises(RuntimeError):
+            GitTree(repository, "no-such-ref")
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+class TestOrganizationSources:
+    """Test cases for scanning checkouts, bare repositories and archives together."""
+
+    def test_mixed_sources(self, repository, capsys):
+        """Test that an org scan finds and scans every kind of repository."""
+        repositories = repository.parent
+        git(repository, "init", "-q")
+        git(repository, "add", ".")
+        git(repository, "commit", "-q", "-m", "first")
+        git(repositories, "clone", "-q", "--bare", str(repository), "bare.git")
+        with tarfile.open(repositories / "archive.tar", "w") as tar:
+            tar.add(repository, arcname=".")
+        (repositories / "notes.txt").write_text("not a repository")
+        approved = repositories / "approved.json"
+        approved.write_text(
+            '[{"actionLink": "some/setup-tool", "actionVersion": "v1"}]'
+        )
+
+        found = find_repositories(repositories)
+
+        assert [path.name for path in found] == [
+            "archive.tar",
+            "bare.git",
+            "repository",
+        ]
+        assert scan_organization(found, approved) is False
+        assert (
+            "Scanned 3 repositories, 0 with denied actions" in capsys.readouterr().out
+        )
@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from build_zipapp import build
+
+ROOT = Path(__file__).parent.parent
+APPROVED_JSON = ROOT / "approved.json"
+
+# Time the CLI may add to a bare interpreter start before parsing arguments.
+# Raise it on slow machines with ACTION_ALLOWEDLIST_STARTUP_BUDGET (seconds).
+STARTUP_BUDGET = float(os.environ.get("ACTION_ALLOWEDLIST_STARTUP_BUDGET", "0.1"))
+
+HEAVY_MODULES = {
+    "yaml",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "socketserver",
+}
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, cwd=ROOT
+    )
+
+
+def fastest(*args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def imported_modules(*args):
+    result = run("-X", "importtime", "action_allowedlist", *args)
+    return {
+        line.split("|")[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+@pytest.fixture
+def actions_file():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "actions.json"
+        path.write_text(
+            json.dumps([{"actionLink": "actions/checkout", "actionVersion": "v4"}])
+        )
+        yield path
+
+
+class TestStartup:
+    """Test cases for the cold start of the command line entry point."""
+
+    def test_validate_list_skips_heavy_imports(self, actions_file):
+        """Test that checking a precomputed list loads neither PyYAML nor multiprocessing."""
+        modules = imported_modules(
+            "validate-list", str(APPROVED_JSON), str(actions_file)
+        )
+
+        assert "action_allowedlist.actions_parser" in modules
+        assert not modules & HEAVY_MODULES
+
+    def test_help_skips_heavy_imports(self):
+        """Test that argument parsing alone loads nothing heavy."""
+        modules = imported_modules("--help")
+
+        assert "action_allowedlist.actions_parser" not in modules
+        assert not modules & HEAVY_MODULES
+
+    def test_cold_start_budget(self):
+        """Test that the entry point starts within its budget over a bare interpreter."""
+        bare = fastest("-c", "pass")
+        cli = fastest("action_allowedlist", "--help")
+
+        assert cli - bare < STARTUP_BUDGET
+
+
+class TestZipapp:
+    """Test cases for the single-file zipapp build."""
+
+    def test_zipapp_runs(self, actions_file):
+        """Test that the built archive validates a list like the source tree does."""
+        target = actions_file.parent / "action_allowedlist.pyz"
+        build(target)
+
+        result = run(
+            str(target), "validate-list", str(APPROVED_JSON), str(actions_file)
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "All 1 actions/versions are approved." in result.stdout
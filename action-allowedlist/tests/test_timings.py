@@ -0,0 +1,104 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist import timings
+from action_allowedlist.actions_parser import get_all_used_actions
+
+WORKFLOW = """
+name: Test
+on: [push]
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - run: make
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/setup-python@v5
+"""
+
+
+@pytest.fixture(autouse=True)
+def reset_recorder():
+    """Leave timings disabled for other tests."""
+    yield
+    timings._recorder = None
+
+
+@pytest.fixture
+def repository():
+    """A repository with two identical workflow files."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workflows_dir = Path(temp_dir) / ".github" / "workflows"
+        workflows_dir.mkdir(parents=True)
+        (workflows_dir / "a.yml").write_text(WORKFLOW)
+        (workflows_dir / "b.yml").write_text(WORKFLOW)
+        yield Path(temp_dir)
+
+
+class TestTimings:
+    """Test cases for per-phase and per-file timing."""
+
+    def test_disabled_by_default(self):
+        """Test that nothing is recorded unless timings are enabled."""
+        assert not timings.is_enabled()
+        with timings.phase("discovery"), timings.workflow_file("a.yml"):
+            with timings.step("parse"):
+                timings.add_counts(jobs=1)
+
+        assert timings.collect_files() == []
+
+    def test_records_phases_files_and_counts(self, repository):
+        """Test that a scan records discovery, reads, parses and counts."""
+        timings.enable()
+
+        with patch("builtins.print"):
+            get_all_used_actions(repository)
+        document = timings.report()
+
+        assert list(document["phases"]) == ["discovery", "read", "parse", "total"]
+        assert document["counts"] == {
+            "files": 2,
+            "jobs": 4,
+            "steps": 6,
+            "references": 4,
+            "cached_files": 0,
+        }
+        assert [record["file"] for record in document["files"]] == ["a.yml", "b.yml"]
+        for record in document["files"]:
+            assert record["parse"]["wall"] >= 0
+            assert record["read"]["cpu"] >= 0
+
+    def test_parallel_parsing_returns_file_records(self, repository):
+        """Test that file records from worker processes reach the parent."""
+        timings.enable()
+
+        with patch("builtins.print"):
+            get_all_used_actions(repository, jobs=2)
+        document = timings.report()
+
+        assert document["counts"]["files"] == 2
+        assert document["counts"]["references"] == 4
+
+    def test_write_json_and_step_summary(self, repository):
+        """Test writing the JSON document and the step summary table."""
+        timings.enable()
+        with patch("builtins.print"):
+            get_all_used_actions(repository)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_path = Path(temp_dir) / "timings.json"
+            summary_path = Path(temp_dir) / "summary.md"
+            timings.write_json(json_path)
+            timings.write_step_summary(summary_path)
+
+            assert json.loads(json_path.read_text())["counts"]["files"] == 2
+            summary = summary_path.read_text()
+            assert "| parse |" in summary
+            assert "| references | 4 |" in summary
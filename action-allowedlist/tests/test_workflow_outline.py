@@ -0,0 +1,234 @@
+from pathlib import Path
+
+import pytest
+
+from action_allowedlist import yaml_backend
+from action_allowedlist.actions_parser import get_actions_from_file
+from action_allowedlist.workflow_outline import (
+    LocatedStr,
+    ParseLimits,
+    ResourceLimitError,
+    get_limits,
+    load_outline,
+    set_limits,
+)
+from action_allowedlist.yaml_backend import safe_load
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "workflows"
+
+ANCHORS = """\
+x-steps: &steps
+  - uses: actions/checkout@v4
+  - run: echo hi
+x-job: &job
+  runs-on: ubuntu-latest
+  steps: *steps
+jobs:
+  build: *job
+  test:
+    <<: *job
+    steps:
+      - uses: actions/setup-python@v5
+  deploy:
+    <<: [{uses: first/workflow.yml@v1}, {uses: second/workflow.yml@v1}]
+  lint:
+    <<: *job
+"""
+
+COMPOSITE = """\
+name: composite
+runs:
+  using: composite
+  steps:
+    - uses: actions/cache@v4
+      with: {path: "~/.cache"}
+    - shell: bash
+      run: echo done
+"""
+
+ODD = """\
+on: {push: {branches: [main]}}
+jobs:
+  1: {steps: [{uses: "quoted/action@v1"}]}
+  off: {uses: ./.github/workflows/reusable.yml}
+  build: {steps: []}
+  build: {steps: [{uses: last/wins@v2}]}
+  ? [complex, key]
+  : ignored
+"""
+
+
+def reference_outline(content):
+    """What load_outline should give: safe_load with the rest left out."""
+    parsed = safe_load(content)
+
+    def steps(value):
+        if not isinstance(value, list):
+            return value
+        return [
+            {"uses": step["uses"]} if "uses" in step else {}
+            for step in value
+            if isinstance(step, dict)
+        ]
+
+    def job(value):
+        return {
+            key: steps(item) if key == "steps" else item
+            for key, item in value.items()
+            if key in ("uses", "steps")
+        }
+
+    outline = {}
+    if "jobs" in parsed:
+        outline["jobs"] = {name: job(value) for name, value in parsed["jobs"].items()}
+    if "runs" in parsed:
+        outline["runs"] = {
+            key: steps(item) if key == "steps" else item
+            for key, item in parsed["runs"].items()
+            if key in ("using", "steps")
+        }
+    return outline
+
+
+@pytest.fixture(params=yaml_backend.available_backends())
+def backend(request):
+    previous = yaml_backend._backend
+    yaml_backend.select_backend(request.param)
+    yield request.param
+    yaml_backend._backend = previous
+
+
+class TestLoadOutline:
+    """Test cases for load_outline."""
+
+    @pytest.mark.parametrize(
+        "content",
+        [ANCHORS, COMPOSITE]
+        + [path.read_text() for path in sorted(FIXTURES_DIR.glob("*.yml"))],
+    )
+    def test_same_as_safe_load(self, backend, content):
+        """Test that the outline has the same values as safe_load."""
+        outline = load_outline(content)
+        assert outline == reference_outline(content)
+        assert list(outline.get("jobs", {})) == list(
+            reference_outline(content).get("jobs", {})
+        )
+
+    def test_odd_keys(self, backend):
+        """Test that keys are resolved like safe_load and complex keys skipped."""
+        outline = load_outline(ODD)
+
+        assert list(outline["jobs"]) == [1, False, "build"]
+        assert outline["jobs"]["build"] == {"steps": [{"uses": "last/wins@v2"}]}
+
+    def test_positions(self, backend):
+        """Test that uses values carry their line and column."""
+        outline = load_outline(ANCHORS)
+
+        uses = outline["jobs"]["test"]["steps"][0]["uses"]
+        assert isinstance(uses, LocatedStr)
+        assert (uses.line, uses.column) == (12, 15)
+        # Aliased values point at where the anchored node is written.
+        checkout = outline["jobs"]["build"]["steps"][0]["uses"]
+        assert (checkout.line, checkout.column) == (2, 11)
+
+    def test_merge_precedence(self, backend):
+        """Test that explicit keys, then earlier merged mappings, win."""
+        outline = load_outline(ANCHORS)
+
+        assert outline["jobs"]["test"]["steps"] == [{"uses": "actions/setup-python@v5"}]
+        assert outline["jobs"]["deploy"] == {"uses": "first/workflow.yml@v1"}
+        assert outline["jobs"]["lint"]["steps"][0]["uses"] == "actions/checkout@v4"
+
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            ("", None),
+            ("just a string\n", "just a string"),
+            ("- a\n- b\n", [None, None]),
+            ("jobs: [a]\n", {"jobs": [None]}),
+        ],
+    )
+    def test_other_shapes(self, backend, content, expected):
+        """Test that documents of another shape keep it, so they fail as before."""
+        assert load_outline(content) == expected
+
+    def test_errors(self, backend):
+        """Test that undefined aliases and extra documents are errors."""
+        import yaml
+
+        with pytest.raises(yaml.YAMLError):
+            load_outline("jobs: *missing\n")
+        with pytest.raises(yaml.YAMLError):
+            load_outline("jobs: {}\n---\njobs: {}\n")
+        with pytest.raises(yaml.YAMLError):
+            load_outline("jobs: {build: {<<: 3}}\n")
+
+
+class TestGetActionsFromFile:
+    """Test cases for the positions of extracted references."""
+
+    def test_positions(self, backend):
+        """Test that references keep the line and column of their uses."""
+        actions = get_actions_from_file(ANCHORS, "anchors.yml")
+
+        assert [(a["jobName"], a["actionLink"], a.line, a.column) for a in actions] == [
+            ("build", "actions/checkout", 2, 11),
+            ("test", "actions/setup-python", 12, 15),
+            ("deploy", "first/workflow.yml", 14, 17),
+            ("lint", "actions/checkout", 2, 11),
+        ]
+
+    def test_malformed_job(self, backend):
+        """Test that a job that is not a mapping is an error, as before."""
+        with pytest.raises(AttributeError):
+            get_actions_from_file("jobs:\n  build: run\n", "bad.yml")
+
+
+def alias_bomb(levels=9):
+    """Merge keys that expand to 10**levels copies of one mapping."""
+    lines = ["m0: &m0 {uses: some/action@v1}"]
+    for i in range(1, levels + 1):
+        lines.append(f"m{i}: &m{i} {{<<: [{', '.join([f'*m{i - 1}'] * 10)}]}}")
+    return "\n".join(lines) + f"\njobs:\n  build: *m{levels}\n"
+
+
+class TestParseLimits:
+    """Test cases for the resource limits of load_outline."""
+
+    def test_alias_bomb(self, backend):
+        """Test that expanding too many aliases is rejected."""
+        with pytest.raises(ResourceLimitError, match="more than 1000 aliases"):
+            load_outline(alias_bomb())
+
+    def test_skipped_aliases_not_expanded(self, backend):
+        """Test that aliases in skipped values cost nothing."""
+        content = alias_bomb().replace("build: *m9", "build: {steps: []}")
+        assert load_outline(content, limits=ParseLimits(max_aliases=0)) == {
+            "jobs": {"build": {"steps": []}}
+        }
+
+    def test_size_and_depth(self, backend):
+        """Test that files too large or too deeply nested are rejected."""
+        with pytest.raises(ResourceLimitError, match="larger than 10 bytes"):
+            load_outline("jobs: {}\n" + "#" * 10, limits=ParseLimits(max_bytes=10))
+        deep = "jobs: {build: {steps: " + "[" * 20 + "]" * 20 + "}}\n"
+        with pytest.raises(ResourceLimitError, match="more than 10 levels"):
+            load_outline(deep, limits=ParseLimits(max_depth=10))
+        assert load_outline(deep, limits=ParseLimits(max_depth=30))
+
+    def test_time(self, backend):
+        """Test that a file taking too long to parse is rejected."""
+        content = "jobs:\n" + "".join(f"  job{i}: {{steps: []}}\n" for i in range(2000))
+        with pytest.raises(ResourceLimitError, match="not parsed within"):
+            load_outline(content, limits=ParseLimits(max_seconds=-1))
+
+    def test_set_limits(self, backend):
+        """Test that set_limits changes the limits used by default."""
+        previous = get_limits()
+        set_limits(ParseLimits(max_depth=1))
+        try:
+            with pytest.raises(ResourceLimitError):
+                load_outline("jobs: {build: {}}\n")
+        finally:
+            set_limits(previous)
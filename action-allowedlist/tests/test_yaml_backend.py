@@ -0,0 +1,79 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from action_allowedlist import yaml_backend
+from action_allowedlist.actions_parser import (
+    get_actions_from_file,
+    get_all_used_actions,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "workflows"
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    """Keep backend selection from leaking between tests."""
+    previous = yaml_backend._backend
+    yield
+    yaml_backend._backend = previous
+
+
+class TestSelectBackend:
+    """Test cases for YAML backend selection."""
+
+    def test_auto_prefers_libyaml_when_available(self):
+        """Test that auto picks the C loader when PyYAML was built with libyaml."""
+        with patch.dict(yaml_backend.get_loaders(), {"libyaml": object()}):
+            assert yaml_backend.select_backend("auto") == "libyaml"
+
+    def test_auto_falls_back_to_python(self):
+        """Test that auto falls back to the pure-Python loader."""
+        with patch.dict(yaml_backend.get_loaders(), {"libyaml": None}):
+            assert yaml_backend.select_backend("auto") == "python"
+            assert yaml_backend.get_loader() is yaml_backend.get_loaders()["python"]
+
+    def test_force_python_backend(self):
+        """Test that the pure-Python loader can be forced."""
+        assert yaml_backend.select_backend("python") == "python"
+        assert yaml_backend.get_backend() == "python"
+
+    def test_force_unavailable_backend(self):
+        """Test that forcing a missing backend raises an error."""
+        with patch.dict(yaml_backend.get_loaders(), {"libyaml": None}):
+            with pytest.raises(RuntimeError):
+                yaml_backend.select_backend("libyaml")
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name raises an error."""
+        with pytest.raises(ValueError):
+            yaml_backend.select_backend("ruamel")
+
+    def test_backend_reported(self, capsys):
+        """Test that the backend in use is printed with the scan output."""
+        yaml_backend.select_backend("python")
+        get_all_used_actions(FIXTURES_DIR.parent)
+
+        assert "YAML backend: python" in capsys.readouterr().out.splitlines()
+
+
+@pytest.mark.skipif(
+    "libyaml" not in yaml_backend.available_backends(),
+    reason="PyYAML was built without libyaml",
+)
+@pytest.mark.parametrize(
+    "workflow_file", sorted(FIXTURES_DIR.glob("*.yml")), ids=lambda path: path.name
+)
+def test_backend_parity(workflow_file):
+    """Test that both backends extract identical action lists from the fixtures."""
+    content = workflow_file.read_text()
+
+    with patch("builtins.print"):
+        yaml_backend.select_backend("python")
+        python_actions = get_actions_from_file(content, workflow_file.name)
+        yaml_backend.select_backend("libyaml")
+        libyaml_actions = get_actions_from_file(content, workflow_file.name)
+
+    assert python_actions
+    assert libyaml_actions == python_actions